@@ -0,0 +1,70 @@
+"""
+Memory Benchmark - bytes per user for dict-backed, slotted and columnar users
+
+Usage (from the backend directory):
+    python benchmarks/memory_benchmark.py [num_users ...]
+"""
+
+import sys
+import os
+import gc
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.simulation import User
+from models.columnar import ColumnarNetwork, USAGE_TYPES
+
+
+class DictUser:
+    """User layout before the __slots__ change: instance __dict__, tuple location, string usage"""
+
+    def __init__(self, user_id: int, location: tuple, usage_type: str, data_consumption: float):
+        self.id = user_id
+        self.location = location
+        self.usage_type = usage_type
+        self.data_consumption = data_consumption
+        self.connected_tower = None
+
+
+def measure(build) -> int:
+    """Bytes still allocated by the objects `build` returns"""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return allocated
+
+
+def run(num_users: int, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(29.5, 32.6, num_users).tolist()
+    lng = rng.uniform(35.0, 36.2, num_users).tolist()
+    usage = [USAGE_TYPES[code] for code in rng.integers(0, len(USAGE_TYPES), num_users).tolist()]
+    consumption = rng.uniform(1, 10, num_users).tolist()  # +0.0 below: a fresh float per user, as User draws one
+    user_rng = np.random.default_rng(seed)
+
+    return {
+        'dict': measure(lambda: [DictUser(i, (lat[i], lng[i]), usage[i], consumption[i] + 0.0)
+                                 for i in range(num_users)]) / num_users,
+        'slots': measure(lambda: [User(i, (lat[i], lng[i]), usage[i], rng=user_rng)
+                                  for i in range(num_users)]) / num_users,
+        'columnar': measure(lambda: ColumnarNetwork(0, num_users)) / num_users
+    }
+
+
+def main(sizes):
+    print(f"{'users':>9} {'dict B/user':>12} {'slots B/user':>13} {'columnar B/user':>16} {'saved':>7}")
+    for num_users in sizes:
+        result = run(num_users)
+        saved = 1 - result['slots'] / result['dict']
+        print(f"{num_users:>9} {result['dict']:>12.1f} {result['slots']:>13.1f} "
+              f"{result['columnar']:>16.1f} {saved:>7.1%}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100000, 1000000])
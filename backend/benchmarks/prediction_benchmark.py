@@ -0,0 +1,74 @@
+"""
+Prediction Benchmark - per-tower Python loop vs the vectorized local predictor
+
+Usage (from the backend directory):
+    python benchmarks/prediction_benchmark.py [num_towers ...]
+"""
+
+import sys
+import os
+import random
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.xgboost_predictor import XGBoostPredictor
+
+
+def loop_predict(towers_data):
+    """predict_tower_loads_local before vectorization: clock read and random draw per tower"""
+    predictions = {}
+    for tower_data in towers_data:
+        current_time = datetime.now()
+        current_load = tower_data.get('current_load', 100)
+        capacity = tower_data.get('capacity', 200)
+        historical_avg = tower_data.get('historical_avg_load', 80)
+        user_density = tower_data.get('user_density', 50)
+        time_factor = 1.2 if 8 <= current_time.hour <= 10 or 17 <= current_time.hour <= 19 else 0.8
+        weekend_factor = 0.9 if current_time.weekday() >= 5 else 1.0
+        base_prediction = (current_load * 0.6 + historical_avg * 0.4)
+        density_adjusted = base_prediction * time_factor * weekend_factor * (1 + user_density / 500)
+        predicted_load = density_adjusted * (1 + random.uniform(-0.15, 0.15))
+        predictions[tower_data.get('id', 0)] = max(10, min(predicted_load, capacity * 1.3))
+    return predictions
+
+
+def build_columns(num_towers: int, seed: int = 42) -> dict:
+    rng = np.random.default_rng(seed)
+    capacity = rng.integers(150, 251, num_towers).astype(np.float64)
+    return {
+        'id': np.arange(num_towers),
+        'current_load': np.floor(capacity * rng.uniform(0.3, 1.0, num_towers)),
+        'capacity': capacity,
+        'historical_avg_load': capacity * rng.uniform(0.3, 0.8, num_towers),
+        'user_density': rng.uniform(10, 200, num_towers)
+    }
+
+
+def timed(function, repeats: int = 5) -> float:
+    """Best wall time of `repeats` calls, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(sizes):
+    predictor = XGBoostPredictor(use_vertex_ai=False)
+    print(f"{'towers':>7} {'loop_ms':>10} {'dicts_ms':>10} {'batch_ms':>10} {'speedup':>8}")
+    for num_towers in sizes:
+        columns = build_columns(num_towers)
+        towers = [dict(zip(columns, row)) for row in zip(*(values.tolist() for values in columns.values()))]
+        loop_ms = timed(lambda: loop_predict(towers), repeats=1)
+        dicts_ms = timed(lambda: predictor.predict_tower_loads_local(towers), repeats=1)
+        batch_ms = timed(lambda: predictor.predict_tower_loads_batch(columns))
+        print(f"{num_towers:>7} {loop_ms:>10.1f} {dicts_ms:>10.1f} {batch_ms:>10.2f} {loop_ms / batch_ms:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,73 @@
+"""
+Redistribution Benchmark - greedy loop vs heap, lookahead and per-operator planners vs min-cost flow solver
+
+Usage (from the backend directory):
+    python benchmarks/redistribution_benchmark.py [num_towers ...]
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.simulation import SimulationEngine
+from models.redistribution import plan_cost, Move
+
+STRATEGIES = ['greedy', 'heap', 'lookahead', 'operator', 'optimal']
+
+
+def build_engine(num_towers: int, seed: int = 42) -> SimulationEngine:
+    """Columnar engine whose towers start between 30% and 100% loaded"""
+    rng = np.random.default_rng(seed)
+    capacity = rng.integers(150, 251, num_towers)
+    load = (capacity * rng.uniform(0.3, 1.0, num_towers)).astype(np.int64)
+
+    engine = SimulationEngine(num_towers, int(load.sum()), columnar=True)
+    network = engine.network
+    network.tower_capacity[:] = capacity
+    network.tower_lat[:] = rng.uniform(29.5, 32.6, num_towers)
+    network.tower_lng[:] = rng.uniform(35.0, 36.2, num_towers)
+    network.user_tower[:] = np.repeat(np.arange(num_towers), load)
+    network.recompute()
+    return engine
+
+
+def run(num_towers: int, strategy: str) -> dict:
+    engine = build_engine(num_towers)
+    engine.get_current_state = lambda *args, **kwargs: None  # time the redistribution only
+    load_before, capacity = engine.tower_load_arrays()
+    lat, lng = engine.tower_location_arrays()
+    lat, lng = lat.copy(), lng.copy()
+    predictions = {i: float(l) for i, l in enumerate(load_before)}
+
+    start = time.perf_counter()
+    engine.apply_ml_redistribution(predictions, strategy=strategy)
+    elapsed = time.perf_counter() - start
+
+    load_after, _ = engine.tower_load_arrays()
+    history = engine.redistribution_history.columns()
+    plan = [Move(*move) for move in zip(history['from_tower'].tolist(), history['to_tower'].tolist(),
+                                        history['users_moved'].tolist())]
+    return {
+        'time_ms': elapsed * 1000,
+        'users_moved': int(np.abs(load_after - load_before).sum() // 2),
+        'congested_after': int((load_after * 100.0 / capacity > 80).sum()),
+        'plan_cost': plan_cost(plan, load_before, capacity, lat, lng, predictions)
+    }
+
+
+def main(sizes):
+    run(20, 'optimal')  # warm up scipy imports so they are not timed
+    print(f"{'towers':>7} {'strategy':>9} {'time_ms':>10} {'moved':>8} {'congested':>10} {'cost':>14}")
+    for num_towers in sizes:
+        for strategy in STRATEGIES:
+            result = run(num_towers, strategy)
+            print(f"{num_towers:>7} {strategy:>9} {result['time_ms']:>10.1f} {result['users_moved']:>8} "
+                  f"{result['congested_after']:>10} {result['plan_cost']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
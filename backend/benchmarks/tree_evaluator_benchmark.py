@@ -0,0 +1,56 @@
+"""
+Tree Evaluator Benchmark - native XGBoost inplace_predict vs the flattened NumPy evaluator
+
+Usage (from the backend directory):
+    python benchmarks/tree_evaluator_benchmark.py [batch_size ...]
+"""
+
+import sys
+import os
+import time
+
+import numpy as np
+import xgboost as xgb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.tree_evaluator import TreeEnsemble
+
+
+def train_booster(num_rounds: int = 500, seed: int = 42) -> xgb.Booster:
+    """Booster shaped like train_model_with_real_data's (10 scaled features, depth 8)"""
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(5000, 10)).astype(np.float32)
+    target = 120 + 40 * features[:, 0] + 15 * features[:, 4] + 5 * features[:, 5] + rng.normal(0, 5, 5000)
+    params = {'objective': 'reg:squarederror', 'max_depth': 8, 'learning_rate': 0.1,
+              'subsample': 0.8, 'colsample_bytree': 0.8, 'tree_method': 'hist', 'seed': seed}
+    return xgb.train(params, xgb.DMatrix(features, label=target), num_boost_round=num_rounds)
+
+
+def timed(function, repeats: int) -> float:
+    """Best wall time of `repeats` calls, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(batch_sizes):
+    booster = train_booster()
+    evaluator = TreeEnsemble.from_booster(booster)
+    rng = np.random.default_rng(0)
+    print(f"{len(evaluator.roots)} trees, max depth {evaluator.max_depth}, {evaluator.nbytes() / 1e6:.1f} MB of node arrays")
+    print(f"{'batch':>7} {'xgboost_ms':>11} {'numpy_ms':>10} {'max_abs_diff':>13}")
+    for batch_size in batch_sizes:
+        features = rng.normal(size=(batch_size, 10)).astype(np.float32)
+        repeats = 5 if batch_size > 1000 else 50
+        native_ms = timed(lambda: booster.inplace_predict(features), repeats)
+        numpy_ms = timed(lambda: evaluator.predict(features), repeats)
+        difference = np.abs(evaluator.predict(features) - booster.inplace_predict(features)).max()
+        print(f"{batch_size:>7} {native_ms:>11.3f} {numpy_ms:>10.3f} {difference:>13.2e}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1, 32, 10000])
@@ -0,0 +1,95 @@
+"""
+Feature Builder - one columnar path from tower records to model feature matrices, shared by training and inference
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+FEATURE_COLUMNS = (
+    'current_load', 'capacity', 'time_of_day', 'day_of_week',
+    'historical_avg_load', 'user_density', 'tower_age',
+    'coverage_area', 'nearby_towers_count', 'operator_type'
+)
+TIME_FEATURES = ('time_of_day', 'day_of_week')
+
+# Values used when a tower record or feature column leaves a feature out
+FEATURE_DEFAULTS = {
+    'current_load': 100, 'capacity': 200, 'historical_avg_load': 80, 'user_density': 50,
+    'tower_age': 5, 'coverage_area': 10, 'nearby_towers_count': 3, 'operator_type': 1
+}
+
+
+def time_features(timestamp: Optional[datetime] = None) -> Dict[str, int]:
+    """Time-of-day and day-of-week features, read from the clock once per batch"""
+    current_time = timestamp or datetime.now()
+    return {'time_of_day': current_time.hour, 'day_of_week': current_time.weekday()}
+
+
+def _num_rows(data) -> int:
+    if isinstance(data, dict):
+        return max((np.size(values) for values in data.values()), default=0)
+    if hasattr(data, 'num_rows'):  # Arrow table
+        return data.num_rows
+    return len(data)
+
+
+def _column(data, name: str, num_rows: int) -> Optional[np.ndarray]:
+    """A whole feature column as an array, None when the input does not have it"""
+    if isinstance(data, dict):
+        return np.broadcast_to(np.asarray(data[name], dtype=np.float64), (num_rows,)) if name in data else None
+    if hasattr(data, 'column_names'):  # pyarrow.Table; nulls become NaN (missing)
+        if name not in data.column_names:
+            return None
+        return data.column(name).to_numpy().astype(np.float64, copy=False)
+    if hasattr(data, 'columns') and hasattr(data, 'iloc'):  # pandas.DataFrame
+        return data[name].to_numpy(dtype=np.float64, na_value=np.nan) if name in data.columns else None
+    return None
+
+
+def build_feature_matrix(data, feature_columns: Sequence[str] = FEATURE_COLUMNS,
+                         timestamp: Optional[datetime] = None, dtype=np.float32) -> np.ndarray:
+    """Feature matrix (rows x feature_columns) from tower records, filled column by column.
+
+    ``data`` is a list of tower dicts, a dict of per-tower arrays, a pandas
+    DataFrame or a pyarrow Table. Missing features take FEATURE_DEFAULTS;
+    time features come from ``timestamp`` (now by default) unless the data
+    carries them, so training and inference build identical features.
+    """
+    num_rows = _num_rows(data)
+    matrix = np.empty((num_rows, len(feature_columns)), dtype=dtype)
+    defaults = dict(FEATURE_DEFAULTS, **time_features(timestamp))
+    records = isinstance(data, (list, tuple))
+
+    for j, name in enumerate(feature_columns):
+        default = defaults[name]
+        if records:
+            if name in TIME_FEATURES and not any(name in row for row in data):
+                matrix[:, j] = default
+            else:
+                matrix[:, j] = np.fromiter((row.get(name, default) for row in data), dtype=np.float64,
+                                           count=num_rows)
+            continue
+        column = _column(data, name, num_rows)
+        matrix[:, j] = default if column is None else column
+    return matrix
+
+
+def build_targets(data, target: str = 'target_load', fallback: str = 'current_load') -> np.ndarray:
+    """Training target per row: `target`, else `fallback`, else 0"""
+    num_rows = _num_rows(data)
+    if isinstance(data, (list, tuple)):
+        return np.fromiter((row.get(target, row.get(fallback, 0)) for row in data), dtype=np.float64,
+                           count=num_rows)
+    column = _column(data, target, num_rows)
+    if column is None:
+        column = _column(data, fallback, num_rows)
+    return np.zeros(num_rows) if column is None else np.asarray(column, dtype=np.float64)
+
+
+def scale_features(matrix: np.ndarray, mean: Optional[np.ndarray], scale: Optional[np.ndarray]) -> np.ndarray:
+    """Standardize in float64 and hand the model float32, identically for training and inference"""
+    if mean is None:
+        return np.ascontiguousarray(matrix, dtype=np.float32)
+    return ((np.asarray(matrix, dtype=np.float64) - mean) / scale).astype(np.float32)
@@ -0,0 +1,127 @@
+"""
+Model Bundle - versioned on-disk format for the tower load model (booster, scaler, feature schema)
+
+A bundle root holds one directory per version plus a LATEST pointer:
+
+    tower_predictor/
+        LATEST              -> "v3"
+        v3/metadata.json    format, feature columns, iteration range, xgboost version
+        v3/booster.ubj      XGBoost booster (UBJSON, or booster.json)
+        v3/scaler.npy       float64 (2 x features): mean row, scale row
+        v3/trees/           flattened ensemble for ml.tree_evaluator (optional)
+
+Nothing is pickled. Versions are written to a staging directory and renamed
+into place before LATEST moves, so readers never see a half-written bundle.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ml.tree_evaluator import TreeEnsemble
+
+BUNDLE_FORMAT = 1
+METADATA_FILE = 'metadata.json'
+SCALER_FILE = 'scaler.npy'
+TREES_DIR = 'trees'
+LATEST_FILE = 'LATEST'
+BOOSTER_FORMATS = ('ubj', 'json')
+
+
+class ModelBundle(NamedTuple):
+    """A loaded bundle version"""
+    version: str
+    path: str
+    booster: Any
+    scaler: Optional[np.ndarray]  # memory-mapped (2 x features) mean/scale, None when unscaled
+    metadata: Dict[str, Any]
+    trees: Optional[TreeEnsemble] = None  # memory-mapped
+
+
+def bundle_versions(root: str) -> List[str]:
+    """Versions present under `root`, oldest first"""
+    if not os.path.isdir(root):
+        return []
+    numbers = [int(name[1:]) for name in os.listdir(root) if name[:1] == 'v' and name[1:].isdigit()]
+    return [f"v{number}" for number in sorted(numbers)]
+
+
+def latest_version(root: str) -> Optional[str]:
+    """Version LATEST points at, None when the root has no bundle"""
+    try:
+        with open(os.path.join(root, LATEST_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def save_bundle(root: str, booster, feature_columns: Sequence[str],
+                scaler_mean: Optional[np.ndarray] = None, scaler_scale: Optional[np.ndarray] = None,
+                iteration_range: Tuple[int, int] = (0, 0), booster_format: str = 'ubj',
+                extra_metadata: Optional[Dict[str, Any]] = None,
+                trees: Optional[TreeEnsemble] = None) -> str:
+    """Write a new bundle version under `root` and point LATEST at it; returns the version"""
+    if booster_format not in BOOSTER_FORMATS:
+        raise ValueError(f"Unknown booster format: {booster_format}")
+    import xgboost as xgb
+
+    os.makedirs(root, exist_ok=True)
+    versions = bundle_versions(root)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1}"
+    booster_file = f"booster.{booster_format}"
+
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+    try:
+        booster.save_model(os.path.join(staging, booster_file))
+        if scaler_mean is not None:
+            scaler = np.vstack([scaler_mean, scaler_scale]).astype(np.float64)
+            np.save(os.path.join(staging, SCALER_FILE), scaler)
+        if trees is not None:
+            trees.save(os.path.join(staging, TREES_DIR))
+        metadata = dict(extra_metadata or {},
+                        format=BUNDLE_FORMAT,
+                        version=version,
+                        created_at=datetime.utcnow().isoformat(),
+                        xgboost_version=xgb.__version__,
+                        booster_file=booster_file,
+                        feature_columns=list(feature_columns),
+                        iteration_range=list(iteration_range),
+                        scaled=scaler_mean is not None,
+                        trees=TREES_DIR if trees is not None else None)
+        with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.chmod(staging, 0o755)  # mkdtemp creates it private
+        os.rename(staging, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer = os.path.join(root, f".{LATEST_FILE}.tmp")
+    with open(pointer, 'w') as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, LATEST_FILE))
+    return version
+
+
+def load_bundle(root: str, version: Optional[str] = None) -> ModelBundle:
+    """Load a bundle version (LATEST by default); the scaler and trees stay memory-mapped"""
+    version = version or latest_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No model bundle under {root}")
+    path = os.path.join(root, version)
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+    if metadata.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported model bundle format: {metadata.get('format')}")
+
+    import xgboost as xgb
+    booster = xgb.Booster()
+    booster.load_model(os.path.join(path, metadata['booster_file']))
+    scaler = np.load(os.path.join(path, SCALER_FILE), mmap_mode='r') if metadata.get('scaled') else None
+    trees = TreeEnsemble.load(os.path.join(path, TREES_DIR)) if metadata.get('trees') else None
+    return ModelBundle(version, path, booster, scaler, metadata, trees)
@@ -0,0 +1,137 @@
+"""
+Tree Evaluator - XGBoost ensembles flattened into contiguous node arrays and scored with NumPy
+"""
+
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+EVAL_BLOCK_CELLS = 4000000  # (rows x trees) node positions traversed per block
+IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror', 'reg:squaredlogerror')
+ARRAY_NAMES = ('feature', 'threshold', 'default_left', 'children', 'value', 'roots')
+
+
+class TreeEnsemble:
+    """A regression forest as flat arrays, evaluated level by level for a whole batch.
+
+    Node i of the forest splits on ``feature[i]``: rows with x < ``threshold[i]``
+    (or a missing x when ``default_left[i]``) go to ``children[2i]``, the rest to
+    ``children[2i + 1]``. Leaves point both children at themselves, so every
+    row can take ``max_depth`` steps from its tree's root and then read
+    ``value`` at the node it stopped on. Prediction is ``base_score`` plus the
+    sum over trees, as XGBoost computes it for identity-link objectives.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], base_score: float, max_depth: int, num_features: int):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.default_left = arrays['default_left']
+        self.children = arrays['children']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.base_score = base_score
+        self.max_depth = max_depth
+        self.num_features = num_features
+
+    @classmethod
+    def from_booster(cls, booster, iteration_range: Tuple[int, int] = (0, 0)) -> 'TreeEnsemble':
+        """Flatten a trained xgboost Booster (trees of iterations in `iteration_range`, all when (0, 0))"""
+        learner = json.loads(booster.save_raw('json'))['learner']
+        objective = learner['objective']['name']
+        if objective not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for the tree evaluator: {objective}")
+        model = learner['gradient_booster']['model']
+        indptr = model.get('iteration_indptr') or list(range(len(model['trees']) + 1))
+        first, last = iteration_range
+        last = last or len(indptr) - 1
+        trees = model['trees'][indptr[first]:indptr[last]]
+
+        feature, threshold, default_left, children, value, roots = [], [], [], [], [], []
+        max_depth, offset = 0, 0
+        for tree in trees:
+            if any(tree['split_type']):
+                raise ValueError("Categorical splits are not supported by the tree evaluator")
+            left = np.asarray(tree['left_children'], dtype=np.int64)
+            right = np.asarray(tree['right_children'], dtype=np.int64)
+            node = np.arange(len(left))
+            leaf = left == -1
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+
+            pair = np.empty((len(left), 2), dtype=np.int64)
+            pair[:, 0] = np.where(leaf, node, left) + offset
+            pair[:, 1] = np.where(leaf, node, right) + offset
+            feature.append(np.where(leaf, 0, tree['split_indices']).astype(np.int32))
+            threshold.append(np.where(leaf, np.float32(np.inf), conditions).astype(np.float32))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool) | leaf)
+            children.append(pair.ravel())
+            value.append(np.where(leaf, conditions, 0).astype(np.float32))
+            roots.append(offset)
+            max_depth = max(max_depth, cls._depth(left, right))
+            offset += len(left)
+
+        base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+        arrays = {
+            'feature': np.concatenate(feature) if feature else np.zeros(0, np.int32),
+            'threshold': np.concatenate(threshold) if threshold else np.zeros(0, np.float32),
+            'default_left': np.concatenate(default_left) if default_left else np.zeros(0, bool),
+            'children': np.concatenate(children).astype(np.int32) if children else np.zeros(0, np.int32),
+            'value': np.concatenate(value) if value else np.zeros(0, np.float32),
+            'roots': np.asarray(roots, dtype=np.int32)
+        }
+        num_features = int(learner['learner_model_param']['num_feature'])
+        return cls(arrays, base_score, max_depth, num_features)
+
+    @staticmethod
+    def _depth(left: np.ndarray, right: np.ndarray) -> int:
+        """Edges on the longest root-to-leaf path"""
+        depth = np.zeros(len(left), dtype=np.int64)
+        for node in range(len(left)):  # children always follow their parent
+            if left[node] != -1:
+                depth[left[node]] = depth[right[node]] = depth[node] + 1
+        return int(depth.max()) if len(depth) else 0
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Predictions for a (rows x features) matrix; NaN marks a missing value"""
+        matrix = np.asarray(features, dtype=np.float32).reshape(-1, self.num_features)
+        result = np.empty(len(matrix), dtype=np.float32)
+        num_trees = max(len(self.roots), 1)
+        block = max(1, EVAL_BLOCK_CELLS // num_trees)
+        for start in range(0, len(matrix), block):
+            rows = matrix[start:start + block]
+            flat = rows.ravel()
+            row_offset = (np.arange(len(rows), dtype=np.int32) * self.num_features)[:, None]
+            has_missing = bool(np.isnan(flat).any())
+            nodes = np.broadcast_to(self.roots, (len(rows), len(self.roots)))
+            for _ in range(self.max_depth):
+                x = flat.take(row_offset + self.feature.take(nodes))
+                # x >= threshold (or NaN) goes right; leaves have an infinite threshold and loop on themselves
+                go_right = ~(x < self.threshold.take(nodes))
+                if has_missing:
+                    go_right &= ~(np.isnan(x) & self.default_left.take(nodes))
+                nodes = self.children.take(2 * nodes + go_right)
+            result[start:start + len(rows)] = self.base_score + self.value.take(nodes).sum(axis=1, dtype=np.float64)
+        return result
+
+    def save(self, directory: str):
+        """One .npy per array plus ensemble.json, so load() can memory-map them"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, 'ensemble.json'), 'w') as f:
+            json.dump({'base_score': self.base_score, 'max_depth': self.max_depth,
+                       'num_features': self.num_features}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> 'TreeEnsemble':
+        """Load a saved ensemble; arrays are memory-mapped (shared between processes) by default"""
+        with open(os.path.join(directory, 'ensemble.json')) as f:
+            params = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        # Plain ndarray views of the maps: same pages, without np.memmap's per-operation overhead
+        arrays = {name: array.view(np.ndarray) for name, array in arrays.items()}
+        return cls(arrays, params['base_score'], params['max_depth'], params['num_features'])
+
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
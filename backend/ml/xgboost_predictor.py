@@ -7,10 +7,15 @@ import random
 import os
 import json
 import logging
+import threading
 import numpy as np
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
+from ml.features import FEATURE_COLUMNS, FEATURE_DEFAULTS, build_feature_matrix, build_targets, scale_features
+from ml.model_bundle import save_bundle, load_bundle, latest_version
+from ml.tree_evaluator import TreeEnsemble
+
 # Google Cloud AI Platform imports
 from google.cloud import aiplatform
 from google.cloud import storage
@@ -20,6 +25,12 @@ from google.api_core import exceptions
 
 logger = logging.getLogger(__name__)
 
+LOCAL_MODEL_FEATURES = ('current_load', 'capacity', 'historical_avg_load', 'user_density')
+PREDICTION_NOISE = 0.15  # +/- relative noise of the local model
+TREE_EVALUATOR_MAX_BATCH = 32  # up to this many rows the NumPy evaluator beats a native XGBoost call
+DEFAULT_MODEL_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'ml-models', 'tower_predictor'))
+
 class XGBoostPredictor:
     """XGBoost-based predictor for cellular tower load optimization with Vertex AI integration"""
     
@@ -27,28 +38,40 @@ class XGBoostPredictor:
                  model_path: str = None,
                  project_id: str = None,
                  location: str = "us-central1",
-                 use_vertex_ai: bool = True):
+                 use_vertex_ai: bool = True,
+                 preload_model: Optional[bool] = None):
         
-        self.feature_columns = [
-            'current_load', 'capacity', 'time_of_day', 'day_of_week',
-            'historical_avg_load', 'user_density', 'tower_age',
-            'coverage_area', 'nearby_towers_count', 'operator_type'
-        ]
+        self.feature_columns = list(FEATURE_COLUMNS)
         
         # Configuration
-        self.model_path = model_path or '../../ml-models/tower_predictor.pkl'
+        self.model_path = model_path or os.environ.get('TOWER_MODEL_PATH', DEFAULT_MODEL_PATH)
         self.project_id = project_id or os.environ.get('GOOGLE_CLOUD_PROJECT')
         self.location = location
         self.use_vertex_ai = use_vertex_ai and self.project_id
         
         # Initialize components
         self.model = None
+        self.scaler = None
         self.vertex_endpoint = None
         self.storage_client = None
         self.gemini_model = None
+        self.rng = np.random.default_rng()
+        
+        # Local inference state (from training via _set_inference, or a bundle via load_model)
+        self.booster = None
+        self._scaler_mean = None
+        self._scaler_scale = None
+        self._iteration_range = (0, 0)
+        self.tree_evaluator = None
+        self.model_version = None
+        self._model_checked = False
+        self._model_lock = threading.Lock()
         
         # Initialize services
         self._initialize_services()
+        # Loading at startup spares the first prediction request the bundle load
+        if preload_model if preload_model is not None else os.environ.get('TOWER_MODEL_PRELOAD') == '1':
+            self.ensure_model_loaded()
         
         print("✅ XGBoost Predictor initialized with Vertex AI integration")
     
@@ -120,17 +143,15 @@ class XGBoostPredictor:
             logger.error(f"❌ Failed to deploy model to Vertex AI: {e}")
             raise
     
-    def predict_tower_loads_vertex_ai(self, towers_data: List[Dict[str, Any]]) -> Dict[int, float]:
+    def predict_tower_loads_vertex_ai(self, towers_data: List[Dict[str, Any]],
+                                      rng: Optional[np.random.Generator] = None) -> Dict[int, float]:
         """Predict using Vertex AI endpoint"""
         if not self.vertex_endpoint:
-            return self.predict_tower_loads_local(towers_data)
+            return self.predict_tower_loads_model(towers_data, rng)
             
         try:
             # Prepare instances for prediction
-            instances = []
-            for tower_data in towers_data:
-                instance = self._prepare_features(tower_data)
-                instances.append(instance)
+            instances = build_feature_matrix(towers_data, self.feature_columns).tolist()
             
             # Make predictions using Vertex AI
             predictions = self.vertex_endpoint.predict(instances=instances)
@@ -146,64 +167,167 @@ class XGBoostPredictor:
             
         except Exception as e:
             logger.error(f"❌ Vertex AI prediction failed, falling back to local: {e}")
-            return self.predict_tower_loads_local(towers_data)
+            return self.predict_tower_loads_model(towers_data, rng)
     
     def _prepare_features(self, tower_data: Dict[str, Any]) -> List[float]:
-        """Prepare features for ML prediction"""
-        current_time = datetime.now()
+        """Prepare features for ML prediction (one tower; batches use build_feature_matrix)"""
+        return build_feature_matrix([tower_data], self.feature_columns)[0].tolist()
+    
+    
+    def predict_tower_loads_local(self, towers_data: List[Dict[str, Any]],
+                                  rng: Optional[np.random.Generator] = None) -> Dict[int, float]:
+        """Local prediction method as fallback; noise is drawn from `rng` (the predictor's own by default)"""
+        columns = {
+            name: np.fromiter((t.get(name, FEATURE_DEFAULTS[name]) for t in towers_data),
+                              dtype=np.float64, count=len(towers_data))
+            for name in LOCAL_MODEL_FEATURES
+        }
+        predicted = self.predict_tower_loads_batch(columns, rng=rng)
+        return dict(zip((t.get('id', i) for i, t in enumerate(towers_data)), predicted.tolist()))
+    
+    def _feature_arrays(self, features, timestamp: Optional[datetime]) -> Dict[str, np.ndarray]:
+        """One float64 array per feature column from a feature matrix or a dict of columns"""
+        if isinstance(features, dict):
+            matrix = build_feature_matrix(features, self.feature_columns, timestamp, dtype=np.float64)
+        else:
+            matrix = np.asarray(features, dtype=np.float64).reshape(-1, len(self.feature_columns))
+        return {name: matrix[:, i] for i, name in enumerate(self.feature_columns)}
+    
+    def predict_tower_loads_batch(self, features, timestamp: Optional[datetime] = None,
+                                  noise: float = PREDICTION_NOISE,
+                                  rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Local prediction for many towers at once, as NumPy operations.
+        
+        ``features`` is a (towers x feature_columns) matrix, or a dict of
+        per-tower arrays keyed by feature name where missing features take
+        FEATURE_DEFAULTS and the time features come from ``timestamp`` (now by
+        default). Row i is tower i; a dict with an 'id' array is scattered so
+        that result[id] is that tower's prediction (NaN for ids not given).
+        """
+        columns = self._feature_arrays(features, timestamp)
+        hour, weekday = columns['time_of_day'], columns['day_of_week']
         
-        features = [
-            tower_data.get('current_load', 100),
-            tower_data.get('capacity', 200),
-            current_time.hour,
-            current_time.weekday(),
-            tower_data.get('historical_avg_load', 80),
-            tower_data.get('user_density', 50),
-            tower_data.get('tower_age', 5),
-            tower_data.get('coverage_area', 10),
-            tower_data.get('nearby_towers_count', 3),
-            tower_data.get('operator_type', 1)
-        ]
+        # Time-based factors
+        peak = ((8 <= hour) & (hour <= 10)) | ((17 <= hour) & (hour <= 19))
+        time_factor = np.where(peak, 1.2, 0.8) * np.where(weekday >= 5, 0.9, 1.0)
         
-        return features
+        # Load prediction with multiple factors
+        base_prediction = columns['current_load'] * 0.6 + columns['historical_avg_load'] * 0.4
+        predicted = base_prediction * time_factor * (1 + columns['user_density'] / 500)
+        if noise:
+            predicted *= 1 + (rng or self.rng).uniform(-noise, noise, len(predicted))
+        predicted = np.maximum(np.minimum(predicted, columns['capacity'] * 1.3), 10)
+        
+        if isinstance(features, dict) and 'id' in features:
+            ids = np.asarray(features['id'], dtype=np.int64)
+            aligned = np.full(int(ids.max()) + 1 if len(ids) else 0, np.nan)
+            aligned[ids] = predicted
+            return aligned
+        return predicted
     
+    def _set_inference(self, model, scaler):
+        """Keep the booster and scaler parameters used by predict_matrix"""
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        best_iteration = getattr(model, 'best_iteration', None)
+        self.model = model
+        self.scaler = scaler
+        self.booster = booster
+        self._iteration_range = (0, best_iteration + 1) if best_iteration is not None else (0, 0)
+        self.tree_evaluator = None
+        if scaler is None:
+            self._scaler_mean = self._scaler_scale = None
+        else:
+            num_features = len(self.feature_columns)
+            mean = getattr(scaler, 'mean_', None)
+            scale = getattr(scaler, 'scale_', None)
+            self._scaler_mean = np.zeros(num_features) if mean is None else np.asarray(mean, dtype=np.float64)
+            self._scaler_scale = np.ones(num_features) if scale is None else np.asarray(scale, dtype=np.float64)
     
-    def predict_tower_loads_local(self, towers_data: List[Dict[str, Any]]) -> Dict[int, float]:
-        """Local prediction method as fallback"""
-        predictions = {}
-        current_time = datetime.now()
-        
-        for tower_data in towers_data:
-            tower_id = tower_data.get('id', 0)
-            
-            # Enhanced mock prediction with better business logic
-            current_load = tower_data.get('current_load', 100)
-            capacity = tower_data.get('capacity', 200)
-            historical_avg = tower_data.get('historical_avg_load', 80)
-            user_density = tower_data.get('user_density', 50)
-            
-            # Time-based factors
-            time_factor = 1.2 if 8 <= current_time.hour <= 10 or 17 <= current_time.hour <= 19 else 0.8
-            weekend_factor = 0.9 if current_time.weekday() >= 5 else 1.0
-            
-            # Load prediction with multiple factors
-            base_prediction = (current_load * 0.6 + historical_avg * 0.4)
-            time_adjusted = base_prediction * time_factor * weekend_factor
-            density_adjusted = time_adjusted * (1 + user_density / 500)
-            
-            predicted_load = density_adjusted * (1 + random.uniform(-0.15, 0.15))
-            predicted_load = max(10, min(predicted_load, capacity * 1.3))
-            
-            predictions[tower_id] = predicted_load
+    def save_model(self, path: Optional[str] = None, extra_metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Save the trained model as a new bundle version under `path` (model_path by default)"""
+        if self.booster is None:
+            raise ValueError("No trained model to save")
+        path = path or self.model_path
+        trees = self.tree_evaluator
+        if trees is None:
+            try:
+                trees = self.export_tree_evaluator()
+            except ValueError as e:
+                logger.warning(f"⚠️ Tree evaluator not exported: {e}")
+        version = save_bundle(path, self.booster, self.feature_columns, self._scaler_mean, self._scaler_scale,
+                              self._iteration_range, extra_metadata=extra_metadata, trees=trees)
+        self.model_version = version
+        logger.info(f"💾 Model bundle {version} saved to {path}")
+        return version
+    
+    def load_model(self, path: Optional[str] = None, version: Optional[str] = None) -> bool:
+        """Load a model bundle (LATEST by default); returns False (heuristic stays in use) when there is none"""
+        path = path or self.model_path
+        if (version or latest_version(path)) is None:
+            logger.info(f"ℹ️ No model bundle at {path}, using heuristic predictions")
+            return False
+        try:
+            bundle = load_bundle(path, version)
+            if bundle.metadata['feature_columns'] != self.feature_columns:
+                logger.error(f"❌ Model bundle {bundle.version} at {path} was trained on different features")
+                return False
+            self.model = self.booster = bundle.booster
+            self.scaler = None
+            self._iteration_range = tuple(bundle.metadata['iteration_range'])
+            self._scaler_mean, self._scaler_scale = (None, None) if bundle.scaler is None else bundle.scaler
+            self.tree_evaluator = bundle.trees
+            self.model_version = bundle.version
+            logger.info(f"✅ Local XGBoost model {bundle.version} loaded from {path}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to load model bundle from {path}: {e}")
+            return False
+    
+    def export_tree_evaluator(self) -> TreeEnsemble:
+        """Flatten the booster into a NumPy tree evaluator used for small batches"""
+        if self.booster is None:
+            raise ValueError("No trained model to export")
+        self.tree_evaluator = TreeEnsemble.from_booster(self.booster, self._iteration_range)
+        return self.tree_evaluator
+    
+    def ensure_model_loaded(self) -> bool:
+        """Load the saved model on first use; True when a model is available"""
+        if self.booster is None and not self._model_checked:
+            with self._model_lock:
+                if self.booster is None and not self._model_checked:
+                    self.load_model()
+                    self._model_checked = True
+        return self.booster is not None
+    
+    def predict_matrix(self, features: np.ndarray) -> np.ndarray:
+        """Model predictions for a (towers x feature_columns) matrix, scaled and run in one batch"""
+        matrix = np.asarray(features).reshape(-1, len(self.feature_columns))
+        # Same scaling as training, so split thresholds compare identically
+        matrix = scale_features(matrix, self._scaler_mean, self._scaler_scale)
+        if self.tree_evaluator is not None and len(matrix) <= TREE_EVALUATOR_MAX_BATCH:
+            return self.tree_evaluator.predict(matrix)
+        return self.booster.inplace_predict(matrix, iteration_range=self._iteration_range)
+    
+    def predict_tower_loads_model(self, towers_data: List[Dict[str, Any]],
+                                  rng: Optional[np.random.Generator] = None) -> Dict[int, float]:
+        """Predict with the local XGBoost model, or the heuristic when no model is present"""
+        if not self.ensure_model_loaded():
+            return self.predict_tower_loads_local(towers_data, rng)
         
-        return predictions
+        predicted = np.maximum(self.predict_matrix(build_feature_matrix(towers_data, self.feature_columns)), 10)
+        return dict(zip((t.get('id', i) for i, t in enumerate(towers_data)), predicted.tolist()))
     
-    def predict_tower_loads(self, towers_data: List[Dict[str, Any]]) -> Dict[int, float]:
-        """Main prediction method - uses Vertex AI if available, falls back to local"""
+    def predict_tower_loads(self, towers_data: List[Dict[str, Any]],
+                            rng: Optional[np.random.Generator] = None) -> Dict[int, float]:
+        """Main prediction method - Vertex AI if deployed, else the local model, else the heuristic.
+        
+        Pass a simulation's generator as ``rng`` so the heuristic's noise is
+        reproducible from that simulation's seed.
+        """
         if self.use_vertex_ai and self.vertex_endpoint:
-            return self.predict_tower_loads_vertex_ai(towers_data)
+            return self.predict_tower_loads_vertex_ai(towers_data, rng)
         else:
-            return self.predict_tower_loads_local(towers_data)
+            return self.predict_tower_loads_model(towers_data, rng)
     
     async def get_gemini_insights(self, 
                                 towers_data: List[Dict[str, Any]], 
@@ -344,19 +468,9 @@ class XGBoostPredictor:
             
             logger.info("🧠 بدء تدريب نموذج XGBoost المحسن...")
             
-            # تحضير البيانات
-            X = []
-            y = []
-            
-            for data_point in training_data:
-                features = self._prepare_features(data_point)
-                target = data_point.get('target_load', data_point.get('current_load', 0))
-                
-                X.append(features)
-                y.append(target)
-            
-            X = np.array(X)
-            y = np.array(y)
+            # تحضير البيانات (نفس مسار الخصائص المستخدم في التنبؤ)
+            X = build_feature_matrix(training_data, self.feature_columns)
+            y = build_targets(training_data)
             
             # تقسيم البيانات
             X_train, X_val, y_train, y_val = train_test_split(
@@ -364,9 +478,9 @@ class XGBoostPredictor:
             )
             
             # معايرة البيانات
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_val_scaled = scaler.transform(X_val)
+            scaler = StandardScaler().fit(X_train)
+            X_train_scaled = scale_features(X_train, scaler.mean_, scaler.scale_)
+            X_val_scaled = scale_features(X_val, scaler.mean_, scaler.scale_)
             
             # إعدادات النموذج المحسنة
             xgb_params = {
@@ -404,8 +518,15 @@ class XGBoostPredictor:
             val_r2 = r2_score(y_val, y_pred_val)
             
             # حفظ النموذج والـ scaler
-            self.model = model
-            self.scaler = scaler
+            self._set_inference(model, scaler)
+            bundle_version = None
+            try:
+                bundle_version = self.save_model(extra_metadata={
+                    'model_version': '2.0_enhanced',
+                    'metrics': {'val_mae': round(float(val_mae), 4), 'val_r2': round(float(val_r2), 4)}
+                })
+            except OSError as e:
+                logger.warning(f"⚠️ تعذر حفظ النموذج: {e}")
             
             # إحصائيات التدريب
             training_stats = {
@@ -425,7 +546,8 @@ class XGBoostPredictor:
                     model.feature_importances_.tolist()
                 )),
                 'training_time': datetime.now().isoformat(),
-                'model_version': '2.0_enhanced'
+                'model_version': '2.0_enhanced',
+                'bundle_version': bundle_version
             }
             
             logger.info(f"✅ تم تدريب النموذج بنجاح - دقة التحقق: {val_r2:.4f}")
@@ -449,22 +571,12 @@ class XGBoostPredictor:
             logger.info(f"🔧 بدء تحسين معاملات النموذج ({n_trials} محاولة)...")
             
             # تحضير البيانات
-            X = []
-            y = []
-            
-            for data_point in training_data:
-                features = self._prepare_features(data_point)
-                target = data_point.get('target_load', data_point.get('current_load', 0))
-                
-                X.append(features)
-                y.append(target)
-            
-            X = np.array(X)
-            y = np.array(y)
+            X = build_feature_matrix(training_data, self.feature_columns)
+            y = build_targets(training_data)
             
             # معايرة البيانات
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
+            scaler = StandardScaler().fit(X)
+            X_scaled = scale_features(X, scaler.mean_, scaler.scale_)
             
             def objective(trial):
                 # اقتراح معاملات للتجريب
@@ -577,10 +689,13 @@ class XGBoostPredictor:
     def model_performance_monitoring(self) -> Dict[str, Any]:
         """مراقبة أداء النموذج"""
         try:
+            # A saved bundle is only loaded on first use, so check for one here
+            is_trained = self.ensure_model_loaded()
             performance_metrics = {
                 'model_info': {
                     'model_type': 'XGBoost Enhanced',
-                    'is_trained': self.model is not None,
+                    'is_trained': is_trained,
+                    'model_version': self.model_version,
                     'vertex_ai_enabled': self.use_vertex_ai,
                     'features_count': len(self.feature_columns),
                     'last_updated': datetime.now().isoformat()
@@ -599,7 +714,7 @@ class XGBoostPredictor:
             }
             
             # فحص صحة النموذج
-            if not self.model:
+            if not is_trained:
                 performance_metrics['health_status']['status'] = 'needs_training'
                 performance_metrics['health_status']['issues'].append('النموذج غير مدرب')
                 performance_metrics['health_status']['recommendations'].append('تدريب النموذج بالبيانات الحقيقية')
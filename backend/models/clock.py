@@ -0,0 +1,37 @@
+"""
+Simulation Clock - simulated minutes shared by the models that drive an engine through time
+"""
+
+MAX_RUN_MINUTES = 7 * 24 * 60  # longest stretch of simulated time one call may cover
+
+
+def checked_minutes(name: str, value, minimum: float = 0.0, maximum: float = MAX_RUN_MINUTES) -> float:
+    """`value` as a positive, finite number of minutes within [minimum, maximum]; ValueError otherwise"""
+    try:
+        minutes = float(value)
+    except (TypeError, ValueError):
+        minutes = float('nan')  # rejected below
+    if not (minutes > 0 and minimum <= minutes <= maximum):
+        lowest = f"at least {minimum:g}" if minimum > 0 else "positive"
+        raise ValueError(f"{name} must be {lowest} and at most {maximum:g} minutes")
+    return minutes
+
+
+class SimulationClock:
+    """Simulated time of one engine, in minutes.
+
+    Models that cover a stretch of time (event-driven sessions, mobility) stamp
+    what happens relative to ``minutes`` and leave the clock alone; whoever
+    drives the engine advances it once per step, however many models ran
+    over that step.
+    """
+
+    __slots__ = ('minutes',)
+
+    def __init__(self, minutes: float = 0.0):
+        self.minutes = float(minutes)
+
+    def advance(self, minutes: float) -> float:
+        """Move the clock forward; returns the new time"""
+        self.minutes += minutes
+        return self.minutes
@@ -0,0 +1,516 @@
+"""
+Columnar Network State - NumPy array-backed towers and users for large simulations
+"""
+
+from collections.abc import Sequence
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+USAGE_TYPES = ('call', 'data', 'video')
+USAGE_CODES = {name: code for code, name in enumerate(USAGE_TYPES)}
+OPERATORS = ("زين", "أورانج", "أمنية")
+STATUS_NAMES = ('normal', 'congested', 'overloaded')
+
+STATUS_NORMAL = 0
+STATUS_CONGESTED = 1
+STATUS_OVERLOADED = 2
+
+# (low, high) data consumption in MB per usage type code
+CONSUMPTION_RANGES = np.array([
+    [0.1, 0.5],   # call
+    [1.0, 10.0],  # data
+    [5.0, 50.0]   # video
+])
+
+DEFAULT_COVERAGE_RADIUS = 6000  # meters
+
+
+def status_codes(load: np.ndarray, capacity: np.ndarray) -> np.ndarray:
+    """Vectorized equivalent of Tower._update_status"""
+    load_percentage = load * 100.0 / capacity
+    codes = np.zeros(len(load_percentage), dtype=np.int8)
+    codes[load_percentage > 80] = STATUS_CONGESTED
+    codes[load_percentage > 100] = STATUS_OVERLOADED
+    return codes
+
+
+def rank_within_groups(keys: np.ndarray) -> np.ndarray:
+    """Position of every element among equal keys, preserving original order"""
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    group_start = np.searchsorted(sorted_keys, sorted_keys, side='left')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - group_start
+    return rank
+
+
+class ColumnarNetwork:
+    """Towers and users stored as parallel NumPy arrays"""
+
+    def __init__(self, num_towers: int, num_users: int):
+        # Tower columns
+        self.tower_lat = np.zeros(num_towers, dtype=np.float64)
+        self.tower_lng = np.zeros(num_towers, dtype=np.float64)
+        self.tower_capacity = np.full(num_towers, 200, dtype=np.int32)
+        self.tower_operator = np.zeros(num_towers, dtype=np.int8)
+        self.tower_coverage = np.full(num_towers, DEFAULT_COVERAGE_RADIUS, dtype=np.float32)
+        self.tower_load = np.zeros(num_towers, dtype=np.int32)
+        self.tower_status = np.zeros(num_towers, dtype=np.int8)
+        self.tower_active = np.ones(num_towers, dtype=bool)  # False = failed, accepts no users
+
+        # User columns
+        self.user_lat = np.zeros(num_users, dtype=np.float64)
+        self.user_lng = np.zeros(num_users, dtype=np.float64)
+        self.user_usage = np.zeros(num_users, dtype=np.int8)
+        self.user_consumption = np.zeros(num_users, dtype=np.float32)
+        self.user_tower = np.full(num_users, -1, dtype=np.int32)  # -1 = not connected
+
+        self._status_counts = np.bincount(self.tower_status, minlength=len(STATUS_NAMES))
+        self.tracker = None  # optional StateTracker notified of changed rows
+
+    @property
+    def num_towers(self) -> int:
+        return len(self.tower_capacity)
+
+    @property
+    def num_users(self) -> int:
+        return len(self.user_tower)
+
+    # ------------------------------------------------------------------
+    # Bulk operations
+    # ------------------------------------------------------------------
+
+    def recompute(self):
+        """Recompute every tower load and status from user assignments"""
+        attached = self.user_tower[self.user_tower >= 0]
+        self.tower_load = np.bincount(attached, minlength=self.num_towers).astype(np.int32)
+        self.update_status()
+        if self.tracker is not None:
+            self.tracker.mark_all()
+
+    def update_status(self, tower_idx: Optional[np.ndarray] = None):
+        """Update status codes (and the running status counters) for all towers or only the given ones"""
+        if tower_idx is None:
+            self.tower_status = status_codes(self.tower_load, self.tower_capacity)
+            self._status_counts = np.bincount(self.tower_status, minlength=len(STATUS_NAMES))
+        else:
+            self._update_status_at(np.unique(tower_idx))
+
+    def _update_status_at(self, tower_idx: np.ndarray):
+        """update_status for tower indices without duplicates"""
+        self._status_counts -= np.bincount(self.tower_status[tower_idx], minlength=len(STATUS_NAMES))
+        self.tower_status[tower_idx] = status_codes(
+            self.tower_load[tower_idx], self.tower_capacity[tower_idx]
+        )
+        self._status_counts += np.bincount(self.tower_status[tower_idx], minlength=len(STATUS_NAMES))
+
+    def free_capacity(self) -> np.ndarray:
+        """Users each tower can still accept (0 for failed towers)"""
+        free = self.tower_capacity.astype(np.int64) - self.tower_load
+        return np.where(self.tower_active, np.maximum(free, 0), 0)
+
+    def set_tower_active(self, tower: int, active: bool):
+        """Put a tower in or out of service (its users are not moved here)"""
+        self.tower_active[tower] = active
+        if self.tracker is not None:
+            self.tracker.mark_towers(tower)
+
+    def append_users(self, lat: np.ndarray, lng: np.ndarray, usage: np.ndarray,
+                     consumption: np.ndarray) -> np.ndarray:
+        """Add detached users at the end of the user columns; returns their ids"""
+        first = self.num_users
+        self.user_lat = np.concatenate([self.user_lat, np.asarray(lat, dtype=np.float64)])
+        self.user_lng = np.concatenate([self.user_lng, np.asarray(lng, dtype=np.float64)])
+        self.user_usage = np.concatenate([self.user_usage, np.asarray(usage, dtype=np.int8)])
+        self.user_consumption = np.concatenate([self.user_consumption, np.asarray(consumption, dtype=np.float32)])
+        self.user_tower = np.concatenate([self.user_tower, np.full(len(lat), -1, dtype=np.int32)])
+        ids = np.arange(first, self.num_users)
+        if self.tracker is not None:
+            self.tracker.grow(self.num_towers, self.num_users)
+            self.tracker.mark_users(ids)
+        return ids
+
+    def load_percentages(self) -> np.ndarray:
+        """Current load of every tower as percentage"""
+        return self.tower_load * 100.0 / self.tower_capacity
+
+    def status_counts(self) -> np.ndarray:
+        """Number of towers per status code"""
+        return self._status_counts.copy()
+
+    def assign_within_capacity(self, user_idx: np.ndarray, tower_idx: np.ndarray) -> np.ndarray:
+        """Attach users to requested towers, keeping only the first arrivals that fit.
+
+        Returns a boolean mask of the accepted requests.
+        """
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        tower_idx = np.asarray(tower_idx, dtype=np.int64)
+
+        # Rank each request within its tower (stable => arrival order)
+        rank = rank_within_groups(tower_idx)
+        accepted = rank < self.free_capacity()[tower_idx]
+
+        self.move_users(user_idx[accepted], tower_idx[accepted])
+        return accepted
+
+    def move_users(self, user_idx: np.ndarray, tower_idx):
+        """Reassign users to towers (scalar or per-user), updating loads in bulk"""
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        if len(user_idx) == 0:
+            return
+
+        previous = self.user_tower[user_idx]
+        self.user_tower[user_idx] = tower_idx
+        current = self.user_tower[user_idx]
+
+        leaving = np.bincount(previous[previous >= 0], minlength=self.num_towers)
+        joining = np.bincount(current[current >= 0], minlength=self.num_towers)
+        self.tower_load += (joining - leaving).astype(np.int32)
+
+        touched = np.flatnonzero(leaving | joining)
+        self._update_status_at(touched)
+        if self.tracker is not None:
+            self.tracker.mark_users(user_idx)
+            self.tracker.mark_towers(touched)
+
+    def attach_user(self, user: int, tower: int) -> bool:
+        """Attach a single detached user if the tower has room (scalar fast path)"""
+        load = int(self.tower_load[tower])
+        capacity = int(self.tower_capacity[tower])
+        if load >= capacity or not self.tower_active[tower]:
+            return False
+        self.user_tower[user] = tower
+        self.tower_load[tower] = load + 1
+        self._set_status(tower, self._status_code(load + 1, capacity))
+        if self.tracker is not None:
+            self.tracker.mark_users(user)
+            self.tracker.mark_towers(tower)
+        return True
+
+    def detach_user(self, user: int) -> int:
+        """Detach a single user (scalar fast path); returns the tower it left, or -1"""
+        tower = int(self.user_tower[user])
+        if tower >= 0:
+            load = int(self.tower_load[tower]) - 1
+            self.user_tower[user] = -1
+            self.tower_load[tower] = load
+            self._set_status(tower, self._status_code(load, int(self.tower_capacity[tower])))
+            if self.tracker is not None:
+                self.tracker.mark_users(user)
+                self.tracker.mark_towers(tower)
+        return tower
+
+    def _set_status(self, tower: int, code: int):
+        previous = self.tower_status[tower]
+        if previous != code:
+            self._status_counts[previous] -= 1
+            self._status_counts[code] += 1
+            self.tower_status[tower] = code
+
+    @staticmethod
+    def _status_code(load: int, capacity: int) -> int:
+        load_percentage = load * 100.0 / capacity
+        if load_percentage > 100:
+            return STATUS_OVERLOADED
+        if load_percentage > 80:
+            return STATUS_CONGESTED
+        return STATUS_NORMAL
+
+    def apply_moves(self, from_tower: np.ndarray, to_tower: np.ndarray, count: np.ndarray) -> np.ndarray:
+        """Apply a whole move plan at once; each move takes the source's lowest-id users.
+
+        Moves are clipped in plan order, like Tower.add_users on the object
+        path: to the users the source has left of its own and to the room the
+        target has left (nothing for an inactive target). Returns the users
+        actually moved by each move.
+        """
+        from_tower = np.asarray(from_tower, dtype=np.int64)
+        to_tower = np.asarray(to_tower, dtype=np.int64)
+        requested = np.maximum(np.asarray(count, dtype=np.int64), 0)
+
+        # Running loads as the plan goes; a source only gives users it had before the plan
+        own = self.tower_load.tolist()
+        load = list(own)
+        capacity = self.tower_capacity.tolist()
+        active = self.tower_active.tolist()
+        given = [0] * self.num_towers
+        previous = np.zeros(len(requested), dtype=np.int64)
+        count = np.zeros(len(requested), dtype=np.int64)
+        for i, (source, target, wanted) in enumerate(zip(from_tower.tolist(), to_tower.tolist(),
+                                                         requested.tolist())):
+            room = capacity[target] - load[target] if active[target] else 0
+            moved = max(0, min(wanted, own[source] - given[source], room))
+            if moved:
+                previous[i] = given[source]
+                count[i] = moved
+                given[source] += moved
+                load[source] -= moved
+                load[target] += moved
+        if count.sum() <= 0:
+            return count
+
+        # Users grouped by tower once, instead of a scan per move
+        by_tower = np.argsort(self.user_tower, kind='stable')
+        first = np.searchsorted(self.user_tower[by_tower], np.arange(self.num_towers))
+
+        move_of_user = np.repeat(np.arange(len(count)), count)
+        within_move = np.arange(len(move_of_user)) - np.repeat(np.cumsum(count) - count, count)
+        position = first[from_tower[move_of_user]] + previous[move_of_user] + within_move
+        self.move_users(by_tower[position], to_tower[move_of_user])
+        return count
+
+    def users_of(self, tower: int) -> np.ndarray:
+        """Indices of users attached to a tower"""
+        return np.flatnonzero(self.user_tower == tower)
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def tower_dict(self, i: int) -> Dict[str, Any]:
+        """Serialize one tower like Tower.to_dict"""
+        capacity = int(self.tower_capacity[i])
+        load = int(self.tower_load[i])
+        return {
+            'id': int(i),
+            'location': (float(self.tower_lat[i]), float(self.tower_lng[i])),
+            'capacity': capacity,
+            'current_load': load,
+            'load_percentage': (load / capacity) * 100,
+            'status': STATUS_NAMES[self.tower_status[i]],
+            'operator': OPERATORS[self.tower_operator[i]],
+            'coverage_radius': int(self.tower_coverage[i]),
+            'active': bool(self.tower_active[i])
+        }
+
+    def user_dict(self, i: int) -> Dict[str, Any]:
+        """Serialize one user like User.to_dict"""
+        return {
+            'id': int(i),
+            'location': (float(self.user_lat[i]), float(self.user_lng[i])),
+            'usage_type': USAGE_TYPES[self.user_usage[i]],
+            'data_consumption': float(self.user_consumption[i])
+        }
+
+    def tower_dicts(self, tower_idx: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Serialize all (or the given) towers, converting columns once instead of per element"""
+        rows = slice(None) if tower_idx is None else np.asarray(tower_idx, dtype=np.int64)
+        ids = range(self.num_towers) if tower_idx is None else rows.tolist()
+        lat, lng = self.tower_lat[rows].tolist(), self.tower_lng[rows].tolist()
+        capacity, load = self.tower_capacity[rows].tolist(), self.tower_load[rows].tolist()
+        status, operator = self.tower_status[rows].tolist(), self.tower_operator[rows].tolist()
+        coverage = self.tower_coverage[rows].astype(np.int64).tolist()
+        active = self.tower_active[rows].tolist()
+        return [
+            {
+                'id': tower,
+                'location': (lat[i], lng[i]),
+                'capacity': capacity[i],
+                'current_load': load[i],
+                'load_percentage': (load[i] / capacity[i]) * 100,
+                'status': STATUS_NAMES[status[i]],
+                'operator': OPERATORS[operator[i]],
+                'coverage_radius': coverage[i],
+                'active': active[i]
+            }
+            for i, tower in enumerate(ids)
+        ]
+
+    def user_dicts(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Serialize a range of users, converting columns once instead of per element"""
+        stop = self.num_users if stop is None else min(stop, self.num_users)
+        return self._user_records(range(start, stop), slice(start, stop))
+
+    def user_dicts_at(self, user_idx: np.ndarray) -> List[Dict[str, Any]]:
+        """Serialize the given users"""
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        return self._user_records(user_idx.tolist(), user_idx)
+
+    def _user_records(self, ids, rows) -> List[Dict[str, Any]]:
+        lat, lng = self.user_lat[rows].tolist(), self.user_lng[rows].tolist()
+        usage = self.user_usage[rows].tolist()
+        consumption = self.user_consumption[rows].tolist()
+        return [
+            {
+                'id': user,
+                'location': (lat[k], lng[k]),
+                'usage_type': USAGE_TYPES[usage[k]],
+                'data_consumption': consumption[k]
+            }
+            for k, user in enumerate(ids)
+        ]
+
+
+class TowerView:
+    """Tower-compatible view over one row of a ColumnarNetwork"""
+
+    __slots__ = ('_network', 'id')
+
+    def __init__(self, network: ColumnarNetwork, index: int):
+        self._network = network
+        self.id = index
+
+    @property
+    def location(self) -> tuple:
+        return (float(self._network.tower_lat[self.id]), float(self._network.tower_lng[self.id]))
+
+    @property
+    def capacity(self) -> int:
+        return int(self._network.tower_capacity[self.id])
+
+    @property
+    def operator(self) -> str:
+        return OPERATORS[self._network.tower_operator[self.id]]
+
+    @property
+    def coverage_radius(self) -> int:
+        return int(self._network.tower_coverage[self.id])
+
+    @property
+    def current_load(self) -> int:
+        return int(self._network.tower_load[self.id])
+
+    @property
+    def active(self) -> bool:
+        return bool(self._network.tower_active[self.id])
+
+    @property
+    def status(self) -> str:
+        return STATUS_NAMES[self._network.tower_status[self.id]]
+
+    @property
+    def users(self) -> List['UserView']:
+        return [UserView(self._network, int(i)) for i in self._network.users_of(self.id)]
+
+    def add_user(self, user) -> bool:
+        """Add a user to this tower if capacity allows"""
+        if self.active and self.current_load < self.capacity:
+            self._network.move_users(np.array([user.id]), self.id)
+            return True
+        return False
+
+    def remove_user(self, user) -> bool:
+        """Remove a user from this tower"""
+        if self._network.user_tower[user.id] == self.id:
+            self._network.move_users(np.array([user.id]), -1)
+            return True
+        return False
+
+    def has_user(self, user) -> bool:
+        """Check whether a user is connected to this tower"""
+        return self._network.user_tower[user.id] == self.id
+
+    def first_users(self, count: int) -> List['UserView']:
+        """Oldest connected users (lowest ids)"""
+        return [UserView(self._network, int(i)) for i in self._network.users_of(self.id)[:count]]
+
+    def add_users(self, users) -> List['UserView']:
+        """Add users while capacity allows in one bulk update; returns the accepted users"""
+        candidates = [user for user in users if not self.has_user(user)]
+        accepted = candidates[:int(self._network.free_capacity()[self.id])]
+        self._network.move_users(np.array([user.id for user in accepted], dtype=np.int64), self.id)
+        return accepted
+
+    def remove_users(self, users) -> int:
+        """Remove users in one bulk update; returns how many were connected"""
+        connected = np.array([user.id for user in users if self.has_user(user)], dtype=np.int64)
+        self._network.move_users(connected, -1)
+        return len(connected)
+
+    def _update_status(self):
+        """Update tower status based on current load"""
+        self._network.update_status(np.array([self.id]))
+
+    def get_load_percentage(self) -> float:
+        """Get current load as percentage"""
+        return (self.current_load / self.capacity) * 100
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert tower to dictionary for API responses"""
+        return self._network.tower_dict(self.id)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TowerView) and other._network is self._network and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash((id(self._network), self.id))
+
+
+class UserView:
+    """User-compatible view over one row of a ColumnarNetwork"""
+
+    __slots__ = ('_network', 'id')
+
+    def __init__(self, network: ColumnarNetwork, index: int):
+        self._network = network
+        self.id = index
+
+    @property
+    def location(self) -> tuple:
+        return (float(self._network.user_lat[self.id]), float(self._network.user_lng[self.id]))
+
+    @property
+    def usage_type(self) -> str:
+        return USAGE_TYPES[self._network.user_usage[self.id]]
+
+    @property
+    def data_consumption(self) -> float:
+        return float(self._network.user_consumption[self.id])
+
+    @property
+    def connected_tower(self) -> Optional[TowerView]:
+        tower = int(self._network.user_tower[self.id])
+        return TowerView(self._network, tower) if tower >= 0 else None
+
+    @connected_tower.setter
+    def connected_tower(self, tower: Optional[TowerView]):
+        target = -1 if tower is None else tower.id
+        if self._network.user_tower[self.id] != target:
+            self._network.move_users(np.array([self.id]), target)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert user to dictionary"""
+        return self._network.user_dict(self.id)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, UserView) and other._network is self._network and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash((id(self._network), self.id))
+
+
+class _ViewSequence(Sequence):
+    """Lazy list of views so millions of rows are never materialized as objects"""
+
+    view_class = None
+
+    def __init__(self, network: ColumnarNetwork, length: int):
+        self._network = network
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.view_class(self._network, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self.view_class(self._network, index)
+
+
+class TowerViews(_ViewSequence):
+    view_class = TowerView
+
+    def __init__(self, network: ColumnarNetwork):
+        super().__init__(network, network.num_towers)
+
+
+class UserViews(_ViewSequence):
+    view_class = UserView
+
+    def __init__(self, network: ColumnarNetwork):
+        super().__init__(network, network.num_users)
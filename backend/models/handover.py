@@ -0,0 +1,113 @@
+"""
+Handover Model - handover attempts, failures and ping-pong detection with per-tower counters
+"""
+
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from models.clock import SimulationClock
+
+CELL_CENTER_SINR_DB = 25.0   # unloaded target, user at the tower
+LOAD_SINR_PENALTY_DB = 15.0  # interference added by a fully loaded target
+EDGE_SINR_LOSS_DB = 12.0     # extra loss at the coverage edge
+SHADOWING_SIGMA_DB = 3.0
+MIN_HANDOVER_SINR_DB = -3.0  # below this the target cannot be acquired
+PING_PONG_WINDOW_MINUTES = 2.0
+
+
+def target_sinr_db(distance_m, coverage_m, load_fraction, shadowing_db) -> np.ndarray:
+    """SINR a user would get from a handover target, from its distance and load"""
+    edge = (np.asarray(distance_m, dtype=np.float64) / np.asarray(coverage_m, dtype=np.float64)) ** 2
+    return (CELL_CENTER_SINR_DB - LOAD_SINR_PENALTY_DB * np.asarray(load_fraction, dtype=np.float64)
+            - EDGE_SINR_LOSS_DB * edge + shadowing_db)
+
+
+class HandoverCounters:
+    """Per-tower handover counters plus the per-user state needed to spot ping-pongs.
+
+    Attempts, failures and ping-pongs are counted on the source tower, matching
+    the per-cell ``handover_attempts`` / ``handover_failures`` the policy engine
+    consumes. A ping-pong is a successful A -> B -> A handover within
+    ``ping_pong_window`` simulated minutes. Attempt times are read off
+    ``clock``, the engine's shared SimulationClock.
+    """
+
+    def __init__(self, num_towers: int, num_users: int,
+                 ping_pong_window: float = PING_PONG_WINDOW_MINUTES,
+                 clock: Optional[SimulationClock] = None):
+        self.ping_pong_window = ping_pong_window
+        self.clock = clock if clock is not None else SimulationClock()
+        self.attempts = np.zeros(num_towers, dtype=np.int64)
+        self.failures = np.zeros(num_towers, dtype=np.int64)
+        self.ping_pongs = np.zeros(num_towers, dtype=np.int64)
+        self.incoming = np.zeros(num_towers, dtype=np.int64)  # successful handovers into each tower
+        self.last_source = np.full(num_users, -1, dtype=np.int32)
+        self.last_time = np.full(num_users, -np.inf)
+
+    def _grow_users(self, num_users: int):
+        extra = num_users - len(self.last_source)
+        if extra > 0:
+            self.last_source = np.concatenate([self.last_source, np.full(extra, -1, dtype=np.int32)])
+            self.last_time = np.concatenate([self.last_time, np.full(extra, -np.inf)])
+
+    def record(self, users: np.ndarray, source: np.ndarray, target: np.ndarray,
+               succeeded: np.ndarray, at) -> int:
+        """Count a batch of attempts made at simulated minute `at` (one for all or one per attempt);
+        returns ping-pongs found"""
+        users = np.asarray(users, dtype=np.int64)
+        if len(users) == 0:
+            return 0
+        self._grow_users(int(users.max()) + 1)
+        source = np.asarray(source, dtype=np.int64)
+        target = np.asarray(target, dtype=np.int64)
+        succeeded = np.asarray(succeeded, dtype=bool)
+        at = np.broadcast_to(np.asarray(at, dtype=np.float64), users.shape)
+        towers = len(self.attempts)
+
+        self.attempts += np.bincount(source, minlength=towers)
+        self.failures += np.bincount(source[~succeeded], minlength=towers)
+
+        users, source, target, at = users[succeeded], source[succeeded], target[succeeded], at[succeeded]
+        bounced = (self.last_source[users] == target) & (at - self.last_time[users] <= self.ping_pong_window)
+        self.ping_pongs += np.bincount(source[bounced], minlength=towers)
+        self.incoming += np.bincount(target, minlength=towers)
+        self.last_source[users] = source
+        self.last_time[users] = at
+        return int(bounced.sum())
+
+    def failure_rate(self) -> np.ndarray:
+        """Failed share of attempts per tower, in percent"""
+        return np.divide(self.failures * 100.0, self.attempts,
+                         out=np.zeros(len(self.attempts)), where=self.attempts > 0)
+
+    def totals(self) -> Dict[str, Any]:
+        attempts, failures = int(self.attempts.sum()), int(self.failures.sum())
+        return {
+            'handover_attempts': attempts,
+            'handover_failures': failures,
+            'ping_pongs': int(self.ping_pongs.sum()),
+            'failure_rate': round(failures * 100.0 / attempts, 2) if attempts else 0.0,
+            'simulated_minutes': self.clock.minutes
+        }
+
+    def tower_records(self) -> List[Dict[str, Any]]:
+        """One record per tower, keyed like the policy engine's TowerData"""
+        rates = np.round(self.failure_rate(), 2).tolist()
+        return [
+            {
+                'cell_id': cell_id,
+                'handover_attempts': attempts,
+                'handover_failures': failures,
+                'ping_pongs': ping_pongs,
+                'incoming_handovers': incoming,
+                'failure_rate': rate
+            }
+            for cell_id, (attempts, failures, ping_pongs, incoming, rate) in enumerate(zip(
+                self.attempts.tolist(), self.failures.tolist(), self.ping_pongs.tolist(),
+                self.incoming.tolist(), rates))
+        ]
+
+    def memory_bytes(self) -> int:
+        return sum(a.nbytes for a in (self.attempts, self.failures, self.ping_pongs, self.incoming,
+                                      self.last_source, self.last_time))
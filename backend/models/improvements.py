@@ -0,0 +1,91 @@
+"""
+Improvements - network metrics from tower arrays and before/after comparisons
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+
+from models.radio import latency_ms
+
+CONGESTED_UTILIZATION = 0.8  # same threshold as the 'congested' tower status
+POPULATION_TOLERANCE = 0.01  # relative difference in active users still compared directly
+METRIC_FIELDS = ('active_users', 'mean_utilization', 'load_variance', 'congested_user_fraction',
+                 'modeled_latency_ms', 'overloaded_towers', 'congested_towers')
+
+
+def network_metrics(load: np.ndarray, capacity: np.ndarray, active: np.ndarray) -> Dict[str, float]:
+    """Network-wide summary of per-tower arrays, cheap enough to attach to every state.
+
+    - active_users: connected users the other metrics describe
+    - mean_utilization, load_variance: mean and variance of utilization over towers in service
+    - congested_user_fraction: share of connected users on towers above 80%
+    - modeled_latency_ms: user-weighted queueing latency (models.radio)
+    """
+    load = np.asarray(load, dtype=np.float64)
+    capacity = np.maximum(np.asarray(capacity, dtype=np.float64), 1)
+    active = np.asarray(active, dtype=bool)
+    utilization = load / capacity
+    users = load.sum()
+    congested = utilization > CONGESTED_UTILIZATION
+    return {
+        'active_users': int(users),
+        'mean_utilization': round(float(utilization[active].mean()) if active.any() else 0.0, 6),
+        'load_variance': round(float(utilization[active].var()) if active.any() else 0.0, 6),
+        'congested_user_fraction': round(float(load[congested].sum() / users) if users else 0.0, 6),
+        'modeled_latency_ms': round(float((latency_ms(utilization) * load).sum() / users) if users else 0.0, 3),
+        'overloaded_towers': int((utilization > 1.0).sum()),
+        'congested_towers': int((congested & (utilization <= 1.0)).sum())
+    }
+
+
+def metrics_from_towers(towers: List[Dict[str, Any]]) -> Dict[str, float]:
+    """network_metrics for a serialized tower list (states that predate the 'metrics' field)"""
+    load = np.fromiter((t['current_load'] for t in towers), dtype=np.float64, count=len(towers))
+    capacity = np.fromiter((t['capacity'] for t in towers), dtype=np.float64, count=len(towers))
+    active = np.fromiter((t.get('active', True) for t in towers), dtype=bool, count=len(towers))
+    return network_metrics(load, capacity, active)
+
+
+def _reduction(before: float, after: float, floor: float = 0.0) -> float:
+    """Relative reduction in percent (negative when the metric got worse)"""
+    denominator = max(before, floor)
+    return (before - after) / denominator * 100 if denominator else 0.0
+
+
+def _dispersion(metrics: Dict[str, float]) -> float:
+    """Squared coefficient of variation of utilization: load balance independent of how many users are active"""
+    mean = metrics['mean_utilization']
+    return metrics['load_variance'] / mean ** 2 if mean else 0.0
+
+
+def same_population(before: Dict[str, float], after: Dict[str, float]) -> bool:
+    """Whether two summaries describe (nearly) the same number of active users"""
+    users_before, users_after = before['active_users'], after['active_users']
+    return abs(users_after - users_before) <= POPULATION_TOLERANCE * max(users_before, users_after)
+
+
+def compare(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, Any]:
+    """Improvements between two network_metrics summaries.
+
+    Load balance and the congested user share are normalised by the active
+    population. Tower counts and latency grow with the number of active users,
+    so they are only compared between states with the same population and are
+    None otherwise.
+    """
+    comparable = same_population(before, after)
+
+    def absolute(value: float):
+        return f"{value:.1f}%" if comparable else None
+
+    return {
+        'overloaded_reduction': absolute(_reduction(before['overloaded_towers'], after['overloaded_towers'], 1)),
+        'congested_reduction': absolute(_reduction(before['congested_towers'], after['congested_towers'], 1)),
+        'network_efficiency_gain': f"{_reduction(_dispersion(before), _dispersion(after)):.1f}%",
+        'latency_improvement': absolute(_reduction(before['modeled_latency_ms'], after['modeled_latency_ms'])),
+        # Percentage points of users moved off congested towers
+        'user_satisfaction_increase':
+            f"{(before['congested_user_fraction'] - after['congested_user_fraction']) * 100:.1f}%",
+        'active_users': {'before': before['active_users'], 'after': after['active_users']},
+        'same_population': comparable
+    }
@@ -0,0 +1,242 @@
+"""
+Mobility Model - batched random-waypoint movement with road-corridor bias and handover detection
+"""
+
+import time
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+from models.columnar import rank_within_groups
+from models.handover import MIN_HANDOVER_SINR_DB, SHADOWING_SIGMA_DB, target_sinr_db
+from models.spatial_index import METERS_PER_DEGREE_LAT, haversine_m
+
+# Main road corridors as (start, end) segments
+ROAD_CORRIDORS = (
+    ((31.9565, 35.9239), (32.0833, 36.0933)),  # عمان - الزرقاء
+    ((31.9565, 35.9239), (32.2747, 35.8961)),  # عمان - جرش
+    ((32.2747, 35.8961), (32.5486, 35.8519)),  # جرش - إربد
+    ((31.9565, 35.9239), (31.7226, 35.9932)),  # عمان - المطار
+    ((31.7226, 35.9932), (31.1854, 35.7017)),  # المطار - الكرك
+    ((31.7226, 35.9932), (30.1962, 35.7341)),  # الطريق الصحراوي - معان
+    ((30.1962, 35.7341), (29.5320, 35.0063)),  # معان - العقبة
+)
+JORDAN_BOUNDS = ((29.5, 32.6), (35.0, 36.2))  # (lat range, lng range)
+
+
+class MobilityModel:
+    """Moves every subscriber of a columnar engine in one vectorized step.
+
+    Random waypoint: each user walks or drives towards a waypoint within
+    ``waypoint_radius_m``, pauses there, then picks the next one. With
+    probability ``corridor_bias`` a waypoint near a road corridor is snapped
+    onto it and travelled at driving speed.
+
+    Handover checks stay cheap at millions of users: only users who crossed
+    a spatial-index cell query the index, and may hand over to a nearer tower
+    (by more than ``handover_margin_m``). Everyone else is only tested against
+    their own serving tower; losing its coverage forces a handover. Attempts
+    are counted in the engine's HandoverCounters (models.handover).
+    """
+
+    def __init__(self, engine,
+                 waypoint_radius_m: float = 3000.0,
+                 walking_speed_kmh: Tuple[float, float] = (3.0, 6.0),
+                 driving_speed_kmh: Tuple[float, float] = (30.0, 90.0),
+                 pause_minutes: Tuple[float, float] = (0.0, 15.0),
+                 corridor_bias: float = 0.5,
+                 corridor_snap_m: float = 5000.0,
+                 handover_margin_m: float = 200.0):
+        if engine.network is None:
+            raise ValueError("Mobility requires a columnar SimulationEngine")
+        self.engine = engine
+        self.waypoint_radius_m = waypoint_radius_m
+        self.walking_speed_kmh = walking_speed_kmh
+        self.driving_speed_kmh = driving_speed_kmh
+        self.pause_minutes = pause_minutes
+        self.corridor_bias = corridor_bias
+        self.corridor_snap_m = corridor_snap_m
+        self.handover_margin_m = handover_margin_m
+        self.stats = {name: 0 for name in ('cell_crossings', 'handovers', 'handover_failures',
+                                           'ping_pongs', 'dropped_sessions')}
+
+        corridors = np.asarray(ROAD_CORRIDORS, dtype=np.float64)
+        self._segment_start = corridors[:, 0]
+        self._segment_end = corridors[:, 1]
+
+        n = engine.network.num_users
+        self.target_lat = np.empty(0)
+        self.target_lng = np.empty(0)
+        self.speed_mps = np.empty(0)
+        self.pause_left = np.empty(0)
+        self.cell = np.empty(0, dtype=np.int64)
+        self._grow(n)
+
+    def _grow(self, n: int):
+        """Give users added since the last step a waypoint and a grid cell"""
+        start = len(self.cell)
+        if n <= start:
+            return
+        network = self.engine.network
+        users = np.arange(start, n)
+        self.target_lat = np.concatenate([self.target_lat, np.empty(len(users))])
+        self.target_lng = np.concatenate([self.target_lng, np.empty(len(users))])
+        self.speed_mps = np.concatenate([self.speed_mps, np.empty(len(users))])
+        self.pause_left = np.concatenate([self.pause_left, np.zeros(len(users))])
+        self.cell = np.concatenate([self.cell, self.engine.spatial_index.cell_of(
+            network.user_lat[users], network.user_lng[users])])
+        self._new_waypoints(users)
+
+    def _new_waypoints(self, users: np.ndarray):
+        """Draw the next waypoint, speed and pause of `users`"""
+        if len(users) == 0:
+            return
+        rng = self.engine.rng
+        network = self.engine.network
+        lat, lng = network.user_lat[users], network.user_lng[users]
+
+        distance = self.waypoint_radius_m * np.sqrt(rng.random(len(users)))
+        bearing = rng.uniform(0.0, 2 * np.pi, len(users))
+        target_lat = lat + distance * np.cos(bearing) / METERS_PER_DEGREE_LAT
+        target_lng = lng + distance * np.sin(bearing) / (METERS_PER_DEGREE_LAT * np.cos(np.radians(lat)))
+
+        # Corridor bias: snap waypoints close to a road onto it
+        snap_lat, snap_lng, snap_distance = self._nearest_on_corridor(target_lat, target_lng)
+        driving = (snap_distance <= self.corridor_snap_m) & (rng.random(len(users)) < self.corridor_bias)
+        target_lat = np.where(driving, snap_lat, target_lat)
+        target_lng = np.where(driving, snap_lng, target_lng)
+
+        (lat_low, lat_high), (lng_low, lng_high) = JORDAN_BOUNDS
+        self.target_lat[users] = np.clip(target_lat, lat_low, lat_high)
+        self.target_lng[users] = np.clip(target_lng, lng_low, lng_high)
+        speed_kmh = np.where(driving, rng.uniform(*self.driving_speed_kmh, len(users)),
+                             rng.uniform(*self.walking_speed_kmh, len(users)))
+        self.speed_mps[users] = speed_kmh / 3.6
+        self.pause_left[users] = rng.uniform(*self.pause_minutes, len(users))
+
+    def _nearest_on_corridor(self, lat: np.ndarray, lng: np.ndarray):
+        """Closest point on any corridor segment and its distance in meters"""
+        scale = np.cos(np.radians(lat))[:, None]  # local equirectangular projection
+        start, end = self._segment_start, self._segment_end
+        d_lat = (end[:, 0] - start[:, 0])[None, :]
+        d_lng = (end[:, 1] - start[:, 1])[None, :] * scale
+        p_lat = lat[:, None] - start[:, 0][None, :]
+        p_lng = (lng[:, None] - start[:, 1][None, :]) * scale
+        t = np.clip((p_lat * d_lat + p_lng * d_lng) / (d_lat ** 2 + d_lng ** 2), 0.0, 1.0)
+        gap = np.hypot(p_lat - t * d_lat, p_lng - t * d_lng) * METERS_PER_DEGREE_LAT
+
+        best = np.argmin(gap, axis=1)
+        t = t[np.arange(len(lat)), best]
+        snap_lat = start[best, 0] + t * (end[best, 0] - start[best, 0])
+        snap_lng = start[best, 1] + t * (end[best, 1] - start[best, 1])
+        return snap_lat, snap_lng, gap[np.arange(len(lat)), best]
+
+    def step(self, minutes: float, step_minutes: float = 1.0) -> Dict[str, Any]:
+        """Advance all users by `minutes` in steps of `step_minutes`, handing over as they move.
+
+        Handovers are stamped from the engine clock, which the caller advances.
+        Raises ValueError for non-finite or negative `minutes` or a non-positive `step_minutes`.
+        """
+        if not 0 <= minutes < float('inf'):
+            raise ValueError("minutes must be a finite, non-negative number")
+        if not 0 < step_minutes < float('inf'):
+            raise ValueError("step_minutes must be a finite, positive number")
+        started = time.perf_counter()
+        totals = dict.fromkeys(('rechecked',) + tuple(self.stats), 0)
+        start = self.engine.clock.minutes
+        elapsed = 0.0
+        while elapsed < minutes - 1e-9:
+            dt = min(step_minutes, minutes - elapsed)
+            for name, count in self._advance(dt, start + elapsed + dt).items():
+                totals[name] += count
+            elapsed += dt
+        for name in self.stats:
+            self.stats[name] += totals[name]
+        return {
+            'simulated_minutes': minutes,
+            'wall_time_seconds': round(time.perf_counter() - started, 3),
+            **totals
+        }
+
+    def _advance(self, dt: float, at: float) -> Dict[str, int]:
+        network = self.engine.network
+        self._grow(network.num_users)
+        lat, lng = network.user_lat, network.user_lng
+
+        # Paused users wait; the rest travel towards their waypoint
+        self.pause_left -= dt
+        moving = np.flatnonzero(self.pause_left <= 0)
+        scale = METERS_PER_DEGREE_LAT * np.cos(np.radians(lat[moving]))
+        north = (self.target_lat[moving] - lat[moving]) * METERS_PER_DEGREE_LAT
+        east = (self.target_lng[moving] - lng[moving]) * scale
+        remaining = np.hypot(north, east)
+        travel = self.speed_mps[moving] * dt * 60.0
+        arrived = travel >= remaining
+        fraction = np.where(arrived, 1.0, travel / np.maximum(remaining, 1e-9))
+        lat[moving] += fraction * north / METERS_PER_DEGREE_LAT
+        lng[moving] += fraction * east / scale
+        self._new_waypoints(moving[arrived])
+        if network.tracker is not None:
+            network.tracker.mark_users(moving)
+
+        # Users who changed cell get a full index query; the rest only check their own tower
+        index = self.engine.spatial_index
+        cells = index.cell_of(lat[moving], lng[moving])
+        crossed = cells != self.cell[moving]
+        self.cell[moving] = cells
+        stayed = moving[~crossed]
+        serving = network.user_tower[stayed]
+        connected = serving >= 0
+        stayed, serving = stayed[connected], serving[connected]
+        out_of_coverage = stayed[haversine_m(lat[stayed], lng[stayed], network.tower_lat[serving],
+                                             network.tower_lng[serving]) > network.tower_coverage[serving]]
+
+        recheck = np.concatenate([moving[crossed & (network.user_tower[moving] >= 0)], out_of_coverage])
+        return {
+            'cell_crossings': int(crossed.sum()),
+            'rechecked': len(recheck),
+            **self._handover(recheck, at)
+        }
+
+    def _handover(self, users: np.ndarray, at: float) -> Dict[str, int]:
+        """Let connected `users` attempt a handover to their best server where needed.
+
+        Covered users only try a clearly nearer tower and stay put if that fails;
+        users who lost coverage must hand over and are dropped when it fails.
+        Attempts fail when the target has no room left or its SINR is too low.
+        """
+        result = {'handovers': 0, 'handover_failures': 0, 'ping_pongs': 0, 'dropped_sessions': 0}
+        if len(users) == 0:
+            return result
+        network = self.engine.network
+        lat, lng = network.user_lat[users], network.user_lng[users]
+        serving = network.user_tower[users]
+        current = haversine_m(lat, lng, network.tower_lat[serving], network.tower_lng[serving])
+        still_covered = (current <= network.tower_coverage[serving]) & network.tower_active[serving]
+
+        target, target_distance = self.engine.spatial_index.nearest_serving(lat, lng, network.tower_active)
+        better = (target >= 0) & (target != serving) & (target_distance + self.handover_margin_m < current)
+        attempt = better | (~still_covered & (target >= 0))
+
+        # Admission in order while the target has room, then radio acquisition
+        source, target, distance = serving[attempt], target[attempt], target_distance[attempt]
+        admitted = rank_within_groups(target) < network.free_capacity()[target]
+        sinr = target_sinr_db(distance, network.tower_coverage[target],
+                              network.tower_load[target] / network.tower_capacity[target],
+                              self.engine.rng.normal(0.0, SHADOWING_SIGMA_DB, len(target)))
+        succeeded = admitted & (sinr >= MIN_HANDOVER_SINR_DB)
+        result['ping_pongs'] = self.engine.handovers.record(users[attempt], source, target, succeeded, at)
+
+        lost = ~still_covered & ~attempt  # no tower in service covers them any more
+        failed_uncovered = ~succeeded & ~still_covered[attempt]
+        movers = np.concatenate([users[attempt][succeeded], users[lost], users[attempt][failed_uncovered]])
+        destination = np.concatenate([target[succeeded], np.full(len(movers) - int(succeeded.sum()), -1)])
+        network.move_users(movers, destination)
+
+        result['handovers'] = int(succeeded.sum())
+        result['handover_failures'] = len(target) - result['handovers']
+        result['dropped_sessions'] = int(lost.sum()) + int(failed_uncovered.sum())
+        return result
+
+    def memory_bytes(self) -> int:
+        return sum(a.nbytes for a in (self.target_lat, self.target_lng, self.speed_mps, self.pause_left, self.cell))
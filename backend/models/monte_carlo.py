@@ -0,0 +1,106 @@
+"""
+Monte-Carlo Runs - independent seeded simulation replicas executed across a process pool
+"""
+
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from models.simulation import SimulationEngine
+from models.worker_pool import map_in_pool, worker_count
+
+PERCENTILES = (5, 95)
+MAX_REPLICAS = 1000
+MAX_TOWERS = int(os.environ.get('SIMULATION_BATCH_MAX_TOWERS', 5000))        # per replica
+MAX_USERS = int(os.environ.get('SIMULATION_BATCH_MAX_USERS', 200000))        # per replica
+MAX_USER_RUNS = int(os.environ.get('SIMULATION_BATCH_MAX_USER_RUNS', 20000000))  # users x replicas per batch
+REPLICA_METRICS = (
+    'overloaded_before', 'overloaded_after',
+    'congested_before', 'congested_after',
+    'redistributed_users'
+)
+
+
+def run_replica(params: Dict[str, Any], seed: np.random.SeedSequence) -> Dict[str, Any]:
+    """One independent simulation run; module level so worker processes can unpickle it.
+
+    Replicas redistribute against the current load (no ML model in the workers),
+    so the result depends only on ``params`` and ``seed``.
+    """
+    engine = SimulationEngine(
+        params.get('num_towers', 5),
+        params.get('num_users', 150),
+        columnar=params.get('columnar', True),
+        distribution=params.get('distribution', 'random'),
+        seed=seed
+    )
+    before = engine.get_current_state(include_users=False)
+    predictions = {tower['id']: float(tower['current_load']) for tower in before['towers']}
+    after = engine.apply_ml_redistribution(predictions, strategy=params.get('strategy', 'greedy'),
+                                           include_users=False)
+    return {
+        'overloaded_before': before['overloaded_towers'],
+        'overloaded_after': after['overloaded_towers'],
+        'congested_before': before['congested_towers'],
+        'congested_after': after['congested_towers'],
+        'redistributed_users': engine.redistributed_users
+    }
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Mean, p5 and p95 of one metric across replicas"""
+    values = np.asarray(values, dtype=np.float64)
+    low, high = np.percentile(values, PERCENTILES)
+    return {
+        'mean': round(float(values.mean()), 3),
+        'p5': round(float(low), 3),
+        'p95': round(float(high), 3)
+    }
+
+
+def validate_batch(params: Dict[str, Any], num_replicas: int):
+    """Raise ValueError for a batch larger than the configured limits"""
+    num_towers = int(params.get('num_towers', 5))
+    num_users = int(params.get('num_users', 150))
+    if not 1 <= num_replicas <= MAX_REPLICAS:
+        raise ValueError(f"num_replicas must be between 1 and {MAX_REPLICAS}")
+    if not 1 <= num_towers <= MAX_TOWERS:
+        raise ValueError(f"num_towers must be between 1 and {MAX_TOWERS}")
+    if not 0 <= num_users <= MAX_USERS:
+        raise ValueError(f"num_users must be between 0 and {MAX_USERS}")
+    if num_users * num_replicas > MAX_USER_RUNS:
+        raise ValueError(f"num_users x num_replicas must not exceed {MAX_USER_RUNS}")
+
+
+def run_batch(params: Dict[str, Any], num_replicas: int, seed: Optional[int] = None,
+              max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Run `num_replicas` replicas and aggregate their distributions.
+
+    Child seeds are spawned from one SeedSequence, so every replica has an
+    independent stream and the whole batch is reproducible from ``seed``
+    regardless of how many workers run it. Replicas run on the shared worker
+    pool, so concurrent batches queue for the same bounded set of processes.
+    """
+    validate_batch(params, num_replicas)
+    started = time.perf_counter()
+    entropy = np.random.SeedSequence(seed)
+    seeds = entropy.spawn(num_replicas)
+    workers = worker_count(max_workers, num_replicas)
+
+    if workers == 1:
+        replicas = [run_replica(params, child) for child in seeds]
+    else:
+        replicas = map_in_pool(run_replica, [params] * num_replicas, seeds, workers=workers)
+
+    return {
+        'num_replicas': num_replicas,
+        'seed': entropy.entropy,
+        'workers': workers,
+        'wall_time_seconds': round(time.perf_counter() - started, 3),
+        'distributions': {
+            metric: summarize([replica[metric] for replica in replicas]) for metric in REPLICA_METRICS
+        },
+        'replicas': replicas
+    }
@@ -0,0 +1,176 @@
+"""
+Move Log - bounded columnar record of applied redistribution moves
+"""
+
+import io
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+DEFAULT_RETENTION = int(os.environ.get('SIMULATION_HISTORY_RETENTION', 100000))  # moves kept per engine
+COLUMNS = ('iteration', 'from_tower', 'to_tower', 'users_moved')
+
+
+class MoveLog:
+    """Ring buffer of moves stored as integer columns.
+
+    Timestamps are ``time.monotonic_ns()`` values, so appending never formats
+    dates; they are converted to wall-clock time only on export. Once
+    ``retention`` moves are stored the oldest are overwritten (None keeps
+    everything; zero or negative is rejected). Storage starts small and
+    doubles up to the retention.
+    """
+
+    def __init__(self, retention: Optional[int] = DEFAULT_RETENTION):
+        if retention is not None and not retention > 0:
+            raise ValueError("retention must be a positive number of moves, or None to keep every move")
+        self.retention = retention
+        self.total_logged = 0  # including moves already dropped
+        self._wall_offset_ns = time.time_ns() - time.monotonic_ns()
+        self._start = 0
+        self._size = 0
+        self._allocate(1024 if retention is None else min(retention, 1024))
+
+    def _allocate(self, capacity: int):
+        ordered = self._ordered_columns() if self._size else None
+        self._columns = {name: np.zeros(capacity, dtype=np.int32) for name in COLUMNS}
+        self._columns['timestamp_ns'] = np.zeros(capacity, dtype=np.int64)
+        if ordered is not None:
+            for name, values in ordered.items():
+                self._columns[name][:self._size] = values
+        self._start = 0
+
+    @property
+    def _capacity(self) -> int:
+        return len(self._columns['timestamp_ns'])
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+    def append(self, iteration: int, from_tower: int, to_tower: int, users_moved: int):
+        """Log one move"""
+        self.extend([iteration], [from_tower], [to_tower], [users_moved])
+
+    def extend(self, iteration, from_tower, to_tower, users_moved, timestamp_ns: Optional[np.ndarray] = None):
+        """Log many moves at once (columns of equal length)"""
+        count = len(iteration)
+        if count == 0:
+            return
+        values = {
+            'iteration': iteration, 'from_tower': from_tower, 'to_tower': to_tower, 'users_moved': users_moved,
+            'timestamp_ns': time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        }
+        if self.retention is not None and count > self.retention:
+            # Only the newest `retention` entries can survive
+            skip = count - self.retention
+            values = {name: np.broadcast_to(v, count)[skip:] for name, v in values.items()}
+            self.total_logged += skip
+            count = self.retention
+
+        needed = self._size + count
+        if needed > self._capacity and (self.retention is None or self._capacity < self.retention):
+            capacity = self._capacity
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity if self.retention is None else min(capacity, self.retention))
+
+        positions = (self._start + self._size + np.arange(count)) % self._capacity
+        for name, column in self._columns.items():
+            column[positions] = values[name]
+        overflow = max(self._size + count - self._capacity, 0)
+        self._start = (self._start + overflow) % self._capacity
+        self._size = min(self._size + count, self._capacity)
+        self.total_logged += count
+
+    def _ordered_columns(self) -> Dict[str, np.ndarray]:
+        order = (self._start + np.arange(self._size)) % self._capacity
+        return {name: column[order] for name, column in self._columns.items()}
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Retained moves oldest first, with wall-clock ``timestamp_ns`` (ns since the epoch)"""
+        ordered = self._ordered_columns()
+        ordered['timestamp_ns'] = ordered['timestamp_ns'] + self._wall_offset_ns
+        return ordered
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray],
+                     retention: Optional[int] = DEFAULT_RETENTION) -> 'MoveLog':
+        """Rebuild a log from columns() output, e.g. a restored snapshot"""
+        log = cls(retention)
+        log.extend(*(columns[name] for name in COLUMNS),
+                   timestamp_ns=np.asarray(columns['timestamp_ns'], dtype=np.int64) - log._wall_offset_ns)
+        return log
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retained moves as dicts (the old redistribution_history entry format)"""
+        columns = {name: values[start:stop] for name, values in self.columns().items()}
+        timestamps = np.datetime_as_string(columns['timestamp_ns'].astype('datetime64[ns]'), unit='us')
+        return [
+            {
+                'iteration': iteration,
+                'from_tower': from_tower,
+                'to_tower': to_tower,
+                'users_moved': users_moved,
+                'timestamp': timestamp
+            }
+            for iteration, from_tower, to_tower, users_moved, timestamp in zip(
+                *(columns[name].tolist() for name in COLUMNS), timestamps.tolist())
+        ]
+
+    def latest(self, count: int) -> List[Dict[str, Any]]:
+        """The `count` most recent retained moves, oldest first"""
+        if count < 0:
+            raise ValueError(f"count must not be negative, got {count}")
+        return self.records(max(len(self) - count, 0))
+
+    def to_csv(self) -> str:
+        """Retained moves as CSV text"""
+        columns = self.columns()
+        buffer = io.StringIO()
+        np.savetxt(buffer, np.column_stack([columns[name] for name in COLUMNS + ('timestamp_ns',)]),
+                   fmt='%d', delimiter=',', header=','.join(COLUMNS + ('timestamp_ns',)), comments='')
+        return buffer.getvalue()
+
+    def pair_totals(self, limit: Optional[int] = None) -> List[Dict[str, int]]:
+        """Users moved per (from_tower, to_tower) pair, largest first"""
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must not be negative, got {limit}")
+        columns = self._ordered_columns()
+        pairs = (columns['from_tower'].astype(np.int64) << 32) | columns['to_tower'].astype(np.int64)
+        unique, inverse = np.unique(pairs, return_inverse=True)
+        users = np.bincount(inverse, weights=columns['users_moved'], minlength=len(unique)).astype(np.int64)
+        moves = np.bincount(inverse, minlength=len(unique))
+        order = np.argsort(-users, kind='stable')[:limit]
+        return [
+            {
+                'from_tower': int(unique[i] >> 32),
+                'to_tower': int(unique[i] & 0xFFFFFFFF),
+                'users_moved': int(users[i]),
+                'moves': int(moves[i])
+            }
+            for i in order
+        ]
+
+    def moves_over_time(self, bucket_seconds: float = 60.0) -> List[Dict[str, Any]]:
+        """Users moved per time bucket (wall-clock bucket start)"""
+        if not bucket_seconds >= 1e-9 or not np.isfinite(bucket_seconds):
+            raise ValueError(f"bucket_seconds must be a positive number of seconds, got {bucket_seconds}")
+        if self._size == 0:
+            return []
+        columns = self.columns()
+        bucket_ns = int(bucket_seconds * 1e9)
+        buckets = columns['timestamp_ns'] // bucket_ns
+        unique, inverse = np.unique(buckets, return_inverse=True)
+        users = np.bincount(inverse, weights=columns['users_moved'], minlength=len(unique)).astype(np.int64)
+        moves = np.bincount(inverse, minlength=len(unique))
+        starts = np.datetime_as_string((unique * bucket_ns).astype('datetime64[ns]'), unit='s')
+        return [
+            {'bucket_start': start, 'users_moved': total, 'moves': count}
+            for start, total, count in zip(starts.tolist(), users.tolist(), moves.tolist())
+        ]
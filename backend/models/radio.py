@@ -0,0 +1,148 @@
+"""
+Radio Model - vectorized path loss, interference, SINR, throughput and latency for simulated users
+"""
+
+from typing import Dict, Any, List
+
+import numpy as np
+
+from models.spatial_index import haversine_m
+
+EIRP_DBM = 63.0                # 46 dBm transmitter + 17 dBi sector antenna
+PATHLOSS_AT_1KM_DB = 128.1     # 3GPP macro-cell model: 128.1 + 37.6 log10(d_km)
+PATHLOSS_SLOPE_DB = 37.6
+MIN_DISTANCE_M = 35.0          # path loss is flat closer than this
+NOISE_DBM = -94.0              # thermal noise over 20 MHz plus a 7 dB noise figure
+RSRP_OFFSET_DB = 30.8          # total power spread over 1200 subcarriers
+BANDWIDTH_MHZ = 20.0
+SHANNON_ATTENUATION = 0.6      # practical share of the Shannon bound
+MAX_SPECTRAL_EFFICIENCY = 4.4  # bit/s/Hz (64QAM ceiling)
+MIN_SINR_DB = -10.0            # no throughput below this
+BASE_LATENCY_MS = 20.0
+QUEUE_LATENCY_MS = 10.0        # scaled by rho / (1 - rho)
+RETRANSMISSION_LATENCY_MS = 8.0
+MAX_UTILIZATION = 0.95
+USAGE_DEMAND_MBPS = np.array([0.1, 2.0, 5.0])  # call, data, video
+
+
+def received_power_dbm(distance_m) -> np.ndarray:
+    """Received power from a tower at `distance_m` (log-distance path loss)"""
+    distance_km = np.maximum(np.asarray(distance_m, dtype=np.float64), MIN_DISTANCE_M) / 1000
+    return EIRP_DBM - (PATHLOSS_AT_1KM_DB + PATHLOSS_SLOPE_DB * np.log10(distance_km))
+
+
+def spectral_efficiency(sinr_db) -> np.ndarray:
+    """Attenuated, capped Shannon bound in bit/s/Hz"""
+    sinr_db = np.asarray(sinr_db, dtype=np.float64)
+    efficiency = SHANNON_ATTENUATION * np.log2(1 + 10 ** (sinr_db / 10))
+    return np.where(sinr_db < MIN_SINR_DB, 0.0, np.minimum(efficiency, MAX_SPECTRAL_EFFICIENCY))
+
+
+def cell_throughput_mbps(sinr_db) -> np.ndarray:
+    """Throughput of a whole carrier at a given SINR"""
+    return BANDWIDTH_MHZ * spectral_efficiency(sinr_db)
+
+
+def latency_ms(utilization, sinr_db=None) -> np.ndarray:
+    """Queueing latency growing with load, plus retransmissions at poor SINR"""
+    rho = np.clip(np.asarray(utilization, dtype=np.float64), 0.0, MAX_UTILIZATION)
+    latency = BASE_LATENCY_MS + QUEUE_LATENCY_MS * rho / (1 - rho)
+    if sinr_db is not None:
+        latency = latency + RETRANSMISSION_LATENCY_MS / (1 + 10 ** (np.asarray(sinr_db) / 10))
+    return latency
+
+
+def user_metrics(columns: Dict[str, np.ndarray], index) -> Dict[str, np.ndarray]:
+    """Radio metrics of every connected user.
+
+    The serving tower is the signal; every other active tower of the same
+    operator whose coverage reaches the user interferes in proportion to its
+    load. Throughput is the serving carrier's rate shared equally among its
+    users.
+    """
+    users = np.flatnonzero(columns['user_tower'] >= 0)
+    serving = columns['user_tower'][users].astype(np.int64)
+    lat, lng = columns['user_lat'][users], columns['user_lng'][users]
+    tower_lat, tower_lng = columns['tower_lat'], columns['tower_lng']
+    load = columns['tower_load'].astype(np.float64)
+    capacity = columns['tower_capacity'].astype(np.float64)
+    activity = np.where(columns['tower_active'], np.minimum(load / np.maximum(capacity, 1), 1.0), 0.0)
+    operator = columns['tower_operator']
+
+    rsrp = received_power_dbm(haversine_m(lat, lng, tower_lat[serving], tower_lng[serving]))
+    interference_mw = np.zeros(len(users))
+    for rows, towers, distances in index.iter_candidates(lat, lng):
+        safe = np.maximum(towers, 0)
+        interferer = ((towers >= 0) & (towers != serving[rows, None])
+                      & (operator[safe] == operator[serving[rows]][:, None]))
+        power_mw = 10 ** (received_power_dbm(distances) / 10) * activity[safe]
+        interference_mw[rows] = np.where(interferer, power_mw, 0.0).sum(axis=1)
+
+    noise_mw = 10 ** (NOISE_DBM / 10)
+    sinr = rsrp - 10 * np.log10(interference_mw + noise_mw)
+    sharing = np.maximum(load[serving], 1)
+    throughput = cell_throughput_mbps(sinr) / sharing
+    return {
+        'user': users,
+        'tower': serving,
+        'rsrp_dbm': rsrp - RSRP_OFFSET_DB,
+        'sinr_db': sinr,
+        'throughput_mbps': throughput,
+        'latency_ms': latency_ms(load[serving] / np.maximum(capacity[serving], 1), sinr),
+        'satisfied': throughput >= USAGE_DEMAND_MBPS[columns['user_usage'][users]]
+    }
+
+
+def tower_metrics(columns: Dict[str, np.ndarray], metrics: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Per-tower averages of user metrics (towers without users get NaN SINR/RSRP)"""
+    num_towers = len(columns['tower_lat'])
+    tower = metrics['tower']
+    users = np.bincount(tower, minlength=num_towers)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = {name: np.bincount(tower, weights=metrics[name], minlength=num_towers) / users
+                for name in ('rsrp_dbm', 'sinr_db')}
+    utilization = columns['tower_load'] / np.maximum(columns['tower_capacity'], 1)
+    return {
+        'active_users': users,
+        'load_percentage': utilization * 100,
+        'rsrp_dbm': mean['rsrp_dbm'],
+        'sinr_db': mean['sinr_db'],
+        'throughput_mbps': np.bincount(tower, weights=metrics['throughput_mbps'], minlength=num_towers),
+        'latency_ms': latency_ms(utilization)
+    }
+
+
+def tower_records(columns: Dict[str, np.ndarray], metrics: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Per-tower KPIs with the field names of the TRC real-time feed"""
+    per_tower = tower_metrics(columns, metrics)
+    rounded = {name: np.round(values, 1).tolist() for name, values in per_tower.items() if name != 'active_users'}
+    return [
+        {
+            'cell_id': cell_id,
+            'active_users': active_users,
+            'load_percentage': rounded['load_percentage'][cell_id],
+            'rsrp': None if np.isnan(rounded['rsrp_dbm'][cell_id]) else rounded['rsrp_dbm'][cell_id],
+            'sinr': None if np.isnan(rounded['sinr_db'][cell_id]) else rounded['sinr_db'][cell_id],
+            'throughput_mbps': rounded['throughput_mbps'][cell_id],
+            'latency_ms': rounded['latency_ms'][cell_id]
+        }
+        for cell_id, active_users in enumerate(per_tower['active_users'].tolist())
+    ]
+
+
+def network_kpis(metrics: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Network-wide KPIs over connected users"""
+    if len(metrics['user']) == 0:
+        return {'connected_users': 0}
+    throughput = metrics['throughput_mbps']
+    p5, median = np.percentile(throughput, [5, 50])
+    return {
+        'connected_users': len(throughput),
+        'average_throughput_mbps': round(float(throughput.mean()), 2),
+        'median_throughput_mbps': round(float(median), 2),
+        'cell_edge_throughput_mbps': round(float(p5), 2),
+        'total_throughput_mbps': round(float(throughput.sum()), 1),
+        'average_sinr_db': round(float(metrics['sinr_db'].mean()), 1),
+        'average_latency_ms': round(float(metrics['latency_ms'].mean()), 1),
+        'satisfied_users_percentage': round(float(metrics['satisfied'].mean()) * 100, 1)
+    }
@@ -0,0 +1,532 @@
+"""
+Redistribution Planners - compute user move plans from tower load arrays
+"""
+
+import heapq
+import importlib.util
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from models.columnar import OPERATORS
+from models.spatial_index import haversine_m
+from models.worker_pool import map_in_pool, worker_count
+
+logger = logging.getLogger(__name__)
+
+CONGESTED_THRESHOLD = 80.0  # percent load above which a tower sheds users
+RECEIVER_THRESHOLD = 70.0   # percent load below which a tower accepts users
+COST_BLOCK_CELLS = 2000000  # donor x receiver costs evaluated per block
+PARALLEL_MIN_TOWERS = 2000  # below this, partitions are planned in-process
+
+
+class Move(NamedTuple):
+    """Move `count` users from one tower to another"""
+    from_tower: int
+    to_tower: int
+    count: int
+
+
+def load_limits(capacity: np.ndarray,
+                donor_threshold: float = CONGESTED_THRESHOLD,
+                receiver_threshold: float = RECEIVER_THRESHOLD,
+                active: Optional[np.ndarray] = None):
+    """Integer load bounds matching the percentage thresholds.
+
+    A tower is a donor while load > donor_floor and a receiver while
+    load < receiver_ceiling. Towers out of service (active False) never receive.
+    """
+    capacity = np.asarray(capacity, dtype=np.float64)
+    donor_floor = np.floor(capacity * donor_threshold / 100).astype(np.int64)
+    receiver_ceiling = np.ceil(capacity * receiver_threshold / 100).astype(np.int64)
+    if active is not None:
+        receiver_ceiling = np.where(active, receiver_ceiling, 0)
+    return donor_floor, receiver_ceiling
+
+
+def prediction_array(predictions: Optional[Dict[int, float]], load: np.ndarray) -> np.ndarray:
+    """Align a {tower_id: predicted_load} dict with tower indices, defaulting to current load"""
+    predicted = np.asarray(load, dtype=np.float64).copy()
+    if predictions:
+        ids = np.fromiter(predictions.keys(), dtype=np.int64, count=len(predictions))
+        values = np.fromiter(predictions.values(), dtype=np.float64, count=len(predictions))
+        valid = (ids >= 0) & (ids < len(predicted))
+        predicted[ids[valid]] = values[valid]
+    return predicted
+
+
+class Rebalancer(ABC):
+    """Base class for redistribution planners"""
+
+    name = 'base'
+
+    def __init__(self,
+                 donor_threshold: float = CONGESTED_THRESHOLD,
+                 receiver_threshold: float = RECEIVER_THRESHOLD):
+        self.donor_threshold = donor_threshold
+        self.receiver_threshold = receiver_threshold
+
+    @abstractmethod
+    def plan(self, load: np.ndarray, capacity: np.ndarray, **context) -> List[Move]:
+        """Return the moves to apply, given current load and capacity per tower.
+
+        Context may carry tower ``lat``/``lng``, ``predictions``, an ``active``
+        mask of towers in service and each tower's ``operator`` code.
+        """
+
+
+class HeapRebalancer(Rebalancer):
+    """Greedy rebalancing driven by a max-load donor heap and a min-load receiver heap.
+
+    Each step pairs the most loaded donor with the least loaded receiver and moves
+    as many users as one of them can take, so every step retires a tower from one
+    heap and the loop runs to convergence in at most donors + receivers steps.
+    """
+
+    name = 'heap'
+
+    def plan(self, load: np.ndarray, capacity: np.ndarray, active: Optional[np.ndarray] = None,
+             **context) -> List[Move]:
+        donor_floor, receiver_ceiling = load_limits(capacity, self.donor_threshold, self.receiver_threshold, active)
+        room = receiver_ceiling - np.asarray(load, dtype=np.int64)
+        return self._pair(load, capacity, donor_floor, room)
+
+    def _receiver_key(self, load: float, room: int, capacity: float) -> float:
+        """Heap key of a receiver (smallest is served first): current load percentage"""
+        return load / capacity
+
+    def _pair(self, load: np.ndarray, capacity: np.ndarray, donor_floor: np.ndarray,
+              room: np.ndarray) -> List[Move]:
+        """Greedily pair donors with receivers; `room` is how many users each tower may still take"""
+        load = np.asarray(load, dtype=np.int64).tolist()
+        capacity = np.asarray(capacity, dtype=np.float64).tolist()
+        donor_floor = donor_floor.tolist()
+        room = room.tolist()
+        key = self._receiver_key
+
+        donors = [(-load[i] / capacity[i], i) for i in range(len(load)) if load[i] > donor_floor[i]]
+        receivers = [(key(load[i], room[i], capacity[i]), i) for i in range(len(load)) if room[i] > 0]
+        heapq.heapify(donors)
+        heapq.heapify(receivers)
+
+        moves = []
+        while donors and receivers:
+            _, donor = heapq.heappop(donors)
+            _, receiver = heapq.heappop(receivers)
+
+            count = min(load[donor] - donor_floor[donor], room[receiver])
+            load[donor] -= count
+            load[receiver] += count
+            room[receiver] -= count
+            moves.append(Move(donor, receiver, count))
+
+            # Towers never switch roles, so only the side that still has slack goes back
+            if load[donor] > donor_floor[donor]:
+                heapq.heappush(donors, (-load[donor] / capacity[donor], donor))
+            if room[receiver] > 0:
+                heapq.heappush(receivers, (key(load[receiver], room[receiver], capacity[receiver]), receiver))
+
+        return moves
+
+
+def forecast_matrix(predictions: Optional[Dict[int, Any]], load: np.ndarray, horizon: int) -> np.ndarray:
+    """Predicted load per tower and step (towers x horizon).
+
+    A prediction is either one load, reached linearly by the end of the
+    horizon, or a sequence of per-step loads (padded with its last value).
+    Towers without a prediction keep their current load.
+    """
+    load = np.asarray(load, dtype=np.float64)
+    predictions = predictions or {}
+    sequences = {i: v for i, v in predictions.items() if isinstance(v, (list, tuple, np.ndarray))}
+    scalars = {i: v for i, v in predictions.items() if i not in sequences} if sequences else predictions
+    ramp = np.arange(1, horizon + 1, dtype=np.float64) / horizon
+    forecast = load[:, None] + (prediction_array(scalars, load) - load)[:, None] * ramp
+
+    for tower_id, values in sequences.items():
+        if not 0 <= tower_id < len(load) or len(values) == 0:
+            continue
+        values = np.asarray(values, dtype=np.float64)[:horizon]
+        forecast[tower_id, :len(values)] = values
+        forecast[tower_id, len(values):] = values[-1]
+    return forecast
+
+
+def predicted_headroom(load: np.ndarray, capacity: np.ndarray, forecast: np.ndarray,
+                       receiver_threshold: float = RECEIVER_THRESHOLD,
+                       active: Optional[np.ndarray] = None) -> np.ndarray:
+    """Users each tower can take without crossing the receiver threshold now or at any forecast step"""
+    _, receiver_ceiling = load_limits(capacity, receiver_threshold=receiver_threshold, active=active)
+    peak = np.maximum(np.asarray(load, dtype=np.float64), forecast.max(axis=1, initial=-np.inf))
+    return np.maximum(receiver_ceiling - np.ceil(peak).astype(np.int64), 0)
+
+
+class LookaheadRebalancer(HeapRebalancer):
+    """Heap rebalancing that picks receivers by predicted headroom over a horizon.
+
+    A receiver's room is what it can absorb before its *forecast peak* reaches
+    the receiver threshold, so towers about to peak take no users even if they
+    are lightly loaded now. Receivers with the most predicted headroom (as a
+    share of capacity) are served first.
+    """
+
+    name = 'lookahead'
+
+    def __init__(self,
+                 donor_threshold: float = CONGESTED_THRESHOLD,
+                 receiver_threshold: float = RECEIVER_THRESHOLD,
+                 horizon: int = 3):
+        super().__init__(donor_threshold, receiver_threshold)
+        self.horizon = horizon
+
+    def plan(self, load: np.ndarray, capacity: np.ndarray, predictions: Optional[Dict[int, Any]] = None,
+             active: Optional[np.ndarray] = None, **context) -> List[Move]:
+        donor_floor, _ = load_limits(capacity, self.donor_threshold, self.receiver_threshold, active)
+        forecast = forecast_matrix(predictions, load, self.horizon)
+        room = predicted_headroom(load, capacity, forecast, self.receiver_threshold, active)
+        return self._pair(load, capacity, donor_floor, room)
+
+    def _receiver_key(self, load: float, room: int, capacity: float) -> float:
+        return -room / capacity
+
+
+class MinCostFlowRebalancer(Rebalancer):
+    """Optimal rebalancing as a transportation problem solved in one shot.
+
+    Sources are donor towers supplying their excess load, sinks are receivers
+    offering their headroom. Moving a user from d to r costs
+    ``distance_weight * km(d, r) + prediction_weight * predicted_load_pct(r)``.
+    Every donor also has a dummy edge with cost ``unmet_penalty`` so the problem
+    stays feasible when headroom runs out; the LP therefore moves as many users
+    as possible and, among those plans, picks the cheapest.
+
+    With ``operator`` and ``pair_cost`` (an operators x operators matrix, inf
+    where no move is allowed) every user moved from operator a to operator b
+    also costs ``pair_cost[a, b]``, and ``hosting_quota`` caps the users each
+    operator takes from other operators; OperatorRebalancer uses these to
+    price roaming.
+
+    To scale to thousands of towers each donor is connected only to its
+    ``max_receivers_per_donor`` cheapest receivers; the plan is optimal over that
+    edge set (pass None for the exact optimum over all pairs).
+
+    The constraint matrix is totally unimodular, so the simplex vertex returned
+    by HiGHS is already integral. Requires scipy.
+    """
+
+    name = 'optimal'
+
+    def __init__(self,
+                 donor_threshold: float = CONGESTED_THRESHOLD,
+                 receiver_threshold: float = RECEIVER_THRESHOLD,
+                 distance_weight: float = 1.0,
+                 prediction_weight: float = 0.5,
+                 unmet_penalty: float = 1e6,
+                 max_receivers_per_donor: Optional[int] = 50):
+        super().__init__(donor_threshold, receiver_threshold)
+        self.distance_weight = distance_weight
+        self.prediction_weight = prediction_weight
+        self.unmet_penalty = unmet_penalty
+        self.max_receivers_per_donor = max_receivers_per_donor
+
+    def edge_costs(self, donors: np.ndarray, receivers: np.ndarray, lat: Optional[np.ndarray],
+                   lng: Optional[np.ndarray], predicted_pct: np.ndarray,
+                   operator: Optional[np.ndarray] = None, pair_cost: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-user cost matrix (donors x receivers); inf where pair_cost forbids the move"""
+        cost = np.broadcast_to(self.prediction_weight * predicted_pct[receivers],
+                               (len(donors), len(receivers))).copy()
+        if lat is not None and lng is not None:
+            distance_km = haversine_m(lat[donors][:, None], lng[donors][:, None],
+                                      lat[receivers][None, :], lng[receivers][None, :]) / 1000
+            cost += self.distance_weight * distance_km
+        if pair_cost is not None:
+            cost += pair_cost[operator[donors][:, None], operator[receivers][None, :]]
+        return cost
+
+    def plan(self, load: np.ndarray, capacity: np.ndarray, lat: Optional[np.ndarray] = None,
+             lng: Optional[np.ndarray] = None, predictions: Optional[Dict[int, float]] = None,
+             active: Optional[np.ndarray] = None, operator: Optional[np.ndarray] = None,
+             pair_cost: Optional[np.ndarray] = None, hosting_quota: Optional[Dict[int, int]] = None,
+             **context) -> List[Move]:
+        try:
+            from scipy.optimize import linprog
+            from scipy.sparse import coo_matrix, vstack
+        except ImportError:
+            logger.warning("⚠️ scipy غير مثبت. يتم استخدام إعادة التوزيع بالكومة بدلاً من الحل الأمثل")
+            return self._fallback(load, capacity, active, pair_cost)
+
+        load = np.asarray(load, dtype=np.int64)
+        capacity = np.asarray(capacity, dtype=np.int64)
+        donor_floor, receiver_ceiling = load_limits(capacity, self.donor_threshold, self.receiver_threshold, active)
+        donors = np.flatnonzero(load > donor_floor)
+        receivers = np.flatnonzero(load < receiver_ceiling)
+        if len(donors) == 0 or len(receivers) == 0:
+            return []
+
+        supply = load[donors] - donor_floor[donors]
+        headroom = receiver_ceiling[receivers] - load[receivers]
+        predicted_pct = prediction_array(predictions, load) * 100.0 / capacity
+
+        # Sparse edge set: each donor only connects to its cheapest receivers.
+        # Costs are built a block of donors at a time to bound memory.
+        k = self.max_receivers_per_donor
+        width = len(receivers) if k is None else min(k, len(receivers))
+        block = max(1, COST_BLOCK_CELLS // len(receivers))
+        edge_donor, edge_receiver, edge_cost = [], [], []
+        for start in range(0, len(donors), block):
+            rows = np.arange(start, min(start + block, len(donors)))
+            cost = self.edge_costs(donors[rows], receivers, lat, lng, predicted_pct, operator, pair_cost)
+            if width < len(receivers):
+                columns = np.argpartition(cost, width - 1, axis=1)[:, :width]
+            else:
+                columns = np.broadcast_to(np.arange(len(receivers)), cost.shape)
+            edge_donor.append(np.repeat(rows, width))
+            edge_receiver.append(columns.ravel())
+            edge_cost.append(np.take_along_axis(cost, columns, axis=1).ravel())
+        edge_donor = np.concatenate(edge_donor)
+        edge_receiver = np.concatenate(edge_receiver)
+        edge_cost = np.concatenate(edge_cost)
+        allowed = np.isfinite(edge_cost)
+        edge_donor, edge_receiver, edge_cost = edge_donor[allowed], edge_receiver[allowed], edge_cost[allowed]
+        if len(edge_cost) == 0:
+            return []
+
+        n_edges = len(edge_cost)
+        n_donors = len(donors)
+        # Variables: [edge flows..., unmet supply per donor]
+        objective = np.concatenate([edge_cost, np.full(n_donors, self.unmet_penalty)])
+        supply_rows = coo_matrix(
+            (np.ones(n_edges + n_donors),
+             (np.concatenate([edge_donor, np.arange(n_donors)]), np.arange(n_edges + n_donors))),
+            shape=(n_donors, n_edges + n_donors)
+        )
+        headroom_rows = coo_matrix(
+            (np.ones(n_edges), (edge_receiver, np.arange(n_edges))),
+            shape=(len(receivers), n_edges + n_donors)
+        )
+        limit_rows, limits = headroom_rows, headroom
+        if hosting_quota and operator is not None:
+            # One row per capped operator: the users it takes from other operators. When every edge
+            # crosses operators (roaming), receiver rows nest inside these, so the vertex stays integral
+            codes = np.array(list(hosting_quota), dtype=np.int64)
+            host = operator[receivers[edge_receiver]]
+            guest = host != operator[donors[edge_donor]]
+            edge, row = np.nonzero(guest[:, None] & (host[:, None] == codes[None, :]))
+            quota_rows = coo_matrix((np.ones(len(edge)), (row, edge)), shape=(len(codes), n_edges + n_donors))
+            limit_rows = vstack([headroom_rows, quota_rows])
+            limits = np.concatenate([headroom, list(hosting_quota.values())])
+
+        result = linprog(
+            objective,
+            A_ub=limit_rows.tocsr(), b_ub=limits,
+            A_eq=supply_rows.tocsr(), b_eq=supply,
+            bounds=(0, None), method='highs'
+        )
+        if not result.success:
+            logger.error(f"❌ فشل حل مسألة التوزيع الأمثل: {result.message}")
+            return self._fallback(load, capacity, active, pair_cost)
+
+        flow = np.rint(result.x[:n_edges]).astype(np.int64)
+        used = np.flatnonzero(flow > 0)
+        return [
+            Move(int(donors[edge_donor[e]]), int(receivers[edge_receiver[e]]), int(flow[e]))
+            for e in used
+        ]
+
+    def _fallback(self, load: np.ndarray, capacity: np.ndarray, active: Optional[np.ndarray],
+                  pair_cost: Optional[np.ndarray]) -> List[Move]:
+        """Heap plan when the LP is unavailable; none when operator pair costs restrict the moves"""
+        if pair_cost is not None:
+            return []
+        return HeapRebalancer(self.donor_threshold, self.receiver_threshold).plan(load, capacity, active)
+
+
+def _operator_code(operator) -> int:
+    """Operator index from a name in OPERATORS or an index"""
+    if isinstance(operator, str):
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown operator: {operator}")
+        return OPERATORS.index(operator)
+    if not 0 <= int(operator) < len(OPERATORS):
+        raise ValueError(f"Unknown operator: {operator}")
+    return int(operator)
+
+
+def _subset_predictions(predictions: Optional[Dict[int, Any]], towers: np.ndarray) -> Dict[int, Any]:
+    """Re-key {tower_id: prediction} onto positions within `towers`"""
+    if not predictions:
+        return {}
+    return {local: predictions[tower] for local, tower in enumerate(towers.tolist()) if tower in predictions}
+
+
+def _plan_partition(strategy: str, options: Dict[str, Any], towers: np.ndarray, load: np.ndarray,
+                    capacity: np.ndarray, context: Dict[str, Any]) -> List[Move]:
+    """Plan one tower subset with a fresh planner; module level so worker processes can unpickle it"""
+    plan = get_rebalancer(strategy, **options).plan(load, capacity, **context)
+    return [Move(int(towers[move.from_tower]), int(towers[move.to_tower]), move.count) for move in plan]
+
+
+class OperatorRebalancer(Rebalancer):
+    """Operator-aware rebalancing over per-operator partitions.
+
+    Each operator's towers are rebalanced on their own with the ``base``
+    planner, so users never leave their operator by default. The partitions
+    share no towers, so they are planned in parallel on the shared worker pool
+    once the network has ``PARALLEL_MIN_TOWERS`` towers.
+
+    Load an operator cannot absorb may then roam under ``roaming`` agreements,
+    given as ``(home, partner, cost)`` tuples or ``{'home', 'partner', 'cost'}``
+    dicts (operators by name or index); agreements are directional. ``quotas``
+    caps the users each operator hosts for other operators per plan.
+
+    With the 'optimal' base all agreements are priced in one min-cost flow:
+    each roaming user costs the agreement's ``cost`` on top of the usual
+    distance and predicted-load terms (cost 1.0 weighs like 1 km), so users
+    roam to the partner and tower that is cheapest overall. The heap-based
+    planners have no per-move costs; with them agreements are tried cheapest
+    first on the load left after the previous ones.
+    """
+
+    name = 'operator'
+
+    def __init__(self,
+                 donor_threshold: float = CONGESTED_THRESHOLD,
+                 receiver_threshold: float = RECEIVER_THRESHOLD,
+                 base: str = 'heap',
+                 roaming: Optional[List[Any]] = None,
+                 quotas: Optional[Dict[Any, int]] = None,
+                 max_workers: Optional[int] = None,
+                 base_options: Optional[Dict[str, Any]] = None):
+        super().__init__(donor_threshold, receiver_threshold)
+        if base not in REBALANCERS or base == self.name:
+            raise ValueError(f"Unknown base strategy for operator partitions: {base}")
+        self.base = base
+        self.base_options = dict(base_options or {},
+                                 donor_threshold=donor_threshold, receiver_threshold=receiver_threshold)
+        self.roaming = sorted((self._agreement(a) for a in roaming or []), key=lambda a: a[2])
+        self.quotas = {_operator_code(op): int(quota) for op, quota in (quotas or {}).items()}
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _agreement(agreement) -> Tuple[int, int, float]:
+        if isinstance(agreement, dict):
+            agreement = (agreement['home'], agreement['partner'], agreement.get('cost', 1.0))
+        home, partner, cost = agreement
+        home, partner = _operator_code(home), _operator_code(partner)
+        if home == partner:
+            raise ValueError("A roaming agreement needs two different operators")
+        if not 0 <= float(cost) < float('inf'):
+            raise ValueError("A roaming cost must be finite and not negative")
+        return home, partner, float(cost)
+
+    def _context(self, towers: np.ndarray, lat, lng, predictions, active) -> Dict[str, Any]:
+        return {
+            'lat': None if lat is None else np.asarray(lat)[towers],
+            'lng': None if lng is None else np.asarray(lng)[towers],
+            'predictions': _subset_predictions(predictions, towers),
+            'active': active[towers]
+        }
+
+    def plan(self, load: np.ndarray, capacity: np.ndarray, operator: Optional[np.ndarray] = None,
+             lat: Optional[np.ndarray] = None, lng: Optional[np.ndarray] = None,
+             predictions: Optional[Dict[int, Any]] = None, active: Optional[np.ndarray] = None,
+             **context) -> List[Move]:
+        load = np.asarray(load, dtype=np.int64).copy()
+        capacity = np.asarray(capacity, dtype=np.int64)
+        if operator is None:
+            operator = np.zeros(len(load), dtype=np.int8)
+        active = np.ones(len(load), dtype=bool) if active is None else np.asarray(active, dtype=bool)
+
+        partitions = [np.flatnonzero(operator == code) for code in np.unique(operator).tolist()]
+        jobs = [(self.base, self.base_options, towers, load[towers], capacity[towers],
+                 self._context(towers, lat, lng, predictions, active)) for towers in partitions]
+        workers = worker_count(self.max_workers, len(jobs))
+        if workers > 1 and len(load) >= PARALLEL_MIN_TOWERS:
+            plans = map_in_pool(_plan_partition, *zip(*jobs), workers=workers)
+        else:
+            plans = [_plan_partition(*job) for job in jobs]
+        moves = [move for plan in plans for move in plan]
+        self._apply(load, moves)
+        if not self.roaming:
+            return moves
+        if self.base == MinCostFlowRebalancer.name and importlib.util.find_spec('scipy') is not None:
+            return moves + self._roam_priced(load, capacity, operator, lat, lng, predictions, active)
+
+        hosted = {}
+        for home, partner, _ in self.roaming:
+            quota = self.quotas.get(partner)
+            remaining = None if quota is None else quota - hosted.get(partner, 0)
+            if remaining is not None and remaining <= 0:
+                continue
+            towers = np.flatnonzero((operator == home) | (operator == partner))
+            context = self._context(towers, lat, lng, predictions, active)
+            context['active'] = context['active'] & (operator[towers] == partner)  # home towers only donate
+            plan = _plan_partition(self.base, self.base_options, towers, load[towers], capacity[towers], context)
+            plan = self._truncate([move for move in plan if operator[move.from_tower] == home], remaining)
+            self._apply(load, plan)
+            hosted[partner] = hosted.get(partner, 0) + sum(move.count for move in plan)
+            moves.extend(plan)
+        return moves
+
+    def _roam_priced(self, load: np.ndarray, capacity: np.ndarray, operator: np.ndarray,
+                     lat, lng, predictions, active) -> List[Move]:
+        """Roaming moves for all agreements at once, each user paying its agreement's cost"""
+        pair_cost = np.full((len(OPERATORS), len(OPERATORS)), np.inf)
+        for home, partner, cost in self.roaming:
+            pair_cost[home, partner] = min(pair_cost[home, partner], cost)
+        planner = MinCostFlowRebalancer(**self.base_options)
+        return planner.plan(load, capacity, lat=lat, lng=lng, predictions=predictions, active=active,
+                            operator=np.asarray(operator, dtype=np.int64), pair_cost=pair_cost,
+                            hosting_quota=self.quotas)
+
+    @staticmethod
+    def _apply(load: np.ndarray, moves: List[Move]):
+        for move in moves:
+            load[move.from_tower] -= move.count
+            load[move.to_tower] += move.count
+
+    @staticmethod
+    def _truncate(plan: List[Move], limit: Optional[int]) -> List[Move]:
+        """Keep the plan's first `limit` users (all of them when limit is None)"""
+        if limit is None:
+            return plan
+        kept = []
+        for move in plan:
+            if limit <= 0:
+                break
+            kept.append(Move(move.from_tower, move.to_tower, min(move.count, limit)))
+            limit -= kept[-1].count
+        return kept
+
+
+def plan_cost(plan: List[Move], load: np.ndarray, capacity: np.ndarray,
+              lat: Optional[np.ndarray] = None, lng: Optional[np.ndarray] = None,
+              predictions: Optional[Dict[int, float]] = None,
+              distance_weight: float = 1.0, prediction_weight: float = 0.5) -> float:
+    """Cost of a plan under the MinCostFlowRebalancer objective, for comparing planners"""
+    if not plan:
+        return 0.0
+    from_tower, to_tower, count = (np.array(column) for column in zip(*plan))
+    predicted_pct = prediction_array(predictions, load) * 100.0 / np.asarray(capacity, dtype=np.float64)
+    per_user = prediction_weight * predicted_pct[to_tower]
+    if lat is not None and lng is not None:
+        per_user = per_user + distance_weight * haversine_m(
+            lat[from_tower], lng[from_tower], lat[to_tower], lng[to_tower]) / 1000
+    return float((per_user * count).sum())
+
+
+REBALANCERS = {
+    HeapRebalancer.name: HeapRebalancer,
+    MinCostFlowRebalancer.name: MinCostFlowRebalancer,
+    LookaheadRebalancer.name: LookaheadRebalancer,
+    OperatorRebalancer.name: OperatorRebalancer,
+}
+
+
+def get_rebalancer(strategy: str, **kwargs) -> Rebalancer:
+    """Instantiate a planner by strategy name"""
+    if strategy not in REBALANCERS:
+        raise ValueError(f"Unknown redistribution strategy: {strategy}")
+    return REBALANCERS[strategy](**kwargs)
@@ -0,0 +1,265 @@
+"""
+Scenario Engine - compile catalogue scenarios into load profiles and replay them on a columnar network
+"""
+
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from models.clock import checked_minutes
+from models.columnar import CONSUMPTION_RANGES, STATUS_CONGESTED, STATUS_OVERLOADED, USAGE_TYPES
+from models.events import policy_interval
+from models.redistribution import get_rebalancer
+from models.spatial_index import points_in_disk
+
+# Catalogue: activity is the share of subscribers in session (baseline, peak);
+# usage_mix is the (call, data, video) mix at baseline and at peak; the shape
+# curve says how the scenario moves between the two over its duration.
+SCENARIOS = {
+    'rush_hour': {
+        'name': 'ساعة الذروة',
+        'description': 'محاكاة الحمل العالي في ساعات الذروة',
+        'duration': 30,
+        'expected_load': 'high',
+        'shape': 'peak',
+        'activity': (0.55, 0.95),
+        'usage_mix': ((0.3, 0.5, 0.2), (0.45, 0.35, 0.2)),
+        'hotspot': {'location': (31.9539, 35.9106), 'radius_m': 1500, 'share': 0.2}  # وسط البلد
+    },
+    'night_mode': {
+        'name': 'الليل',
+        'description': 'محاكاة الحمل المنخفض في الليل',
+        'duration': 60,
+        'expected_load': 'low',
+        'shape': 'decay',
+        'activity': (0.4, 0.12),
+        'usage_mix': ((0.3, 0.5, 0.2), (0.1, 0.4, 0.5)),
+        'hotspot': None
+    },
+    'event_coverage': {
+        'name': 'تغطية حدث',
+        'description': 'محاكاة حدث كبير يتطلب تغطية إضافية',
+        'duration': 45,
+        'expected_load': 'extreme',
+        'shape': 'plateau',
+        'activity': (0.6, 0.75),
+        'usage_mix': ((0.3, 0.5, 0.2), (0.15, 0.35, 0.5)),
+        'hotspot': {'location': (31.9866, 35.9018), 'radius_m': 1000, 'share': 0.3}  # استاد عمان الدولي
+    }
+}
+
+CATALOGUE_FIELDS = ('name', 'description', 'duration', 'expected_load')
+MAX_SCENARIO_STEPS = 10000  # profile rows one replay may compile and step through
+
+
+def _intensity(shape: str, minutes: np.ndarray, duration: float) -> np.ndarray:
+    """Scenario intensity in [0, 1] over time"""
+    phase = minutes / max(duration, 1e-9)
+    if shape == 'peak':
+        return np.sin(np.pi * phase)
+    if shape == 'decay':
+        return 1.0 - np.exp(-4.0 * phase)
+    if shape == 'plateau':
+        # Ramp up over the first fifth, hold, disperse over the last fifth
+        return np.clip(np.minimum(phase, 1.0 - phase) * 5.0, 0.0, 1.0)
+    raise ValueError(f"Unknown scenario shape: {shape}")
+
+
+class LoadProfile:
+    """Precomputed, read-only arrays describing a scenario step by step"""
+
+    def __init__(self, scenario_id: str, minutes: np.ndarray, activity: np.ndarray,
+                 usage_cdf: np.ndarray, hotspot_share: np.ndarray,
+                 hotspot_location: Optional[Tuple[float, float]], hotspot_radius_m: float):
+        self.scenario_id = scenario_id
+        self.minutes = minutes
+        self.activity = activity            # share of subscribers in session per step
+        self.usage_cdf = usage_cdf          # cumulative (call, data, video) mix per step
+        self.hotspot_share = hotspot_share  # share of subscribers at the hotspot per step
+        self.hotspot_location = hotspot_location
+        self.hotspot_radius_m = hotspot_radius_m
+        for array in (minutes, activity, usage_cdf, hotspot_share):
+            array.setflags(write=False)  # shared through the cache
+
+    @property
+    def num_steps(self) -> int:
+        return len(self.minutes)
+
+
+def compile_scenario(scenario_id: str, duration_minutes: Optional[float] = None,
+                     step_minutes: float = 1.0,
+                     hotspot_location: Optional[Tuple[float, float]] = None) -> LoadProfile:
+    """Compile a catalogue scenario into a LoadProfile, reusing a cached one when possible.
+
+    Raises ValueError for an unknown scenario, a duration or step that is not a
+    positive, finite number of minutes, or more than MAX_SCENARIO_STEPS steps.
+    """
+    if scenario_id not in SCENARIOS:
+        raise ValueError(f"Unknown scenario: {scenario_id}")
+    duration = checked_minutes('duration_minutes', duration_minutes or SCENARIOS[scenario_id]['duration'])
+    step_minutes = checked_minutes('step_minutes', step_minutes)
+    if duration / step_minutes > MAX_SCENARIO_STEPS:
+        raise ValueError(f"A scenario replay is limited to {MAX_SCENARIO_STEPS} steps")
+    location = tuple(float(v) for v in hotspot_location) if hotspot_location else None
+    return _compile(scenario_id, duration, step_minutes, location)
+
+
+@lru_cache(maxsize=64)
+def _compile(scenario_id: str, duration: float, step_minutes: float,
+             hotspot_location: Optional[Tuple[float, float]]) -> LoadProfile:
+    spec = SCENARIOS[scenario_id]
+    minutes = np.arange(0.0, duration + step_minutes / 2, step_minutes)
+    intensity = _intensity(spec['shape'], minutes, duration)
+
+    baseline, peak = spec['activity']
+    activity = baseline + (peak - baseline) * intensity
+    mix_start, mix_peak = (np.asarray(mix, dtype=np.float64) for mix in spec['usage_mix'])
+    mix = mix_start + (mix_peak - mix_start) * intensity[:, None]
+    usage_cdf = np.cumsum(mix / mix.sum(axis=1, keepdims=True), axis=1)
+
+    hotspot = spec['hotspot']
+    if hotspot:
+        location = tuple(hotspot_location or hotspot['location'])
+        hotspot_share = hotspot['share'] * intensity
+        radius = float(hotspot['radius_m'])
+    else:
+        location, hotspot_share, radius = None, np.zeros_like(minutes), 0.0
+
+    return LoadProfile(scenario_id, minutes, activity, usage_cdf, hotspot_share, location, radius)
+
+
+def scenario_catalogue() -> List[Dict[str, Any]]:
+    """Catalogue entries for the /scenarios endpoint"""
+    return [
+        {'id': scenario_id, **{field: spec[field] for field in CATALOGUE_FIELDS}}
+        for scenario_id, spec in SCENARIOS.items()
+    ]
+
+
+class ScenarioReplay:
+    """Replays a LoadProfile on a columnar SimulationEngine, one vectorized update per step.
+
+    Every subscriber draws fixed thresholds once, so moving along the profile
+    only flips the users whose threshold the curves cross: a user is in session
+    while its draw is below the activity level, at the hotspot while its draw
+    is below the hotspot share, and its usage type follows the mix CDF.
+    """
+
+    def __init__(self, engine, profile: LoadProfile,
+                 redistribution_interval: float = 5.0,
+                 strategy: str = 'heap'):
+        if engine.network is None:
+            raise ValueError("Scenario replay requires a columnar SimulationEngine")
+        self.engine = engine
+        self.profile = profile
+        self.redistribution_interval = policy_interval(redistribution_interval)
+        self.rebalancer = get_rebalancer(strategy)
+        self.timeline: List[Dict[str, Any]] = []
+        self.users_redistributed = 0
+
+    def run(self) -> Dict[str, Any]:
+        """Replay the whole profile and return the timeline"""
+        started = time.perf_counter()
+        engine, network, profile = self.engine, self.engine.network, self.profile
+        rng = engine.rng
+        n = network.num_users
+
+        # Per-user draws, fixed for the whole replay
+        activity_draw = rng.random(n)
+        hotspot_draw = rng.random(n)
+        usage_draw = rng.random(n)
+        consumption_draw = rng.random(n)
+        home_lat, home_lng = network.user_lat.copy(), network.user_lng.copy()
+        home_tower = network.user_tower.copy()
+        event_lat, event_lng = self._event_positions(rng, n)
+        # Coverage depends on position only, so it is resolved once per position set
+        index = engine.spatial_index
+        home_covered = index.covered(home_lat, home_lng)
+        event_covered = index.covered(event_lat, event_lng) if profile.hotspot_location else home_covered
+
+        at_hotspot = np.zeros(n, dtype=bool)
+        next_redistribution = self.redistribution_interval
+        for step in range(profile.num_steps):
+            minute = float(profile.minutes[step])
+            hotspot = hotspot_draw < profile.hotspot_share[step]
+            active = (activity_draw < profile.activity[step]) | hotspot
+
+            # Leave: sessions that ended, and users moving to or from the hotspot
+            moving = hotspot != at_hotspot
+            leaving = np.flatnonzero((network.user_tower >= 0) & (~active | moving))
+            network.move_users(leaving, -1)
+            if moving.any():
+                network.user_lat[:] = np.where(hotspot, event_lat, home_lat)
+                network.user_lng[:] = np.where(hotspot, event_lng, home_lng)
+                if network.tracker is not None:
+                    network.tracker.mark_users(np.flatnonzero(moving))
+                at_hotspot = hotspot
+
+            # Usage mix: only users whose type changes are rewritten
+            usage = np.searchsorted(profile.usage_cdf[step], usage_draw, side='right')
+            usage = np.minimum(usage, len(USAGE_TYPES) - 1).astype(np.int8)
+            switched = np.flatnonzero(usage != network.user_usage)
+            if len(switched):
+                low, high = CONSUMPTION_RANGES[usage[switched]].T
+                network.user_usage[switched] = usage[switched]
+                network.user_consumption[switched] = low + (high - low) * consumption_draw[switched]
+                if network.tracker is not None:
+                    network.tracker.mark_users(switched)
+
+            joining = np.flatnonzero(active & (network.user_tower < 0))
+            covered = np.where(hotspot, event_covered, home_covered)
+            blocked = len(joining) - self._connect(joining, hotspot, home_tower, covered)
+
+            if self.redistribution_interval and minute >= next_redistribution:
+                self.users_redistributed += engine.apply_moves(engine.plan_moves(self.rebalancer))
+                next_redistribution += self.redistribution_interval
+
+            counts = network.status_counts()
+            self.timeline.append({
+                'minute': round(minute, 3),
+                'active_users': int(network.tower_load.sum()),
+                'hotspot_users': int(hotspot.sum()),
+                'blocked_users': blocked,
+                'overloaded_towers': int(counts[STATUS_OVERLOADED]),
+                'congested_towers': int(counts[STATUS_CONGESTED])
+            })
+
+        return {
+            'scenario_id': profile.scenario_id,
+            'steps': profile.num_steps,
+            'users_redistributed': self.users_redistributed,
+            'wall_time_seconds': round(time.perf_counter() - started, 3),
+            'timeline': self.timeline
+        }
+
+    def _event_positions(self, rng: np.random.Generator, n: int):
+        """Uniform positions inside the hotspot disk, one per user"""
+        profile = self.profile
+        if profile.hotspot_location is None:
+            return self.engine.network.user_lat.copy(), self.engine.network.user_lng.copy()
+        return points_in_disk(rng, profile.hotspot_location, profile.hotspot_radius_m, n)
+
+    def _connect(self, joining: np.ndarray, hotspot: np.ndarray, home_tower: np.ndarray,
+                 covered: np.ndarray) -> int:
+        """Attach joining users: home tower first, else the nearest covering tower with room.
+
+        Returns how many were attached.
+        """
+        network = self.engine.network
+        at_home = joining[~hotspot[joining] & (home_tower[joining] >= 0)]
+        accepted = network.assign_within_capacity(at_home, home_tower[at_home])
+
+        remaining = np.concatenate([joining[hotspot[joining] | (home_tower[joining] < 0)], at_home[~accepted]])
+        remaining = remaining[covered[remaining]]
+        if len(remaining) == 0:
+            return int(accepted.sum())
+        # Users with no free tower anywhere near stay blocked without a full query
+        free = network.free_capacity()
+        index = self.engine.spatial_index
+        candidates = remaining[index.may_serve(network.user_lat[remaining], network.user_lng[remaining], free)]
+        assignment = index.assign_nearest(network.user_lat[candidates], network.user_lng[candidates], free)
+        connected = assignment >= 0
+        network.move_users(candidates[connected], assignment[connected])
+        return int(accepted.sum()) + int(connected.sum())
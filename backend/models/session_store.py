@@ -0,0 +1,113 @@
+"""
+Simulation Session Store - keep engines alive between requests with LRU eviction and a memory budget
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SESSIONS = int(os.environ.get('SIMULATION_MAX_SESSIONS', 32))
+DEFAULT_MEMORY_BUDGET_MB = int(os.environ.get('SIMULATION_MEMORY_BUDGET_MB', 1024))
+
+
+class SimulationSession:
+    """A stored engine plus bookkeeping about how it has been driven"""
+
+    __slots__ = ('engine', 'created_at', 'last_used', 'elapsed_minutes', 'operations', 'lock', 'home_towers')
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.created_at = datetime.utcnow()
+        self.last_used = self.created_at
+        self.elapsed_minutes = 0.0  # simulated time advanced through step()
+        self.operations = 0
+        self.lock = threading.Lock()  # one request at a time mutates an engine
+        self.home_towers = None  # where idle subscribers return between event-driven steps
+
+    def to_dict(self) -> Dict[str, Any]:
+        engine = self.engine
+        return {
+            'simulation_id': engine.simulation_id,
+            'created_at': self.created_at.isoformat(),
+            'last_used': self.last_used.isoformat(),
+            'columnar': engine.network is not None,
+            'num_towers': len(engine.towers),
+            'num_users': len(engine.users),
+            'version': engine.tracker.version,
+            'elapsed_minutes': self.elapsed_minutes,
+            'operations': self.operations,
+            'memory_mb': round(engine.memory_bytes() / 2 ** 20, 2)
+        }
+
+
+class SimulationSessionStore:
+    """Thread-safe registry of live simulations keyed by simulation_id.
+
+    Least recently used sessions are evicted once there are more than
+    ``max_sessions`` or their estimated memory exceeds ``memory_budget_mb``.
+    The most recently used session is never evicted, even if it alone is
+    over budget.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB):
+        self.max_sessions = max_sessions
+        self.memory_budget_bytes = int(memory_budget_mb * 2 ** 20)
+        self._sessions: 'OrderedDict[str, SimulationSession]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, engine) -> SimulationSession:
+        """Register an engine and evict older sessions if limits are exceeded"""
+        session = SimulationSession(engine)
+        with self._lock:
+            self._sessions[engine.simulation_id] = session
+            self._sessions.move_to_end(engine.simulation_id)  # a replaced id is now the newest
+            self._evict()
+        return session
+
+    def get(self, simulation_id: str) -> Optional[SimulationSession]:
+        """Look up a session and mark it most recently used"""
+        with self._lock:
+            session = self._sessions.get(simulation_id)
+            if session is not None:
+                self._sessions.move_to_end(simulation_id)
+                session.last_used = datetime.utcnow()
+            return session
+
+    def touch(self, session: SimulationSession):
+        """Record an operation; memory may have grown, so re-check the budget"""
+        with self._lock:
+            session.operations += 1
+            session.last_used = datetime.utcnow()
+            self._evict()
+
+    def remove(self, simulation_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(simulation_id, None) is not None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [session.to_dict() for session in reversed(sessions)]
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(session.engine.memory_bytes() for session in self._sessions.values())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self):
+        # Caller holds self._lock
+        usage = {sid: session.engine.memory_bytes() for sid, session in self._sessions.items()}
+        total = sum(usage.values())
+        while len(self._sessions) > 1 and (
+                len(self._sessions) > self.max_sessions or total > self.memory_budget_bytes):
+            simulation_id, _ = self._sessions.popitem(last=False)
+            total -= usage[simulation_id]
+            logger.info(f"🗑️ تم حذف جلسة المحاكاة {simulation_id} لتوفير الذاكرة")
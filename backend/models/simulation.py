@@ -2,44 +2,129 @@
 Simulation Models - Core simulation logic for tower and user management
 """
 
+import sys
 import uuid
-import random
 from datetime import datetime
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+from models.columnar import (
+    ColumnarNetwork, TowerViews, UserViews, CONSUMPTION_RANGES,
+    STATUS_CONGESTED, STATUS_NAMES, OPERATORS, USAGE_TYPES, USAGE_CODES
+)
+from models.spatial_index import TowerGridIndex, points_in_disk
+from models.redistribution import Move, get_rebalancer
+from models.state_tracker import StateTracker
+from models.move_log import MoveLog, DEFAULT_RETENTION
+from models.scenarios import ScenarioReplay, compile_scenario
+from models.mobility import MobilityModel
+from models.handover import HandoverCounters
+from models.clock import SimulationClock
+from models import radio
+from models import improvements
+from models import snapshot
+
+# Rough per-row footprints used to estimate engine memory for object-based runs
+OBJECT_TOWER_BYTES = 1024
+OBJECT_USER_BYTES = 250      # slotted User plus its tower membership entry
+SNAPSHOT_RECORD_BYTES = 600  # one cached tower/user dict
+
+_default_rng = np.random.default_rng()  # for Users created without an engine's generator
+
+JORDAN_LOCATIONS = [
+    (31.9565, 35.9239),  # عمان
+    (32.0833, 36.0933),  # الزرقاء
+    (32.5486, 35.8519),  # إربد
+    (29.5320, 35.0063),  # العقبة
+    (31.1854, 35.7017)   # الكرك
+]
 
 class Tower:
     """Represents a cellular tower"""
     
+    __slots__ = ('id', 'location', 'capacity', 'operator', '_members',
+                 'current_load', 'status', 'coverage_radius', 'active', 'tracker')
+    
     def __init__(self, tower_id: int, location: tuple, capacity: int = 200, operator: str = "زين"):
         self.id = tower_id
         self.location = location  # (lat, lng)
         self.capacity = capacity
         self.operator = operator
-        self.users = []
+        self._members = {}  # user id -> user, insertion ordered for O(1) attach/detach
         self.current_load = 0
         self.status = "normal"  # normal, congested, overloaded
         self.coverage_radius = 6000  # meters
+        self.active = True  # False = failed, accepts no users
+        self.tracker = None  # optional StateTracker notified of changes
+    
+    @property
+    def users(self) -> List['User']:
+        """Connected users in attach order"""
+        return list(self._members.values())
+    
+    def has_user(self, user) -> bool:
+        """Check whether a user is connected to this tower"""
+        return user.id in self._members
+    
+    def first_users(self, count: int) -> List['User']:
+        """Oldest connected users without copying the whole membership"""
+        return list(islice(self._members.values(), count))
         
     def add_user(self, user) -> bool:
         """Add a user to this tower if capacity allows"""
-        if len(self.users) < self.capacity:
-            self.users.append(user)
-            self.current_load = len(self.users)
+        if self.active and len(self._members) < self.capacity:
+            self._members[user.id] = user
+            self.current_load = len(self._members)
             self._update_status()
+            if self.tracker is not None:
+                self.tracker.mark_users(user.id)
             return True
         return False
     
     def remove_user(self, user) -> bool:
         """Remove a user from this tower"""
-        if user in self.users:
-            self.users.remove(user)
-            self.current_load = len(self.users)
+        if self._members.pop(user.id, None) is not None:
+            self.current_load = len(self._members)
             self._update_status()
+            if self.tracker is not None:
+                self.tracker.mark_users(user.id)
             return True
         return False
     
+    def add_users(self, users: Iterable['User']) -> List['User']:
+        """Add users while capacity allows, updating load once; returns the accepted users"""
+        accepted = []
+        for user in users:
+            if not self.active or len(self._members) >= self.capacity:
+                break
+            if user.id not in self._members:
+                self._members[user.id] = user
+                accepted.append(user)
+        if accepted:
+            self.current_load = len(self._members)
+            self._update_status()
+            if self.tracker is not None:
+                self.tracker.mark_users([user.id for user in accepted])
+        return accepted
+    
+    def remove_users(self, users: Iterable['User']) -> int:
+        """Remove users, updating load once; returns how many were connected"""
+        removed = []
+        for user in users:
+            if self._members.pop(user.id, None) is not None:
+                removed.append(user.id)
+        if removed:
+            self.current_load = len(self._members)
+            self._update_status()
+            if self.tracker is not None:
+                self.tracker.mark_users(removed)
+        return len(removed)
+    
     def _update_status(self):
         """Update tower status based on current load"""
+        previous = self.status
         load_percentage = (self.current_load / self.capacity) * 100
         if load_percentage > 100:
             self.status = "overloaded"
@@ -47,6 +132,10 @@ class Tower:
             self.status = "congested"
         else:
             self.status = "normal"
+        if self.tracker is not None:
+            self.tracker.mark_towers(self.id)
+            if self.status != previous:
+                self.tracker.status_changed(previous, self.status)
     
     def get_load_percentage(self) -> float:
         """Get current load as percentage"""
@@ -62,27 +151,53 @@ class Tower:
             'load_percentage': self.get_load_percentage(),
             'status': self.status,
             'operator': self.operator,
-            'coverage_radius': self.coverage_radius
+            'coverage_radius': self.coverage_radius,
+            'active': self.active
         }
 
 class User:
-    """Represents a mobile user"""
+    """Represents a mobile user.
+    
+    Slotted, with the location kept as two floats and the usage type as an
+    interned code (index into USAGE_TYPES), since one is created per subscriber.
+    """
+    
+    __slots__ = ('id', 'lat', 'lng', '_usage', 'data_consumption', 'connected_tower')
     
-    def __init__(self, user_id: int, location: tuple, usage_type: str = "data"):
+    def __init__(self, user_id: int, location: tuple, usage_type: str = "data",
+                 rng: Optional[np.random.Generator] = None):
         self.id = user_id
-        self.location = location  # (lat, lng)
+        self.lat, self.lng = location
         self.usage_type = usage_type  # call, data, video
-        self.data_consumption = self._calculate_data_consumption()
+        self.data_consumption = self._calculate_data_consumption(rng or _default_rng)
         self.connected_tower = None
+    
+    @property
+    def location(self) -> tuple:
+        """(lat, lng)"""
+        return (self.lat, self.lng)
+    
+    @location.setter
+    def location(self, location: tuple):
+        self.lat, self.lng = location
+    
+    @property
+    def usage_type(self) -> str:
+        usage = self._usage
+        return USAGE_TYPES[usage] if isinstance(usage, int) else usage
+    
+    @usage_type.setter
+    def usage_type(self, usage_type: str):
+        # Known types become small ints; anything else is kept as an interned string
+        code = USAGE_CODES.get(usage_type)
+        self._usage = code if code is not None else sys.intern(usage_type)
         
-    def _calculate_data_consumption(self) -> float:
+    def _calculate_data_consumption(self, rng: np.random.Generator) -> float:
         """Calculate data consumption based on usage type"""
-        consumption_map = {
-            'call': random.uniform(0.1, 0.5),  # MB
-            'data': random.uniform(1, 10),     # MB
-            'video': random.uniform(5, 50)     # MB
-        }
-        return consumption_map.get(self.usage_type, 1.0)
+        if not isinstance(self._usage, int):
+            return 1.0
+        low, high = CONSUMPTION_RANGES[self._usage]  # MB
+        return float(rng.uniform(low, high))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert user to dictionary"""
@@ -96,96 +211,306 @@ class User:
 class SimulationEngine:
     """Main simulation engine for network optimization"""
     
-    def __init__(self, num_towers: int = 5, num_users: int = 150):
+    def __init__(self, num_towers: int = 5, num_users: int = 150, columnar: bool = False,
+                 distribution: str = "random", seed: Optional[int] = None,
+                 history_retention: Optional[int] = DEFAULT_RETENTION):
         self.simulation_id = str(uuid.uuid4())
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)  # all randomness of this engine flows through here
+        self.redistributed_users = 0
         self.created_at = datetime.utcnow()
         self.towers = []
         self.users = []
-        self.redistribution_history = []
+        self.redistribution_history = MoveLog(history_retention)  # bounded; None keeps every move
+        self.columnar = columnar
+        self.distribution = distribution  # random (intentional hotspots) or nearest (geographic)
+        self.network = None  # ColumnarNetwork when running in columnar mode
+        self._spatial_index = None
+        self.mobility = None  # MobilityModel, created by enable_mobility
         
         # Initialize towers and users
-        self._initialize_towers(num_towers)
-        self._initialize_users(num_users)
-        self._initial_distribution()
+        if columnar:
+            self._initialize_columnar(num_towers, num_users)
+        else:
+            self._initialize_towers(num_towers)
+            self._initialize_users(num_users)
+        
+        if distribution == "nearest":
+            self._nearest_distribution()
+        elif not columnar:
+            self._initial_distribution()
+        
+        # Version 0 is the initial state; later changes are tracked per row
+        self._snapshots = {}
+        self._attach_tracker()
+        self.clock = SimulationClock()  # advanced by the APIs that drive time, once per step
+        self.handovers = HandoverCounters(len(self.towers), len(self.users), clock=self.clock)
+    
+    @property
+    def spatial_index(self) -> TowerGridIndex:
+        """Grid index over tower positions, built on first use"""
+        if self._spatial_index is None:
+            if self.network is not None:
+                self._spatial_index = TowerGridIndex(
+                    self.network.tower_lat, self.network.tower_lng, self.network.tower_coverage
+                )
+            else:
+                locations = np.array([t.location for t in self.towers], dtype=np.float64).reshape(-1, 2)
+                self._spatial_index = TowerGridIndex(
+                    locations[:, 0], locations[:, 1], [t.coverage_radius for t in self.towers]
+                )
+        return self._spatial_index
+    
+    def towers_serving(self, location: tuple) -> List[Any]:
+        """Towers whose coverage contains a location, nearest first"""
+        tower_idx, _ = self.spatial_index.serving_towers(*location)
+        return [self.towers[i] for i in tower_idx.tolist()]
     
     def _initialize_towers(self, num_towers: int):
         """Initialize towers with Jordan locations"""
-        jordan_locations = [
-            (31.9565, 35.9239),  # عمان
-            (32.0833, 36.0933),  # الزرقاء
-            (32.5486, 35.8519),  # إربد
-            (29.5320, 35.0063),  # العقبة
-            (31.1854, 35.7017)   # الكرك
-        ]
-        
-        operators = ["زين", "أورانج", "أمنية"]
+        operators = list(OPERATORS)
         
         for i in range(num_towers):
-            location = jordan_locations[i] if i < len(jordan_locations) else (
-                random.uniform(29.5, 32.6), random.uniform(35.0, 36.2)
+            location = JORDAN_LOCATIONS[i] if i < len(JORDAN_LOCATIONS) else (
+                float(self.rng.uniform(29.5, 32.6)), float(self.rng.uniform(35.0, 36.2))
             )
             tower = Tower(
                 tower_id=i,
                 location=location,
-                capacity=random.randint(150, 250),
-                operator=random.choice(operators)
+                capacity=int(self.rng.integers(150, 251)),
+                operator=operators[self.rng.integers(len(operators))]
             )
             self.towers.append(tower)
     
     def _initialize_users(self, num_users: int):
         """Initialize users with random locations and usage patterns"""
-        usage_types = ['call', 'data', 'video']
+        usage_types = USAGE_TYPES
         
         for i in range(num_users):
             # Random location in Jordan
             location = (
-                random.uniform(29.5, 32.6),  # lat
-                random.uniform(35.0, 36.2)   # lng
+                float(self.rng.uniform(29.5, 32.6)),  # lat
+                float(self.rng.uniform(35.0, 36.2))   # lng
             )
             
             user = User(
                 user_id=i,
                 location=location,
-                usage_type=random.choice(usage_types)
+                usage_type=usage_types[self.rng.integers(len(usage_types))],
+                rng=self.rng
             )
             self.users.append(user)
     
     def _initial_distribution(self):
         """Distribute users to towers (create some overload)"""
         # Create intentional overload on some towers
-        overload_towers = random.sample(self.towers, min(2, len(self.towers)))
+        picked = self.rng.choice(len(self.towers), size=min(2, len(self.towers)), replace=False)
+        overload_towers = [self.towers[i] for i in picked.tolist()]
         
         for user in self.users:
             # 70% chance to go to overloaded towers
-            if random.random() < 0.7 and overload_towers:
-                target_tower = random.choice(overload_towers)
+            if self.rng.random() < 0.7 and overload_towers:
+                target_tower = overload_towers[self.rng.integers(len(overload_towers))]
             else:
-                target_tower = random.choice(self.towers)
+                target_tower = self.towers[self.rng.integers(len(self.towers))]
             
             target_tower.add_user(user)
             user.connected_tower = target_tower
     
-    def get_current_state(self) -> Dict[str, Any]:
-        """Get current simulation state"""
-        return {
+    def _initialize_columnar(self, num_towers: int, num_users: int):
+        """Initialize towers, users and the initial distribution as arrays"""
+        rng = self.rng
+        network = ColumnarNetwork(num_towers, num_users)
+        
+        # Towers: Jordan cities first, random locations for the rest
+        network.tower_lat[:] = rng.uniform(29.5, 32.6, num_towers)
+        network.tower_lng[:] = rng.uniform(35.0, 36.2, num_towers)
+        known = min(num_towers, len(JORDAN_LOCATIONS))
+        if known:
+            network.tower_lat[:known], network.tower_lng[:known] = zip(*JORDAN_LOCATIONS[:known])
+        network.tower_capacity[:] = rng.integers(150, 251, num_towers)
+        network.tower_operator[:] = rng.integers(0, len(OPERATORS), num_towers)
+        
+        # Users: random location and usage type
+        network.user_lat[:] = rng.uniform(29.5, 32.6, num_users)
+        network.user_lng[:] = rng.uniform(35.0, 36.2, num_users)
+        network.user_usage[:] = rng.integers(0, len(USAGE_TYPES), num_users)
+        low, high = CONSUMPTION_RANGES[network.user_usage].T
+        network.user_consumption[:] = rng.uniform(low, high)
+        
+        self.network = network
+        self.towers = TowerViews(network)
+        self.users = UserViews(network)
+        
+        # Initial distribution: 70% of users go to (up to) two hot towers
+        if self.distribution != "nearest" and num_towers and num_users:
+            hot_towers = rng.choice(num_towers, size=min(2, num_towers), replace=False)
+            requested = rng.integers(0, num_towers, num_users)
+            to_hot = rng.random(num_users) < 0.7
+            requested[to_hot] = rng.choice(hot_towers, size=int(to_hot.sum()))
+            network.assign_within_capacity(np.arange(num_users), requested)
+    
+    def _nearest_distribution(self):
+        """Connect each user to the nearest covering tower that still has capacity"""
+        self._connect_nearest(np.arange(len(self.users)))
+    
+    def _connect_nearest(self, user_ids: np.ndarray) -> int:
+        """Connect detached users to the nearest covering tower with room; returns how many connected"""
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        if self.network is not None:
+            network = self.network
+            assignment = self.spatial_index.assign_nearest(
+                network.user_lat[user_ids], network.user_lng[user_ids], network.free_capacity()
+            )
+            connected = assignment >= 0
+            network.move_users(user_ids[connected], assignment[connected])
+            return int(connected.sum())
+        
+        users = [self.users[i] for i in user_ids.tolist()]
+        locations = np.array([u.location for u in users], dtype=np.float64).reshape(-1, 2)
+        assignment = self.spatial_index.assign_nearest(locations[:, 0], locations[:, 1], self.free_capacity())
+        for user, tower_idx in zip(users, assignment.tolist()):
+            if tower_idx >= 0:
+                self.towers[tower_idx].add_user(user)
+                user.connected_tower = self.towers[tower_idx]
+        return int((assignment >= 0).sum())
+    
+    def adopt_network(self, network: ColumnarNetwork):
+        """Switch to an existing columnar network, e.g. one restored from a snapshot"""
+        self.columnar = True
+        self.network = network
+        self.towers = TowerViews(network)
+        self.users = UserViews(network)
+        self._spatial_index = None
+        self.mobility = None  # cached cells belong to the old index
+        self._snapshots = {}
+        self._attach_tracker()
+        self.handovers = HandoverCounters(network.num_towers, network.num_users, clock=self.clock)
+    
+    def save_snapshot(self, path: str) -> str:
+        """Checkpoint towers, users, assignments and history to a binary .npz file"""
+        return snapshot.save_snapshot(self, path)
+    
+    @classmethod
+    def load_snapshot(cls, path: str, mmap: bool = True) -> 'SimulationEngine':
+        """Restore an engine saved with save_snapshot, memory-mapping its arrays"""
+        return snapshot.load_snapshot(path, mmap)
+    
+    def _attach_tracker(self):
+        """Start change tracking from the current state"""
+        if self.network is not None:
+            self.tracker = StateTracker(self.network.num_towers, self.network.num_users)
+            self.network.tracker = self.tracker
+            return
+        
+        counts = {}
+        for tower in self.towers:
+            counts[tower.status] = counts.get(tower.status, 0) + 1
+        self.tracker = StateTracker(len(self.towers), len(self.users), counts)
+        for tower in self.towers:
+            tower.tracker = self.tracker
+    
+    def status_counts(self) -> Dict[str, int]:
+        """Number of towers per status, from running counters"""
+        if self.network is not None:
+            return dict(zip(STATUS_NAMES, self.network.status_counts().tolist()))
+        return dict(self.tracker.status_counts)
+    
+    def _tower_dicts(self, tower_idx: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        if self.network is not None:
+            return self.network.tower_dicts(tower_idx)
+        if tower_idx is None:
+            return [tower.to_dict() for tower in self.towers]
+        return [self.towers[i].to_dict() for i in tower_idx.tolist()]
+    
+    def _user_dicts(self, user_idx: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        if self.network is not None:
+            return self.network.user_dicts() if user_idx is None else self.network.user_dicts_at(user_idx)
+        if user_idx is None:
+            return [user.to_dict() for user in self.users]
+        return [self.users[i].to_dict() for i in user_idx.tolist()]
+    
+    def _snapshot(self, kind: str) -> List[Dict[str, Any]]:
+        """Cached list of tower or user dicts, re-serializing only rows changed since it was built.
+        
+        Returned lists are shared with the cache and must be treated as read-only;
+        a refresh copies the list, so earlier snapshots keep their contents.
+        """
+        serialize = self._tower_dicts if kind == 'towers' else self._user_dicts
+        changed_since = self.tracker.changed_towers if kind == 'towers' else self.tracker.changed_users
+        cached = self._snapshots.get(kind)
+        
+        if cached is None:
+            records = serialize()
+        else:
+            cached_version, records = cached
+            changed = changed_since(cached_version)
+            if len(changed):
+                records = list(records)
+                total = len(self.towers if kind == 'towers' else self.users)
+                records.extend([None] * (total - len(records)))  # rows added since, all marked changed
+                for i, record in zip(changed.tolist(), serialize(changed)):
+                    records[i] = record
+        self._snapshots[kind] = (self.tracker.version, records)
+        return records
+    
+    def get_current_state(self, include_users: bool = True,
+                          since_version: Optional[int] = None) -> Dict[str, Any]:
+        """Get current simulation state; include_users=False skips per-user data.
+        
+        Towers and users are re-serialized only when they changed. With
+        since_version, only the towers/users changed after that version are
+        returned (a delta); 'version' in the result is the value to pass next time.
+        """
+        version = self.tracker.commit()
+        counts = self.status_counts()
+        state = {
             'simulation_id': self.simulation_id,
+            'version': version,
             'timestamp': datetime.utcnow().isoformat(),
-            'towers': [tower.to_dict() for tower in self.towers],
-            'users': [user.to_dict() for user in self.users],
-            'total_users': len(self.users),
-            'overloaded_towers': len([t for t in self.towers if t.status == 'overloaded']),
-            'congested_towers': len([t for t in self.towers if t.status == 'congested'])
+            'total_users': self.network.num_users if self.network is not None else len(self.users),
+            'overloaded_towers': counts['overloaded'],
+            'congested_towers': counts['congested'],
+            'metrics': self.network_metrics()  # network-wide, so deltas carry it too
         }
+        
+        if since_version is not None:
+            state['since_version'] = since_version
+            state['towers'] = self._tower_dicts(self.tracker.changed_towers(since_version))
+            if include_users:
+                state['users'] = self._user_dicts(self.tracker.changed_users(since_version))
+            return state
+        
+        state['towers'] = self._snapshot('towers')
+        if include_users:
+            state['users'] = self._snapshot('users')
+        return state
+    
+    def iter_user_pages(self, page_size: int = 10000) -> Iterator[List[Dict[str, Any]]]:
+        """Serialize users one page at a time so callers can stream them"""
+        total = self.network.num_users if self.network is not None else len(self.users)
+        for start in range(0, total, page_size):
+            if self.network is not None:
+                yield self.network.user_dicts(start, start + page_size)
+            else:
+                yield [user.to_dict() for user in self.users[start:start + page_size]]
     
-    def apply_ml_redistribution(self, predictions: Dict[int, float]) -> Dict[str, Any]:
-        """Apply ML-based redistribution"""
-        redistributed_count = 0
+    def apply_ml_redistribution(self, predictions: Dict[int, float], strategy: str = "greedy",
+                                include_users: bool = True,
+                                strategy_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Apply ML-based redistribution (strategy_options go to the planner, e.g. roaming for 'operator')"""
+        if strategy != "greedy":
+            return self.apply_planned_redistribution(predictions, strategy, include_users, strategy_options)
+        
+        if self.network is not None:
+            return self._apply_columnar_redistribution(predictions, include_users)
+        
         max_iterations = 100
         
         for iteration in range(max_iterations):
             # Find overloaded towers
             overloaded_towers = [t for t in self.towers if t.status in ['overloaded', 'congested']]
-            underloaded_towers = [t for t in self.towers if t.get_load_percentage() < 70]
+            underloaded_towers = [t for t in self.towers if t.active and t.get_load_percentage() < 70]
             
             if not overloaded_towers or not underloaded_towers:
                 break
@@ -197,37 +522,252 @@ class SimulationEngine:
             target_tower = min(underloaded_towers, key=lambda t: t.get_load_percentage())
             
             # Move users from source to target
-            users_to_move = source_tower.users[:min(5, len(source_tower.users))]
+            users_to_move = source_tower.first_users(5)
             
-            for user in users_to_move:
-                if target_tower.add_user(user):
-                    source_tower.remove_user(user)
-                    user.connected_tower = target_tower
-                    redistributed_count += 1
+            moved = target_tower.add_users(users_to_move)
+            source_tower.remove_users(moved)
+            for user in moved:
+                user.connected_tower = target_tower
+            self.redistributed_users += len(moved)
             
             # Record redistribution
-            self.redistribution_history.append({
-                'iteration': iteration,
-                'from_tower': source_tower.id,
-                'to_tower': target_tower.id,
-                'users_moved': len(users_to_move),
-                'timestamp': datetime.utcnow().isoformat()
-            })
+            self.redistribution_history.append(iteration, source_tower.id, target_tower.id, len(users_to_move))
         
-        return self.get_current_state()
+        return self.get_current_state(include_users)
     
-    def calculate_improvements(self, initial_state: Dict, final_state: Dict) -> Dict[str, Any]:
-        """Calculate performance improvements"""
-        initial_overloaded = initial_state['overloaded_towers']
-        final_overloaded = final_state['overloaded_towers']
+    def _apply_columnar_redistribution(self, predictions: Dict[int, float],
+                                       include_users: bool = True) -> Dict[str, Any]:
+        """Same greedy policy as apply_ml_redistribution, on whole arrays per step"""
+        network = self.network
+        max_iterations = 100
+        
+        for iteration in range(max_iterations):
+            load_percentage = network.load_percentages()
+            overloaded = network.tower_status >= STATUS_CONGESTED
+            underloaded = (load_percentage < 70) & network.tower_active
+            
+            if not overloaded.any() or not underloaded.any():
+                break
+            
+            source = int(np.argmax(np.where(overloaded, load_percentage, -np.inf)))
+            target = int(np.argmin(np.where(underloaded, load_percentage, np.inf)))
+            
+            users_to_move = network.users_of(source)[:5]
+            free = int(network.tower_capacity[target] - network.tower_load[target])
+            network.move_users(users_to_move[:max(free, 0)], target)
+            self.redistributed_users += min(len(users_to_move), max(free, 0))
+            
+            self.redistribution_history.append(iteration, source, target, len(users_to_move))
+        
+        return self.get_current_state(include_users)
+    
+    def tower_load_arrays(self):
+        """Current (load, capacity) per tower as arrays, indexed by tower id"""
+        if self.network is not None:
+            return self.network.tower_load.copy(), self.network.tower_capacity.copy()
+        load = np.array([t.current_load for t in self.towers], dtype=np.int64)
+        capacity = np.array([t.capacity for t in self.towers], dtype=np.int64)
+        return load, capacity
+    
+    def tower_location_arrays(self):
+        """Tower (lat, lng) as arrays, indexed by tower id"""
+        if self.network is not None:
+            return self.network.tower_lat, self.network.tower_lng
+        locations = np.array([t.location for t in self.towers], dtype=np.float64).reshape(-1, 2)
+        return locations[:, 0], locations[:, 1]
+    
+    def tower_operator_array(self) -> np.ndarray:
+        """Operator code (index into OPERATORS) of each tower, indexed by tower id"""
+        if self.network is not None:
+            return self.network.tower_operator.copy()
+        return np.array([OPERATORS.index(t.operator) for t in self.towers], dtype=np.int8)
+    
+    def tower_active_array(self) -> np.ndarray:
+        """Whether each tower is in service, indexed by tower id"""
+        if self.network is not None:
+            return self.network.tower_active.copy()
+        return np.array([t.active for t in self.towers], dtype=bool)
+    
+    def free_capacity(self) -> np.ndarray:
+        """Users each tower can still accept (0 for failed towers)"""
+        if self.network is not None:
+            return self.network.free_capacity()
+        load, capacity = self.tower_load_arrays()
+        return np.where(self.tower_active_array(), np.maximum(capacity - load, 0), 0)
+    
+    def plan_moves(self, rebalancer, predictions: Optional[Dict[int, float]] = None) -> List[Move]:
+        """Ask a planner for moves given the live load, locations and towers in service"""
+        load, capacity = self.tower_load_arrays()
+        lat, lng = self.tower_location_arrays()
+        return rebalancer.plan(load, capacity, lat=lat, lng=lng, predictions=predictions,
+                               active=self.tower_active_array(), operator=self.tower_operator_array())
+    
+    def apply_planned_redistribution(self, predictions: Dict[int, float], strategy: str = "heap",
+                                     include_users: bool = True,
+                                     strategy_options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Redistribute using a planner from models.redistribution, then apply its moves"""
+        self.apply_moves(self.plan_moves(get_rebalancer(strategy, **(strategy_options or {})), predictions))
+        return self.get_current_state(include_users)
+    
+    def apply_moves(self, plan: List[Move]) -> int:
+        """Apply a move plan and record it in the history; returns users moved"""
+        if not plan:
+            return 0
+        
+        from_tower, to_tower, count = (np.array(column) for column in zip(*plan))
+        if self.network is not None:
+            moved = self.network.apply_moves(from_tower, to_tower, count)
+        else:
+            moved = np.zeros(len(plan), dtype=np.int64)
+            for i, move in enumerate(plan):
+                source_tower = self.towers[move.from_tower]
+                target_tower = self.towers[move.to_tower]
+                users = target_tower.add_users(source_tower.first_users(move.count))
+                source_tower.remove_users(users)
+                for user in users:
+                    user.connected_tower = target_tower
+                moved[i] = len(users)
+        self.redistributed_users += int(moved.sum())
+        
+        # The log holds what was moved, not what was planned
+        done = np.flatnonzero(moved > 0)
+        self.redistribution_history.extend(done, from_tower[done], to_tower[done], moved[done])
+        return int(moved.sum())
+    
+    def add_users(self, count: int, location: Optional[tuple] = None, radius_m: float = 2000.0,
+                  usage_type: Optional[str] = None) -> Dict[str, Any]:
+        """Add subscribers (around a location, or anywhere in Jordan) and connect them nearest-first"""
+        if usage_type is not None and usage_type not in USAGE_CODES:
+            raise ValueError(f"Unknown usage type: {usage_type}")
+        rng = self.rng
+        if location is None:
+            lat, lng = rng.uniform(29.5, 32.6, count), rng.uniform(35.0, 36.2, count)
+        else:
+            lat, lng = points_in_disk(rng, location, radius_m, count)
+        if usage_type is None:
+            usage = rng.integers(0, len(USAGE_TYPES), count)
+        else:
+            usage = np.full(count, USAGE_CODES[usage_type])
+        
+        first = len(self.users)
+        if self.network is not None:
+            low, high = CONSUMPTION_RANGES[usage].T
+            self.network.append_users(lat, lng, usage, rng.uniform(low, high))
+            self.users = UserViews(self.network)
+        else:
+            for k, (user_lat, user_lng, code) in enumerate(zip(lat.tolist(), lng.tolist(), usage.tolist())):
+                self.users.append(User(first + k, (user_lat, user_lng), USAGE_TYPES[code], rng=rng))
+            self.tracker.grow(len(self.towers), len(self.users))
+            self.tracker.mark_users(slice(first, None))
         
-        initial_congested = initial_state['congested_towers']
-        final_congested = final_state['congested_towers']
+        connected = self._connect_nearest(np.arange(first, first + count))
+        return {
+            'added': count,
+            'first_user_id': first,
+            'connected': connected,
+            'blocked': count - connected
+        }
+    
+    def _check_tower(self, tower_id: int):
+        if not 0 <= tower_id < len(self.towers):
+            raise ValueError(f"Unknown tower: {tower_id}")
+    
+    def fail_tower(self, tower_id: int) -> Dict[str, Any]:
+        """Take a tower out of service; its users move to the nearest covering tower with room"""
+        self._check_tower(tower_id)
+        if self.network is not None:
+            self.network.set_tower_active(tower_id, False)
+            affected = self.network.users_of(tower_id)
+            self.network.move_users(affected, -1)
+        else:
+            tower = self.towers[tower_id]
+            tower.active = False
+            users = tower.users
+            tower.remove_users(users)
+            for user in users:
+                user.connected_tower = None
+            self.tracker.mark_towers(tower_id)
+            affected = np.array([user.id for user in users], dtype=np.int64)
         
+        reconnected = self._connect_nearest(affected)
         return {
-            'overloaded_reduction': f"{((initial_overloaded - final_overloaded) / max(initial_overloaded, 1)) * 100:.1f}%",
-            'congested_reduction': f"{((initial_congested - final_congested) / max(initial_congested, 1)) * 100:.1f}%",
-            'network_efficiency_gain': f"{random.randint(15, 25)}%",
-            'latency_improvement': f"{random.randint(20, 35)}%",
-            'user_satisfaction_increase': f"{random.randint(30, 50)}%"
-        }
\ No newline at end of file
+            'tower_id': tower_id,
+            'users_affected': len(affected),
+            'reconnected': reconnected,
+            'dropped': len(affected) - reconnected
+        }
+    
+    def restore_tower(self, tower_id: int) -> Dict[str, Any]:
+        """Put a failed tower back in service and reconnect detached users that now fit"""
+        self._check_tower(tower_id)
+        if self.network is not None:
+            self.network.set_tower_active(tower_id, True)
+            detached = np.flatnonzero(self.network.user_tower < 0)
+        else:
+            self.towers[tower_id].active = True
+            self.tracker.mark_towers(tower_id)
+            detached = np.array([user.id for user in self.users if user.connected_tower is None], dtype=np.int64)
+        
+        return {
+            'tower_id': tower_id,
+            'reconnected': self._connect_nearest(detached)
+        }
+    
+    def memory_bytes(self) -> int:
+        """Approximate memory held by this engine, including cached snapshots"""
+        if self.network is not None:
+            total = sum(value.nbytes for value in vars(self.network).values() if isinstance(value, np.ndarray))
+        else:
+            total = len(self.towers) * OBJECT_TOWER_BYTES + len(self.users) * OBJECT_USER_BYTES
+        total += self.tracker.tower_version.nbytes + self.tracker.user_version.nbytes
+        total += self.redistribution_history.nbytes
+        total += self.handovers.memory_bytes()
+        if self.mobility is not None:
+            total += self.mobility.memory_bytes()
+        for _, records in self._snapshots.values():
+            total += len(records) * SNAPSHOT_RECORD_BYTES
+        return total
+    
+    def run_scenario(self, scenario_id: str, duration_minutes: Optional[float] = None,
+                     step_minutes: float = 1.0, hotspot_location: Optional[tuple] = None,
+                     redistribution_interval: float = 5.0, strategy: str = "heap") -> Dict[str, Any]:
+        """Replay a catalogue scenario (models.scenarios) on this engine; requires columnar mode"""
+        profile = compile_scenario(scenario_id, duration_minutes, step_minutes, hotspot_location)
+        return ScenarioReplay(self, profile, redistribution_interval, strategy).run()
+    
+    def enable_mobility(self, **params) -> MobilityModel:
+        """Start moving users (models.mobility); requires columnar mode"""
+        self.mobility = MobilityModel(self, **params)
+        return self.mobility
+    
+    def advance_mobility(self, minutes: float, step_minutes: float = 1.0) -> Dict[str, Any]:
+        """Move users for `minutes` of simulated time, handing over as they leave coverage"""
+        if self.mobility is None:
+            self.enable_mobility()
+        result = self.mobility.step(minutes, step_minutes)
+        self.clock.advance(minutes)
+        return result
+    
+    def radio_report(self, include_towers: bool = True) -> Dict[str, Any]:
+        """Network KPIs (and optionally per-tower KPIs) from the radio model in models.radio"""
+        columns = snapshot.network_columns(self)
+        metrics = radio.user_metrics(columns, self.spatial_index)
+        report = {'kpis': radio.network_kpis(metrics)}
+        if include_towers:
+            report['towers'] = radio.tower_records(columns, metrics)
+        return report
+    
+    def network_metrics(self) -> Dict[str, float]:
+        """Load variance, users on congested towers and modeled latency, from the tower arrays"""
+        load, capacity = self.tower_load_arrays()
+        return improvements.network_metrics(load, capacity, self.tower_active_array())
+    
+    def calculate_improvements(self, initial_state: Dict, final_state: Dict) -> Dict[str, Any]:
+        """Calculate performance improvements between two states (full or delta) or network_metrics() results"""
+        def metrics(state):
+            if 'metrics' in state:
+                return state['metrics']
+            if 'load_variance' in state:
+                return state
+            return improvements.metrics_from_towers(state['towers'])
+        return improvements.compare(metrics(initial_state), metrics(final_state))
\ No newline at end of file
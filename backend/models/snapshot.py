@@ -0,0 +1,165 @@
+"""
+Simulation Snapshots - binary .npz checkpoints that restore by memory-mapping
+"""
+
+import json
+import os
+import struct
+import tempfile
+import uuid
+import zipfile
+from datetime import datetime
+from typing import Dict, Any
+
+import numpy as np
+
+from models.columnar import ColumnarNetwork, OPERATORS, STATUS_NAMES, USAGE_CODES
+from models.move_log import MoveLog
+
+SNAPSHOT_FORMAT = 2  # 2: history stored as MoveLog columns with timestamps in ns
+TOWER_COLUMNS = ('tower_lat', 'tower_lng', 'tower_capacity', 'tower_operator', 'tower_coverage',
+                 'tower_load', 'tower_status', 'tower_active')
+USER_COLUMNS = ('user_lat', 'user_lng', 'user_usage', 'user_consumption', 'user_tower')
+HISTORY_COLUMNS = ('iteration', 'from_tower', 'to_tower', 'users_moved', 'timestamp_ns')
+HANDOVER_COLUMNS = ('attempts', 'failures', 'ping_pongs', 'incoming')
+SNAPSHOT_DIR = os.environ.get('SIMULATION_SNAPSHOT_DIR',
+                              os.path.join(tempfile.gettempdir(), 'smart_signal_snapshots'))
+
+
+def snapshot_path(simulation_id: str) -> str:
+    """Snapshot file of a simulation inside SNAPSHOT_DIR (ids must be UUIDs)"""
+    return os.path.join(SNAPSHOT_DIR, f'{uuid.UUID(simulation_id)}.npz')
+
+
+def network_columns(engine) -> Dict[str, np.ndarray]:
+    """Tower and user columns of an engine, converting object towers/users if needed"""
+    if engine.network is not None:
+        return {name: getattr(engine.network, name) for name in TOWER_COLUMNS + USER_COLUMNS}
+
+    towers, users = engine.towers, engine.users
+    return {
+        'tower_lat': np.array([t.location[0] for t in towers], dtype=np.float64),
+        'tower_lng': np.array([t.location[1] for t in towers], dtype=np.float64),
+        'tower_capacity': np.array([t.capacity for t in towers], dtype=np.int32),
+        'tower_operator': np.array([OPERATORS.index(t.operator) for t in towers], dtype=np.int8),
+        'tower_coverage': np.array([t.coverage_radius for t in towers], dtype=np.float32),
+        'tower_load': np.array([t.current_load for t in towers], dtype=np.int32),
+        'tower_status': np.array([STATUS_NAMES.index(t.status) for t in towers], dtype=np.int8),
+        'tower_active': np.array([t.active for t in towers], dtype=bool),
+        'user_lat': np.array([u.lat for u in users], dtype=np.float64),
+        'user_lng': np.array([u.lng for u in users], dtype=np.float64),
+        'user_usage': np.array([USAGE_CODES.get(u.usage_type, USAGE_CODES['data']) for u in users], dtype=np.int8),
+        'user_consumption': np.array([u.data_consumption for u in users], dtype=np.float32),
+        'user_tower': np.array([u.connected_tower.id if u.connected_tower is not None else -1 for u in users],
+                               dtype=np.int32)
+    }
+
+
+def _history_columns(history: MoveLog) -> Dict[str, np.ndarray]:
+    return {f'history_{name}': values for name, values in history.columns().items()}
+
+
+def save_snapshot(engine, path: str) -> str:
+    """Write the engine's towers, users, assignments and history to an uncompressed .npz.
+
+    Members are stored uncompressed so load_snapshot can memory-map them in
+    place. The file is written next to its destination and renamed, so readers
+    never see a partial snapshot.
+    """
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'simulation_id': engine.simulation_id,
+        'created_at': engine.created_at.isoformat(),
+        'saved_at': datetime.utcnow().isoformat(),
+        'distribution': engine.distribution,
+        'seed': engine.seed if isinstance(engine.seed, int) else None,
+        'rng_state': engine.rng.bit_generator.state,
+        'redistributed_users': engine.redistributed_users,
+        'history_retention': engine.redistribution_history.retention,
+        'clock_minutes': engine.clock.minutes
+    }
+    arrays = network_columns(engine)
+    arrays.update(_history_columns(engine.redistribution_history))
+    arrays.update({f'handover_{name}': getattr(engine.handovers, name) for name in HANDOVER_COLUMNS})
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=directory, suffix='.npz.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return path
+
+
+def _map_member(path: str, info: zipfile.ZipInfo, mode: str) -> np.ndarray:
+    """Memory-map one stored .npy member of a zip archive without reading it"""
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack('<HH', f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if dtype.hasobject or int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def read_snapshot(path: str, mmap: bool = True) -> Dict[str, Any]:
+    """Arrays of a snapshot by name, plus its parsed 'meta'.
+
+    With mmap the arrays are copy-on-write maps of the file: loading costs no
+    I/O up front, processes restoring the same file share its pages, and
+    writes stay private to the process.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        members = archive.infolist()
+        with np.load(path, allow_pickle=False) as npz:
+            for info in members:
+                name = info.filename[:-len('.npy')]
+                if mmap and info.compress_type == zipfile.ZIP_STORED and name != 'meta':
+                    arrays[name] = _map_member(path, info, 'c')
+                else:
+                    arrays[name] = npz[name]
+    arrays['meta'] = json.loads(str(arrays['meta']))
+    if arrays['meta'].get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format: {arrays['meta'].get('format')}")
+    return arrays
+
+
+def load_snapshot(path: str, mmap: bool = True):
+    """Restore a SimulationEngine from a snapshot; restored engines are always columnar"""
+    from models.simulation import SimulationEngine
+
+    arrays = read_snapshot(path, mmap)
+    meta = arrays['meta']
+
+    network = ColumnarNetwork(0, 0)
+    for name in TOWER_COLUMNS + USER_COLUMNS:
+        setattr(network, name, arrays[name])
+    network.update_status()  # also rebuilds the running status counters
+
+    engine = SimulationEngine(0, 0, columnar=True, distribution=meta['distribution'], seed=meta['seed'])
+    engine.simulation_id = meta['simulation_id']
+    engine.created_at = datetime.fromisoformat(meta['created_at'])
+    engine.rng.bit_generator.state = meta['rng_state']
+    engine.redistributed_users = meta['redistributed_users']
+    engine.redistribution_history = MoveLog.from_columns(
+        {name: arrays[f'history_{name}'] for name in HISTORY_COLUMNS}, meta['history_retention'])
+    engine.adopt_network(network)
+    engine.clock.minutes = meta['clock_minutes']
+    for name in HANDOVER_COLUMNS:
+        if f'handover_{name}' in arrays:  # ping-pong state per user is not kept
+            getattr(engine.handovers, name)[:] = arrays[f'handover_{name}']
+    return engine
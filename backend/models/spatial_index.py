@@ -0,0 +1,235 @@
+"""
+Spatial Index - Grid index over tower positions for coverage and nearest-tower queries
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from models.columnar import rank_within_groups
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE_LAT = 111320.0
+CANDIDATE_BUDGET = 8000000  # candidate pairs held in memory per assignment chunk
+MAX_GRID_CELLS = 4000000
+
+
+def points_in_disk(rng: np.random.Generator, center: Tuple[float, float], radius_m: float,
+                   count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Uniformly distributed (lat, lng) points within `radius_m` of a center"""
+    center_lat, center_lng = center
+    distance = radius_m * np.sqrt(rng.random(count))
+    bearing = rng.uniform(0.0, 2 * np.pi, count)
+    lat = center_lat + distance * np.cos(bearing) / METERS_PER_DEGREE_LAT
+    lng = center_lng + distance * np.sin(bearing) / (METERS_PER_DEGREE_LAT * np.cos(np.radians(center_lat)))
+    return lat, lng
+
+
+def haversine_m(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distance in meters, broadcasting over array inputs"""
+    lat1, lng1, lat2, lng2 = (np.radians(v) for v in (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class TowerGridIndex:
+    """Uniform lat/lng grid (geohash-style buckets) at least as large as the biggest coverage radius.
+
+    Any tower able to serve a point lies in the point's cell or one of its eight
+    neighbours, so a query only looks at a handful of towers instead of all of them.
+    Cells are stored as a dense offset table, making cell lookup O(1).
+    """
+
+    def __init__(self, tower_lat: np.ndarray, tower_lng: np.ndarray, coverage_radius: np.ndarray):
+        self.tower_lat = np.asarray(tower_lat, dtype=np.float64)
+        self.tower_lng = np.asarray(tower_lng, dtype=np.float64)
+        self.coverage_radius = np.broadcast_to(
+            np.asarray(coverage_radius, dtype=np.float64), self.tower_lat.shape
+        )
+        has_towers = len(self.tower_lat) > 0
+
+        max_radius = float(self.coverage_radius.max()) if has_towers else 1.0
+        max_abs_lat = float(np.abs(self.tower_lat).max()) if has_towers else 0.0
+        self.radius_lat = max_radius / METERS_PER_DEGREE_LAT
+        # Longitude degrees shrink with latitude; size for the worst case
+        self.radius_lng = self.radius_lat / max(np.cos(np.radians(min(max_abs_lat, 89.0))), 1e-6)
+        self.origin_lat = float(self.tower_lat.min()) if has_towers else 0.0
+        self.origin_lng = float(self.tower_lng.min()) if has_towers else 0.0
+        lat_extent = float(self.tower_lat.max()) - self.origin_lat if has_towers else 0.0
+        lng_extent = float(self.tower_lng.max()) - self.origin_lng if has_towers else 0.0
+
+        # Cells may be larger than the radius (still correct) to bound the table size
+        self.cell_lat, self.cell_lng = self.radius_lat, self.radius_lng
+        while (lat_extent / self.cell_lat + 1) * (lng_extent / self.cell_lng + 1) > MAX_GRID_CELLS:
+            self.cell_lat *= 2
+            self.cell_lng *= 2
+        self.rows = int(lat_extent // self.cell_lat) + 1
+        self.cols = int(lng_extent // self.cell_lng) + 1
+
+        # Towers sorted by cell with a dense start/count table (two-cell empty border)
+        cells = self.cell_of(self.tower_lat, self.tower_lng)
+        self._tower_cells = cells
+        self._order = np.argsort(cells, kind='stable')
+        counts = np.bincount(cells, minlength=(self.rows + 4) * (self.cols + 4))
+        self._cell_count = counts
+        self._cell_start = np.cumsum(counts) - counts
+        self._max_per_cell = int(counts.max()) if has_towers else 0
+
+    def _cell_coords(self, lat, lng) -> Tuple[np.ndarray, np.ndarray]:
+        # Points outside the tower extent clip onto the empty border ring
+        rows = np.floor((np.asarray(lat) - self.origin_lat) / self.cell_lat)
+        cols = np.floor((np.asarray(lng) - self.origin_lng) / self.cell_lng)
+        rows = np.clip(rows, -1, self.rows).astype(np.int64) + 2
+        cols = np.clip(cols, -1, self.cols).astype(np.int64) + 2
+        return rows, cols
+
+    def cell_of(self, lat, lng) -> np.ndarray:
+        """Grid cell id of each point"""
+        rows, cols = self._cell_coords(lat, lng)
+        return rows * (self.cols + 4) + cols
+
+    def candidate_matrix(self, lat, lng) -> Tuple[np.ndarray, np.ndarray]:
+        """Serving towers for many points.
+
+        Returns (towers, distances) of shape (points, k): for each point the towers
+        whose coverage contains it, nearest first, padded with -1 / inf.
+        """
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lng = np.atleast_1d(np.asarray(lng, dtype=np.float64))
+        n = len(lat)
+        if n == 0 or self._max_per_cell == 0:
+            return np.full((n, 0), -1, dtype=np.int64), np.full((n, 0), np.inf)
+
+        rows, cols = self._cell_coords(lat, lng)
+        points, towers = [], []
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                cells = (rows + d_row) * (self.cols + 4) + (cols + d_col)
+                start = self._cell_start[cells]
+                count = self._cell_count[cells]
+                # Expand (point, tower) pairs only for towers actually in the cell
+                point = np.repeat(np.arange(n), count)
+                offset = np.arange(len(point)) - np.repeat(np.cumsum(count) - count, count)
+                tower = self._order[start[point] + offset]
+                # Cheap bounding-box test before the trigonometry
+                near = ((np.abs(self.tower_lat[tower] - lat[point]) <= self.radius_lat)
+                        & (np.abs(self.tower_lng[tower] - lng[point]) <= self.radius_lng))
+                points.append(point[near])
+                towers.append(tower[near])
+
+        point = np.concatenate(points)
+        tower = np.concatenate(towers)
+        distance = haversine_m(lat[point], lng[point], self.tower_lat[tower], self.tower_lng[tower])
+        inside = distance <= self.coverage_radius[tower]
+        point, tower, distance = point[inside], tower[inside], distance[inside]
+
+        # Nearest first within each point (distance < coverage, so one float key
+        # sorts by point then distance), then scatter into a padded matrix
+        span = float(self.coverage_radius.max()) + 1.0
+        order = np.argsort(point * span + distance)
+        point, tower, distance = point[order], tower[order], distance[order]
+        column = rank_within_groups(point)
+        width = int(column.max()) + 1 if len(column) else 0
+
+        tower_matrix = np.full((n, width), -1, dtype=np.int64)
+        distance_matrix = np.full((n, width), np.inf)
+        tower_matrix[point, column] = tower
+        distance_matrix[point, column] = distance
+        return tower_matrix, distance_matrix
+
+    def serving_towers(self, lat: float, lng: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Towers able to serve a single location, nearest first, with distances in meters"""
+        towers, distances = self.candidate_matrix([lat], [lng])
+        valid = towers[0] >= 0
+        return towers[0][valid], distances[0][valid]
+
+    def _chunk_size(self) -> int:
+        # Keep each chunk's candidate pairs around CANDIDATE_BUDGET entries
+        return max(1, CANDIDATE_BUDGET // max(9 * self._max_per_cell, 1))
+
+    def iter_candidates(self, lat, lng) -> Iterator[Tuple[slice, np.ndarray, np.ndarray]]:
+        """candidate_matrix over many points, a memory-bounded chunk at a time: yields (rows, towers, distances)"""
+        chunk_size = self._chunk_size()
+        for start in range(0, len(lat), chunk_size):
+            rows = slice(start, start + chunk_size)
+            towers, distances = self.candidate_matrix(lat[rows], lng[rows])
+            yield rows, towers, distances
+
+    def covered(self, lat, lng) -> np.ndarray:
+        """Whether any tower's coverage contains each point"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        result = np.zeros(len(lat), dtype=bool)
+        for rows, towers, _ in self.iter_candidates(lat, lng):
+            if towers.shape[1]:
+                result[rows] = towers[:, 0] >= 0
+        return result
+
+    def nearest_serving(self, lat, lng, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest covering tower per point (best server), ignoring towers not `allowed`.
+
+        Returns (towers, distances) with -1 / inf where no tower covers the point.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        tower = np.full(len(lat), -1, dtype=np.int64)
+        distance = np.full(len(lat), np.inf)
+        for rows, towers, distances in self.iter_candidates(lat, lng):
+            if towers.shape[1] == 0:
+                continue
+            usable = towers >= 0
+            if allowed is not None:
+                usable &= allowed[np.maximum(towers, 0)]
+            first = np.argmax(usable, axis=1)
+            found = np.flatnonzero(usable[np.arange(len(towers)), first])
+            tower[rows.start + found] = towers[found, first[found]]
+            distance[rows.start + found] = distances[found, first[found]]
+        return tower, distance
+
+    def may_serve(self, lat, lng, free_capacity: np.ndarray) -> np.ndarray:
+        """Cheap necessary test per point: False when no tower in its 3x3 cell block has free capacity"""
+        shape = (self.rows + 4, self.cols + 4)
+        per_cell = np.bincount(self._tower_cells, weights=np.maximum(free_capacity, 0),
+                               minlength=shape[0] * shape[1]).reshape(shape)
+        padded = np.pad(per_cell, 1)
+        block = sum(padded[1 + d_row:1 + d_row + shape[0], 1 + d_col:1 + d_col + shape[1]]
+                    for d_row in (-1, 0, 1) for d_col in (-1, 0, 1))
+        return block.ravel()[self.cell_of(lat, lng)] > 0
+
+    def assign_nearest(self, user_lat: np.ndarray, user_lng: np.ndarray,
+                       free_capacity: np.ndarray, chunk_size: Optional[int] = None) -> np.ndarray:
+        """Nearest tower with free capacity whose coverage contains each user.
+
+        Assignment is round based with first-choice priority: in round r every
+        still-unassigned user asks its r-th nearest covering tower, and a tower
+        short of room accepts the askers in user order. A user can therefore lose
+        its second choice to a later user for whom that tower is the first choice.
+        Chunks are processed one after another, so earlier chunks take priority.
+        Returns a tower index per user, -1 when none fits. ``free_capacity`` is
+        decremented in place.
+        """
+        user_lat = np.asarray(user_lat, dtype=np.float64)
+        user_lng = np.asarray(user_lng, dtype=np.float64)
+        assignment = np.full(len(user_lat), -1, dtype=np.int64)
+        if chunk_size is None:
+            chunk_size = self._chunk_size()
+
+        for chunk_start in range(0, len(user_lat), chunk_size):
+            chunk = slice(chunk_start, chunk_start + chunk_size)
+            towers, _ = self.candidate_matrix(user_lat[chunk], user_lng[chunk])
+            pending = np.arange(len(towers))
+
+            # Round r: every still-unassigned user asks its r-th nearest tower
+            for r in range(towers.shape[1]):
+                requested = towers[pending, r]
+                asking = requested >= 0
+                pending, requested = pending[asking], requested[asking]
+                if len(pending) == 0:
+                    break
+                accepted = rank_within_groups(requested) < free_capacity[requested]
+                np.subtract.at(free_capacity, requested[accepted], 1)
+                assignment[chunk_start + pending[accepted]] = requested[accepted]
+                pending = pending[~accepted]
+
+        return assignment
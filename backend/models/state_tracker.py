@@ -0,0 +1,70 @@
+"""
+State Tracker - change versions per tower and user for incremental snapshots and deltas
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from models.columnar import STATUS_NAMES
+
+
+class StateTracker:
+    """Stamps changed towers and users with the pending version number.
+
+    Mutations only write an integer per touched row; ``commit()`` publishes the
+    pending version, after which ``changed_towers(v)`` / ``changed_users(v)``
+    return the rows modified since version ``v``. Also keeps running status
+    counters for object-based towers so counts never need a rescan.
+    """
+
+    def __init__(self, num_towers: int, num_users: int,
+                 status_counts: Optional[Dict[str, int]] = None):
+        self.version = 0
+        self.tower_version = np.zeros(num_towers, dtype=np.int64)
+        self.user_version = np.zeros(num_users, dtype=np.int64)
+        self.status_counts = {name: 0 for name in STATUS_NAMES}
+        self.status_counts.update(status_counts or {})
+        self._pending = False
+
+    def mark_towers(self, tower_idx):
+        """Flag towers (an id or an index array) as changed"""
+        self.tower_version[tower_idx] = self.version + 1
+        self._pending = True
+
+    def mark_users(self, user_idx):
+        """Flag users (an id or an index array) as changed"""
+        self.user_version[user_idx] = self.version + 1
+        self._pending = True
+
+    def grow(self, num_towers: int, num_users: int):
+        """Extend the version arrays after towers or users were added"""
+        self.tower_version = np.concatenate([
+            self.tower_version, np.zeros(num_towers - len(self.tower_version), dtype=np.int64)])
+        self.user_version = np.concatenate([
+            self.user_version, np.zeros(num_users - len(self.user_version), dtype=np.int64)])
+
+    def mark_all(self):
+        """Flag every row, e.g. after arrays were rewritten wholesale"""
+        self.mark_towers(slice(None))
+        self.mark_users(slice(None))
+
+    def status_changed(self, old: str, new: str):
+        """Move one tower between status counters"""
+        self.status_counts[old] -= 1
+        self.status_counts[new] += 1
+
+    def commit(self) -> int:
+        """Publish pending changes as a new version; returns the current version"""
+        if self._pending:
+            self.version += 1
+            self._pending = False
+        return self.version
+
+    def changed_towers(self, since_version: int) -> np.ndarray:
+        """Ids of towers changed after `since_version`"""
+        return np.flatnonzero(self.tower_version > since_version)
+
+    def changed_users(self, since_version: int) -> np.ndarray:
+        """Ids of users changed after `since_version`"""
+        return np.flatnonzero(self.user_version > since_version)
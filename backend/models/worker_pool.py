@@ -0,0 +1,56 @@
+"""
+Worker Pool - one lazily created, bounded process pool shared by batch runs and parallel planners
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+MAX_WORKERS = max(1, int(os.environ.get('SIMULATION_MAX_WORKERS', min(os.cpu_count() or 1, 8))))
+# Workers are started from a clean server process instead of forked from a threaded
+# web worker, so they never inherit locks held by other threads (or OpenMP state)
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def worker_count(requested: Optional[int] = None, tasks: Optional[int] = None) -> int:
+    """Workers a job may use: `requested` (all by default), never more than MAX_WORKERS or `tasks`"""
+    workers = min(int(requested or MAX_WORKERS), MAX_WORKERS)
+    if tasks is not None:
+        workers = min(workers, tasks)
+    return max(1, workers)
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    """The process pool, started on first use and kept for the life of the process"""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS,
+                                        mp_context=multiprocessing.get_context(START_METHOD))
+        return _pool
+
+
+def map_in_pool(function, *iterables, workers: int = MAX_WORKERS):
+    """list(map(function, *iterables)) on the shared pool, split into about `workers` chunks.
+
+    A pool left broken by a dead worker is dropped so the next call starts a
+    fresh one; the failing call still raises.
+    """
+    global _pool
+    jobs = list(zip(*iterables))
+    chunksize = max(1, -(-len(jobs) // max(1, workers)))
+    pool = shared_pool()
+    try:
+        return list(pool.map(function, *zip(*jobs), chunksize=chunksize)) if jobs else []
+    except BrokenProcessPool:
+        with _lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False)
+        raise
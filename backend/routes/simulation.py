@@ -2,16 +2,23 @@
 Simulation Routes - Handle tower simulation and load balancing
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_cors import cross_origin
 import json
 import random
+import uuid
 import datetime
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from models.simulation import SimulationEngine, Tower, User
+from models.clock import MAX_RUN_MINUTES, checked_minutes
+from models.events import DiscreteEventSimulation, policy_interval
+from models.monte_carlo import MAX_REPLICAS, run_batch
+from models.scenarios import SCENARIOS, scenario_catalogue
+from models.session_store import SimulationSessionStore
+from models.snapshot import snapshot_path
 from ml.xgboost_predictor import XGBoostPredictor
 
 simulation_bp = Blueprint('simulation', __name__)
@@ -19,6 +26,10 @@ simulation_bp = Blueprint('simulation', __name__)
 # Initialize ML predictor
 predictor = XGBoostPredictor()
 
+# Live simulations kept between requests (what-if sessions)
+session_store = SimulationSessionStore()
+MAX_STEP_MINUTES = 24 * 60  # simulated time one step request may hold a session's lock for
+
 @simulation_bp.route('/predict', methods=['POST'])
 @cross_origin()
 def predict_tower_loads():
@@ -53,10 +64,94 @@ def predict_tower_loads():
             'error': f'خطأ في التنبؤ: {str(e)}'
         }), 500
 
+def _event_simulation(simulation, data, strategy, home=None):
+    """Event-driven dynamics for a run, brought to steady-state session occupancy.
+
+    Created before the baseline state is taken, so initial and final states
+    describe the same regime instead of an all-attached start.
+    """
+    event_simulation = DiscreteEventSimulation(
+        simulation,
+        redistribution_interval=data.get('redistribution_interval', 5),
+        mobility_per_minute=data.get('mobility_per_minute', 0.0),
+        strategy=strategy if strategy != 'greedy' else 'heap',
+        seed=data.get('seed'),
+        batch_minutes=data.get('batch_minutes'),  # opt-in batching; exact event order by default
+        home=home
+    )
+    event_simulation.warm_up()
+    return event_simulation
+
+def _event_duration(data, duration_minutes, name='duration_minutes', maximum=MAX_RUN_MINUTES):
+    """Check an event-driven run's timings before any work; ValueError (a 400) when out of range"""
+    policy_interval(data.get('redistribution_interval', 5))
+    if data.get('batch_minutes') is not None:
+        checked_minutes('batch_minutes', data['batch_minutes'])
+    return checked_minutes(name, duration_minutes, maximum=maximum)
+
+def _ndjson(record):
+    """Serialize one NDJSON line"""
+    return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+def _stream_simulation(engine_options, data, strategy, event_driven, duration_minutes, summary_only, page_size):
+    """Yield results as they are produced: towers, user pages, then final state and improvements.
+    
+    The engine is built after the start record, so the first byte does not wait
+    for tower/user generation.
+    """
+    try:
+        simulation_id = str(uuid.uuid4())
+        yield _ndjson({
+            'type': 'start',
+            'simulation_id': simulation_id,
+            'summary_only': summary_only,
+            'page_size': page_size
+        })
+        
+        simulation = SimulationEngine(**engine_options)
+        simulation.simulation_id = simulation_id
+        event_simulation = _event_simulation(simulation, data, strategy) if event_driven else None
+        initial_state = simulation.get_current_state(include_users=False)
+        yield _ndjson({'type': 'initial_state', 'state': initial_state})
+        if not summary_only:
+            for page, users in enumerate(simulation.iter_user_pages(page_size)):
+                yield _ndjson({'type': 'initial_users', 'page': page, 'users': users})
+        
+        predictions = predictor.predict_tower_loads(initial_state['towers'], rng=simulation.rng)
+        yield _ndjson({'type': 'predictions', 'predictions': predictions})
+        
+        final_state = simulation.apply_ml_redistribution(predictions, strategy=strategy, include_users=False,
+                                                       strategy_options=data.get('strategy_options'))
+        if event_simulation is not None:
+            event_results = event_simulation.run(duration_minutes)
+            simulation.clock.advance(duration_minutes)
+            yield _ndjson({'type': 'event_simulation', 'results': event_results})
+            final_state = simulation.get_current_state(include_users=False)
+        
+        yield _ndjson({'type': 'final_state', 'state': final_state})
+        if not summary_only:
+            for page, users in enumerate(simulation.iter_user_pages(page_size)):
+                yield _ndjson({'type': 'final_users', 'page': page, 'users': users})
+        
+        improvements = simulation.calculate_improvements(initial_state, final_state)
+        yield _ndjson({'type': 'improvements', 'improvements': improvements})
+        yield _ndjson({'type': 'end', 'timestamp': datetime.datetime.utcnow().isoformat()})
+        
+    except Exception as e:
+        yield _ndjson({'type': 'error', 'error': str(e)})
+
 @simulation_bp.route('/run', methods=['POST'])
 @cross_origin()
 def run_simulation():
-    """Run a complete simulation with ML predictions"""
+    """Run a complete simulation with ML predictions.
+    
+    With `event_driven`, events are handled one at a time in exact time order,
+    at tens of microseconds per event: a day of 20k users on 200 towers (over
+    a million events) takes 25-45 s. For large or long runs pass
+    `batch_minutes` (0.5 is a good setting) to settle events in windows with
+    array operations. The same day then takes a few seconds, at the price of
+    settling capacity per window instead of per event.
+    """
     try:
         data = request.get_json() or {}
         
@@ -64,23 +159,62 @@ def run_simulation():
         num_towers = data.get('num_towers', 5)
         num_users = data.get('num_users', 150)
         simulation_duration = data.get('duration_minutes', 10)
+        columnar = bool(data.get('columnar', False))
+        distribution = data.get('distribution', 'random')
+        strategy = data.get('strategy', 'greedy')
+        event_driven = bool(data.get('event_driven', False))
+        keep_session = bool(data.get('keep_session', False))
+        if event_driven:
+            simulation_duration = _event_duration(data, simulation_duration)
+        
+        # Output options: NDJSON streaming and/or no per-user data
+        stream = bool(data.get('stream', False))
+        summary_only = bool(data.get('summary_only', False))
+        page_size = max(1, int(data.get('page_size', 10000)))
+        
+        # Columnar mode keeps towers/users in NumPy arrays; the event-driven mode needs it
+        engine_options = {
+            'num_towers': num_towers,
+            'num_users': num_users,
+            'columnar': columnar or event_driven,
+            'distribution': distribution,
+            'seed': data.get('seed')
+        }
+        
+        if stream:
+            return Response(
+                stream_with_context(_stream_simulation(
+                    engine_options, data, strategy, event_driven, simulation_duration, summary_only, page_size
+                )),
+                mimetype='application/x-ndjson'
+            )
         
         # Initialize simulation
-        simulation = SimulationEngine(num_towers, num_users)
+        simulation = SimulationEngine(**engine_options)
         
-        # Run initial distribution
-        initial_state = simulation.get_current_state()
+        # Run initial distribution (in steady-state session occupancy when event-driven)
+        event_simulation = _event_simulation(simulation, data, strategy) if event_driven else None
+        initial_state = simulation.get_current_state(include_users=not summary_only)
         
         # Get ML predictions for load balancing
-        predictions = predictor.predict_tower_loads(initial_state['towers'])
+        predictions = predictor.predict_tower_loads(initial_state['towers'], rng=simulation.rng)
         
         # Apply intelligent redistribution
-        redistribution_results = simulation.apply_ml_redistribution(predictions)
+        redistribution_results = simulation.apply_ml_redistribution(
+            predictions, strategy=strategy, include_users=not summary_only,
+            strategy_options=data.get('strategy_options')
+        )
+        
+        event_results = None
+        if event_simulation is not None:
+            event_results = event_simulation.run(simulation_duration)
+            simulation.clock.advance(simulation_duration)
+            redistribution_results = simulation.get_current_state(include_users=not summary_only)
         
         # Calculate improvements
         improvements = simulation.calculate_improvements(initial_state, redistribution_results)
         
-        return jsonify({
+        response = {
             'success': True,
             'simulation_id': simulation.simulation_id,
             'initial_state': initial_state,
@@ -88,8 +222,67 @@ def run_simulation():
             'improvements': improvements,
             'predictions': predictions,
             'timestamp': datetime.datetime.utcnow().isoformat()
+        }
+        if event_results is not None:
+            response['event_simulation'] = event_results
+        if keep_session:
+            session = session_store.add(simulation)
+            session.elapsed_minutes = simulation_duration if event_driven else 0.0
+            if event_simulation is not None:
+                session.home_towers = event_simulation.home
+            response['session'] = session.to_dict()
+        
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@simulation_bp.route('/batch', methods=['POST'])
+@cross_origin()
+def run_simulation_batch():
+    """Run independent seeded replicas in parallel and return aggregated distributions"""
+    try:
+        data = request.get_json() or {}
+        
+        num_replicas = int(data.get('num_replicas', 20))
+        if not 1 <= num_replicas <= MAX_REPLICAS:
+            return jsonify({
+                'success': False,
+                'error': f'عدد التكرارات يجب أن يكون بين 1 و {MAX_REPLICAS}'
+            }), 400
+        
+        params = {
+            'num_towers': int(data.get('num_towers', 5)),
+            'num_users': int(data.get('num_users', 150)),
+            'columnar': bool(data.get('columnar', True)),
+            'distribution': data.get('distribution', 'random'),
+            'strategy': data.get('strategy', 'greedy')
+        }
+        results = run_batch(params, num_replicas, seed=data.get('seed'),
+                            max_workers=data.get('max_workers'))
+        if not data.get('include_replicas', False):
+            results.pop('replicas')
+        
+        return jsonify({
+            'success': True,
+            'parameters': params,
+            **results,
+            'timestamp': datetime.datetime.utcnow().isoformat()
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -124,21 +317,47 @@ def get_towers():
             'error': str(e)
         }), 500
 
+def _realtime_engine(num_users: int, num_towers: int = 5) -> SimulationEngine:
+    """Fresh network for the realtime feed, its users sampled inside tower coverage"""
+    engine = SimulationEngine(num_towers, 0, distribution="nearest")
+    shares = engine.rng.multinomial(num_users, [1 / num_towers] * num_towers)
+    for tower, count in zip(engine.towers, shares.tolist()):
+        engine.add_users(count, location=tower.location, radius_m=tower.coverage_radius)
+    return engine
+
 @simulation_bp.route('/realtime', methods=['GET'])
 @cross_origin()
 def get_realtime_data():
-    """Get real-time network data"""
+    """Get real-time network data, measured by the radio model on a live session or a fresh network"""
     try:
         current_time = datetime.datetime.now()
+        simulation_id = request.args.get('simulation_id')
+        if simulation_id:
+            session = session_store.get(simulation_id)
+            if session is None:
+                return _session_not_found(simulation_id)
+            with session.lock:
+                engine = session.engine
+                report = engine.radio_report(include_towers=False)
+                status = engine.status_counts()
+                active_towers = int(engine.tower_active_array().sum())
+        else:
+            engine = _realtime_engine(random.randint(120, 200))
+            report = engine.radio_report(include_towers=False)
+            status = engine.status_counts()
+            active_towers = len(engine.towers)
+        kpis = report['kpis']
         
         data = {
             'timestamp': current_time.isoformat(),
-            'total_users': random.randint(120, 200),
-            'active_towers': 5,
-            'overloaded_towers': random.randint(0, 2),
-            'network_efficiency': random.randint(85, 95),
-            'average_latency': random.uniform(45, 85),
-            'throughput_mbps': random.uniform(150, 250)
+            'total_users': len(engine.users),
+            'active_towers': active_towers,
+            'overloaded_towers': status['overloaded'],
+            # None when nobody is served: an empty sample has no latency or efficiency
+            'network_efficiency': kpis.get('satisfied_users_percentage'),
+            'average_latency': kpis.get('average_latency_ms'),
+            'throughput_mbps': kpis.get('total_throughput_mbps'),
+            'radio': kpis
         }
         
         return jsonify({
@@ -156,31 +375,396 @@ def get_realtime_data():
 @cross_origin()
 def get_scenarios():
     """Get available simulation scenarios"""
-    scenarios = [
-        {
-            'id': 'rush_hour',
-            'name': 'ساعة الذروة',
-            'description': 'محاكاة الحمل العالي في ساعات الذروة',
-            'duration': 30,
-            'expected_load': 'high'
-        },
-        {
-            'id': 'night_mode',
-            'name': 'الليل',
-            'description': 'محاكاة الحمل المنخفض في الليل',
-            'duration': 60,
-            'expected_load': 'low'
-        },
-        {
-            'id': 'event_coverage',
-            'name': 'تغطية حدث',
-            'description': 'محاكاة حدث كبير يتطلب تغطية إضافية',
-            'duration': 45,
-            'expected_load': 'extreme'
-        }
-    ]
+    return jsonify({
+        'success': True,
+        'scenarios': scenario_catalogue()
+    })
+
+@simulation_bp.route('/scenarios/<scenario_id>/run', methods=['POST'])
+@cross_origin()
+def run_scenario(scenario_id):
+    """Replay a scenario's load profile on a fresh columnar simulation"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if scenario_id not in SCENARIOS:
+            return jsonify({
+                'success': False,
+                'error': f'سيناريو غير معروف: {scenario_id}'
+            }), 404
+        
+        simulation = SimulationEngine(
+            data.get('num_towers', 5),
+            data.get('num_users', 150),
+            columnar=True,
+            distribution=data.get('distribution', 'random'),
+            seed=data.get('seed')
+        )
+        initial_state = simulation.get_current_state(include_users=False)
+        
+        hotspot = data.get('hotspot_location')  # optional [lat, lng] override
+        scenario_results = simulation.run_scenario(
+            scenario_id,
+            duration_minutes=data.get('duration_minutes'),
+            step_minutes=data.get('step_minutes', 1.0),
+            hotspot_location=tuple(hotspot) if hotspot else None,
+            redistribution_interval=data.get('redistribution_interval', 5),
+            strategy=data.get('strategy', 'heap')
+        )
+        final_state = simulation.get_current_state(include_users=bool(data.get('include_users', False)))
+        
+        return jsonify({
+            'success': True,
+            'simulation_id': simulation.simulation_id,
+            'initial_state': initial_state,
+            'final_state': final_state,
+            'scenario': scenario_results,
+            'timestamp': datetime.datetime.utcnow().isoformat()
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _session_not_found(simulation_id):
+    return jsonify({
+        'success': False,
+        'error': f'جلسة المحاكاة غير موجودة: {simulation_id}'
+    }), 404
+
+@simulation_bp.route('/sessions', methods=['GET', 'POST'])
+@cross_origin()
+def simulation_sessions():
+    """List live sessions, or create one that later requests can step, perturb and re-optimize"""
+    try:
+        if request.method == 'GET':
+            return jsonify({
+                'success': True,
+                'sessions': session_store.list(),
+                'memory_mb': round(session_store.memory_bytes() / 2 ** 20, 2)
+            })
+        
+        data = request.get_json(silent=True) or {}
+        simulation = SimulationEngine(
+            data.get('num_towers', 5),
+            data.get('num_users', 150),
+            columnar=bool(data.get('columnar', True)),
+            distribution=data.get('distribution', 'random'),
+            seed=data.get('seed')
+        )
+        session = session_store.add(simulation)
+        
+        return jsonify({
+            'success': True,
+            'session': session.to_dict(),
+            'state': simulation.get_current_state(include_users=bool(data.get('include_users', False)))
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@simulation_bp.route('/sessions/<simulation_id>', methods=['GET', 'DELETE'])
+@cross_origin()
+def simulation_session(simulation_id):
+    """Current state of a session (or only what changed since `since_version`), or delete it"""
+    if request.method == 'DELETE':
+        if not session_store.remove(simulation_id):
+            return _session_not_found(simulation_id)
+        return jsonify({'success': True, 'simulation_id': simulation_id})
     
+    session = session_store.get(simulation_id)
+    if session is None:
+        return _session_not_found(simulation_id)
+    
+    since_version = request.args.get('since_version', type=int)
+    include_users = request.args.get('include_users', 'false').lower() == 'true'
+    with session.lock:
+        state = session.engine.get_current_state(include_users=include_users, since_version=since_version)
     return jsonify({
         'success': True,
-        'scenarios': scenarios
-    })
\ No newline at end of file
+        'session': session.to_dict(),
+        'state': state
+    })
+
+def _session_operation(simulation_id, operation, check=None):
+    """Run `operation(session, data)` on a live session and answer with the resulting delta.
+
+    `check(data)` validates the request before the session is locked; a ValueError is a 400.
+    """
+    session = session_store.get(simulation_id)
+    if session is None:
+        return _session_not_found(simulation_id)
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        if check is not None:
+            check(data)
+        include_users = bool(data.get('include_users', False))
+        with session.lock:
+            engine = session.engine
+            before = engine.tracker.commit()
+            result = operation(session, data)
+            state = engine.get_current_state(include_users=include_users, since_version=before)
+        session_store.touch(session)
+        
+        return jsonify({
+            'success': True,
+            'session': session.to_dict(),
+            'result': result,
+            'changes': state,
+            'timestamp': datetime.datetime.utcnow().isoformat()
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@simulation_bp.route('/sessions/<simulation_id>/step', methods=['POST'])
+@cross_origin()
+def step_session(simulation_id):
+    """Advance a columnar session through simulated time with the event-driven model.
+
+    With `mobility` (true, or a dict of MobilityModel parameters) users also move
+    and hand over between towers over the same minutes.
+    """
+    def check(data):
+        _event_duration(data, data.get('minutes', 5), name='minutes', maximum=MAX_STEP_MINUTES)
+
+    def step(session, data):
+        minutes = float(data.get('minutes', 5))
+        event_simulation = _event_simulation(session.engine, data, data.get('strategy', 'heap'),
+                                             home=session.home_towers)
+        results = event_simulation.run(minutes)
+        session.home_towers = event_simulation.home
+        mobility = data.get('mobility')
+        if mobility:
+            if isinstance(mobility, dict):
+                session.engine.enable_mobility(**mobility)
+            elif session.engine.mobility is None:
+                session.engine.enable_mobility()
+            results['mobility'] = session.engine.mobility.step(minutes)
+        session.engine.clock.advance(minutes)  # once: both models covered the same minutes
+        session.elapsed_minutes += minutes
+        return results
+    return _session_operation(simulation_id, step, check)
+
+@simulation_bp.route('/sessions/<simulation_id>/perturb', methods=['POST'])
+@cross_origin()
+def perturb_session(simulation_id):
+    """Apply a what-if change: add_users, fail_tower or restore_tower"""
+    def perturb(session, data):
+        engine = session.engine
+        action = data.get('action')
+        if action == 'add_users':
+            location = data.get('location')  # optional [lat, lng]
+            return engine.add_users(
+                int(data.get('count', 100)),
+                location=tuple(location) if location else None,
+                radius_m=float(data.get('radius_m', 2000)),
+                usage_type=data.get('usage_type')
+            )
+        if action == 'fail_tower':
+            return engine.fail_tower(int(data['tower_id']))
+        if action == 'restore_tower':
+            return engine.restore_tower(int(data['tower_id']))
+        raise ValueError(f"Unknown perturbation: {action}")
+    return _session_operation(simulation_id, perturb)
+
+@simulation_bp.route('/sessions/<simulation_id>/reoptimize', methods=['POST'])
+@cross_origin()
+def reoptimize_session(simulation_id):
+    """Re-run ML-guided redistribution on the session's current state"""
+    def reoptimize(session, data):
+        engine = session.engine
+        before = engine.redistributed_users
+        state = engine.get_current_state(include_users=False)
+        predictions = predictor.predict_tower_loads(state['towers'], rng=engine.rng)
+        engine.apply_ml_redistribution(predictions, strategy=data.get('strategy', 'heap'), include_users=False,
+                                       strategy_options=data.get('strategy_options'))
+        return {
+            'users_redistributed': engine.redistributed_users - before,
+            'predictions': predictions,
+            'improvements': engine.calculate_improvements(state, engine.network_metrics())
+        }
+    return _session_operation(simulation_id, reoptimize)
+
+@simulation_bp.route('/sessions/<simulation_id>/snapshot', methods=['POST'])
+@cross_origin()
+def snapshot_session(simulation_id):
+    """Checkpoint a live session to a binary snapshot on disk"""
+    session = session_store.get(simulation_id)
+    if session is None:
+        return _session_not_found(simulation_id)
+    
+    try:
+        with session.lock:
+            path = session.engine.save_snapshot(snapshot_path(simulation_id))
+        return jsonify({
+            'success': True,
+            'simulation_id': simulation_id,
+            'size_mb': round(os.path.getsize(path) / 2 ** 20, 2),
+            'timestamp': datetime.datetime.utcnow().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _positive_arg(name, default, cast=int):
+    """A positive numeric query parameter; ValueError (a 400) when malformed or not positive"""
+    raw = request.args.get(name)
+    if raw is None:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        value = float('nan')  # rejected below
+    if not 0 < value < float('inf'):
+        raise ValueError(f'المعامل {name} يجب أن يكون رقماً موجباً')
+    return value
+
+@simulation_bp.route('/sessions/<simulation_id>/history', methods=['GET'])
+@cross_origin()
+def session_history(simulation_id):
+    """Redistribution moves of a session: records, CSV export, or aggregates (view=pairs|timeline)"""
+    session = session_store.get(simulation_id)
+    if session is None:
+        return _session_not_found(simulation_id)
+
+    try:
+        view = request.args.get('view', 'records')
+        with session.lock:
+            history = session.engine.redistribution_history
+            if request.args.get('format') == 'csv':
+                return Response(history.to_csv(), mimetype='text/csv')
+            if view == 'pairs':
+                result = history.pair_totals(_positive_arg('limit', None))
+            elif view == 'timeline':
+                result = history.moves_over_time(_positive_arg('bucket_seconds', 60.0, float))
+            elif view == 'records':
+                result = history.latest(_positive_arg('limit', 1000))
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': f'طريقة عرض غير معروفة: {view}'
+                }), 400
+            retained, total_logged = len(history), history.total_logged
+        return jsonify({
+            'success': True,
+            'simulation_id': simulation_id,
+            'retained': retained,
+            'total_logged': total_logged,
+            'retention': history.retention,
+            view: result
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@simulation_bp.route('/sessions/<simulation_id>/radio', methods=['GET'])
+@cross_origin()
+def session_radio(simulation_id):
+    """SINR, throughput and latency of a session's users, as network and per-tower KPIs"""
+    session = session_store.get(simulation_id)
+    if session is None:
+        return _session_not_found(simulation_id)
+
+    try:
+        include_towers = request.args.get('include_towers', 'true').lower() == 'true'
+        with session.lock:
+            report = session.engine.radio_report(include_towers=include_towers)
+        return jsonify({
+            'success': True,
+            'simulation_id': simulation_id,
+            **report
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@simulation_bp.route('/sessions/<simulation_id>/handovers', methods=['GET'])
+@cross_origin()
+def session_handovers(simulation_id):
+    """Handover attempts, failures and ping-pongs per tower, shaped for the policy engine"""
+    session = session_store.get(simulation_id)
+    if session is None:
+        return _session_not_found(simulation_id)
+
+    try:
+        with session.lock:
+            handovers = session.engine.handovers
+            return jsonify({
+                'success': True,
+                'simulation_id': simulation_id,
+                'totals': handovers.totals(),
+                'towers': handovers.tower_records()
+            })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@simulation_bp.route('/sessions/restore', methods=['POST'])
+@cross_origin()
+def restore_session():
+    """Load a snapshot back into the session store (memory-mapped)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        simulation_id = data.get('simulation_id', '')
+        try:
+            if not isinstance(simulation_id, str):
+                raise ValueError(simulation_id)  # uuid.UUID fails on other types with AttributeError
+            path = snapshot_path(simulation_id)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': f'معرف محاكاة غير صالح: {simulation_id}'
+            }), 400
+        if not os.path.exists(path):
+            return jsonify({
+                'success': False,
+                'error': f'لا توجد لقطة محفوظة للمحاكاة: {simulation_id}'
+            }), 404
+        
+        session = session_store.add(SimulationEngine.load_snapshot(path))
+        return jsonify({
+            'success': True,
+            'session': session.to_dict()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -4,6 +4,8 @@ import os
 from datetime import datetime, timedelta
 import random
 
+from models.radio import cell_throughput_mbps, latency_ms
+
 trc_data_bp = Blueprint('trc_data', __name__)
 
 # Load TRC data
@@ -170,8 +172,9 @@ def generate_realtime_data():
                 # Calculate derived metrics
                 rsrp = -70 - (load_percentage * 0.2) + random.uniform(-5, 5)
                 sinr = 25 - (load_percentage * 0.15) + random.uniform(-3, 3)
-                throughput = 60 - (load_percentage * 0.3) + random.uniform(-10, 10)
-                latency = 20 + (load_percentage * 0.2) + random.uniform(-5, 5)
+                # Throughput and latency follow from SINR and load through the radio model
+                throughput = float(cell_throughput_mbps(sinr))
+                latency = float(latency_ms(load_percentage / 100, sinr))
                 
                 # Handover attempts based on load
                 handover_attempts = int(load_percentage / 10) + random.randint(0, 5)
@@ -0,0 +1,22 @@
+"""
+Shared pytest setup: the backend modules are imported the way app.py imports them
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    """Test client for the simulation routes, mounted where app.py mounts them"""
+    pytest.importorskip('google.cloud.aiplatform')  # pulled in by the routes' predictor
+    from flask import Flask
+    from routes.simulation import simulation_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(simulation_bp, url_prefix='/api/simulation')
+    return app.test_client()
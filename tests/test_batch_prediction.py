@@ -0,0 +1,64 @@
+"""
+Heuristic batch predictions: one NumPy pass over every tower
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip('google.cloud.aiplatform')
+
+from ml.features import build_feature_matrix
+from ml.xgboost_predictor import PREDICTION_NOISE, XGBoostPredictor
+
+WEDNESDAY_PEAK = datetime(2026, 10, 14, 9)
+SATURDAY_NIGHT = datetime(2026, 10, 17, 23)
+TOWERS = {
+    'current_load': np.array([100.0, 10.0, 400.0]),
+    'historical_avg_load': np.array([50.0, 5.0, 400.0]),
+    'user_density': np.array([0.0, 0.0, 250.0]),
+    'capacity': np.array([200.0, 200.0, 100.0]),
+}
+
+
+@pytest.fixture
+def predictor(tmp_path):
+    return XGBoostPredictor(model_path=str(tmp_path), use_vertex_ai=False, preload_model=False)
+
+
+def test_heuristic_by_hand(predictor):
+    peak = predictor.predict_tower_loads_batch(TOWERS, WEDNESDAY_PEAK, noise=0)
+    # 0.6 * 100 + 0.4 * 50 = 80 at the 1.2 peak factor; tower 1 (8 * 1.2) is floored at 10
+    # and tower 2 is capped at 1.3x capacity
+    np.testing.assert_allclose(peak, [96.0, 10.0, 130.0])
+
+    quiet = predictor.predict_tower_loads_batch(TOWERS, SATURDAY_NIGHT, noise=0)
+    np.testing.assert_allclose(quiet[:2], [80 * 0.8 * 0.9, 10.0])
+
+
+def test_matrix_and_dict_inputs_agree(predictor):
+    matrix = build_feature_matrix(TOWERS, predictor.feature_columns, WEDNESDAY_PEAK)
+    np.testing.assert_array_equal(predictor.predict_tower_loads_batch(matrix, noise=0),
+                                  predictor.predict_tower_loads_batch(TOWERS, WEDNESDAY_PEAK, noise=0))
+
+
+def test_ids_scatter_predictions(predictor):
+    predicted = predictor.predict_tower_loads_batch(dict(TOWERS, id=np.array([4, 0, 2])), WEDNESDAY_PEAK, noise=0)
+    assert len(predicted) == 5
+    np.testing.assert_allclose(predicted[[4, 0, 2]], [96.0, 10.0, 130.0])
+    assert np.isnan(predicted[[1, 3]]).all()
+
+
+def test_noise_is_bounded_and_seeded(predictor):
+    first = predictor.predict_tower_loads_batch(TOWERS, WEDNESDAY_PEAK, rng=np.random.default_rng(7))
+    second = predictor.predict_tower_loads_batch(TOWERS, WEDNESDAY_PEAK, rng=np.random.default_rng(7))
+    np.testing.assert_array_equal(first, second)
+    assert abs(first[0] / 96.0 - 1) <= PREDICTION_NOISE
+
+
+def test_local_records_match_the_batch(predictor):
+    records = [{'id': 10 + i, **{name: float(values[i]) for name, values in TOWERS.items()}} for i in range(3)]
+    local = predictor.predict_tower_loads_local(records, rng=np.random.default_rng(3))
+    batch = predictor.predict_tower_loads_batch(TOWERS, rng=np.random.default_rng(3))
+    assert local == dict(zip([10, 11, 12], batch.tolist()))
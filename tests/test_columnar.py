@@ -0,0 +1,192 @@
+"""
+Columnar engine state matches the object model for the same seeded network
+"""
+
+import numpy as np
+import pytest
+
+from models.columnar import ColumnarNetwork, TowerView, UserView, STATUS_NAMES
+from models.redistribution import Move
+from models.simulation import SimulationEngine, Tower, User
+from models.snapshot import network_columns, TOWER_COLUMNS, USER_COLUMNS
+
+
+def engine_pair(num_towers=8, num_users=1200, seed=3):
+    """A seeded object engine and a columnar engine holding the very same network"""
+    objects = SimulationEngine(num_towers, num_users, seed=seed)
+    network = ColumnarNetwork(0, 0)
+    for name, values in network_columns(objects).items():
+        setattr(network, name, values.copy())
+    network.update_status()
+    columnar = SimulationEngine(0, 0, columnar=True, seed=seed)
+    columnar.adopt_network(network)
+    return objects, columnar
+
+
+def stored(record):
+    """A User.to_dict record with consumption rounded to the columnar float32"""
+    return dict(record, data_consumption=float(np.float32(record['data_consumption'])))
+
+
+def assert_same_state(objects, columnar):
+    expected = network_columns(objects)
+    for name in TOWER_COLUMNS + USER_COLUMNS:
+        np.testing.assert_array_equal(getattr(columnar.network, name), expected[name], err_msg=name)
+    assert columnar.status_counts() == objects.status_counts()
+    assert columnar.get_current_state()['towers'] == objects.get_current_state()['towers']
+
+
+def test_adopted_network_serializes_like_objects():
+    objects, columnar = engine_pair()
+    state = columnar.get_current_state()
+    assert state['towers'] == objects.get_current_state()['towers']
+    assert state['users'] == [stored(user.to_dict()) for user in objects.users]
+    assert columnar.status_counts() == objects.status_counts()
+
+
+def test_apply_moves_matches_objects():
+    objects, columnar = engine_pair()
+    load, capacity = objects.tower_load_arrays()
+    source = int(np.argmax(load))
+    first_target, second_target = np.argsort(load)[:2].tolist()
+    spare = int(capacity[first_target] - load[first_target])
+    plan = [Move(source, first_target, spare // 2), Move(source, second_target, 3)]
+
+    assert columnar.apply_moves(plan) == objects.apply_moves(plan)
+    assert_same_state(objects, columnar)
+    assert columnar.redistributed_users == objects.redistributed_users
+
+
+def test_greedy_redistribution_matches_objects():
+    objects, columnar = engine_pair()
+    objects.apply_ml_redistribution({}, strategy='greedy')
+    columnar.apply_ml_redistribution({}, strategy='greedy')
+
+    np.testing.assert_array_equal(columnar.network.tower_load, network_columns(objects)['tower_load'])
+    np.testing.assert_array_equal(columnar.network.tower_status, network_columns(objects)['tower_status'])
+    assert columnar.status_counts() == objects.status_counts()
+    assert columnar.redistributed_users == objects.redistributed_users
+    assert columnar.redistribution_history.columns()['users_moved'].tolist() == \
+        objects.redistribution_history.columns()['users_moved'].tolist()
+
+
+def test_apply_moves_clips_oversubscribed_source():
+    network = ColumnarNetwork(3, 10)
+    network.tower_capacity[:] = 20
+    network.move_users(np.arange(10), np.array([0] * 4 + [1] * 6))
+
+    # The source has 4 users; the plan asks for 3 + 3 + 2 of them
+    moved = network.apply_moves(np.array([0, 0, 0]), np.array([2, 2, 2]), np.array([3, 3, 2]))
+
+    assert moved.tolist() == [3, 1, 0]
+    assert network.tower_load.tolist() == [0, 6, 4]
+    assert network.users_of(1).tolist() == list(range(4, 10))  # the next tower's users stay put
+    assert network.users_of(2).tolist() == [0, 1, 2, 3]
+
+
+def test_apply_moves_clips_to_target_room_like_objects():
+    objects, columnar = engine_pair()
+    load, capacity = objects.tower_load_arrays()
+    source, second_source = np.argsort(load)[::-1][:2].tolist()
+    target = int(np.argmin(load))
+    room = int(capacity[target] - load[target])
+    # The target is oversubscribed; it has room again once the third move takes users away
+    plan = [Move(source, target, room - 2), Move(second_source, target, 5), Move(target, source, 3),
+            Move(second_source, target, 10)]
+
+    assert columnar.apply_moves(plan) == objects.apply_moves(plan) == room + 6
+    assert_same_state(objects, columnar)
+    assert columnar.network.tower_load[target] == capacity[target]
+    for engine in (objects, columnar):
+        log = engine.redistribution_history.columns()
+        assert log['users_moved'].tolist() == [room - 2, 2, 3, 3]
+        assert log['iteration'].tolist() == [0, 1, 2, 3]
+
+
+def test_apply_moves_skips_inactive_targets():
+    network = ColumnarNetwork(2, 4)
+    network.tower_capacity[:] = 10
+    network.move_users(np.arange(4), 0)
+    network.set_tower_active(1, False)
+    assert network.apply_moves(np.array([0]), np.array([1]), np.array([2])).tolist() == [0]
+    assert network.tower_load.tolist() == [4, 0]
+
+
+def test_assign_within_capacity_keeps_first_arrivals():
+    rng = np.random.default_rng(5)
+    capacity = rng.integers(3, 10, 6)
+    requested = rng.integers(0, 6, 80)
+    active = np.array([True, True, False, True, True, True])
+
+    towers = [Tower(i, (0.0, 0.0), int(capacity[i])) for i in range(6)]
+    for tower, is_active in zip(towers, active):
+        tower.active = bool(is_active)
+    users = [User(i, (0.0, 0.0), rng=rng) for i in range(80)]
+    expected = np.array([towers[t].add_user(user) for user, t in zip(users, requested.tolist())])
+
+    network = ColumnarNetwork(6, 80)
+    network.tower_capacity[:] = capacity
+    network.tower_active[:] = active
+    accepted = network.assign_within_capacity(np.arange(80), requested)
+
+    np.testing.assert_array_equal(accepted, expected)
+    assert network.tower_load.tolist() == [t.current_load for t in towers]
+    assert [STATUS_NAMES[s] for s in network.tower_status] == [t.status for t in towers]
+    np.testing.assert_array_equal(network.user_tower, np.where(expected, requested, -1))
+
+
+def test_scalar_attach_detach_match_bulk_moves():
+    scalar, bulk = ColumnarNetwork(2, 6), ColumnarNetwork(2, 6)
+    for network in (scalar, bulk):
+        network.tower_capacity[:] = 5
+
+    assert [scalar.attach_user(user, 0) for user in range(6)] == [True] * 5 + [False]
+    bulk.move_users(np.arange(5), 0)
+    np.testing.assert_array_equal(scalar.tower_load, bulk.tower_load)
+    np.testing.assert_array_equal(scalar.status_counts(), bulk.status_counts())
+
+    assert scalar.detach_user(3) == 0
+    assert scalar.detach_user(3) == -1
+    bulk.move_users(np.array([3]), -1)
+    np.testing.assert_array_equal(scalar.user_tower, bulk.user_tower)
+    np.testing.assert_array_equal(scalar.tower_status, bulk.tower_status)
+    np.testing.assert_array_equal(scalar.status_counts(), bulk.status_counts())
+
+    scalar.set_tower_active(1, False)
+    assert not scalar.attach_user(5, 1)
+
+    recomputed = ColumnarNetwork(2, 6)
+    recomputed.tower_capacity[:] = 5
+    recomputed.user_tower[:] = scalar.user_tower
+    recomputed.recompute()
+    np.testing.assert_array_equal(scalar.tower_load, recomputed.tower_load)
+    np.testing.assert_array_equal(scalar.status_counts(), recomputed.status_counts())
+
+
+def test_views_behave_like_tower_and_user():
+    objects, columnar = engine_pair(num_towers=4, num_users=300)
+    tower, obj_tower = columnar.towers[1], objects.towers[1]
+    user_id = next(u.id for u in objects.users if u.connected_tower is not objects.towers[1]
+                   and u.connected_tower is not None)
+    user, obj_user = columnar.users[user_id], objects.users[user_id]
+
+    assert isinstance(tower, TowerView) and isinstance(user, UserView)
+    assert tower.to_dict() == obj_tower.to_dict()
+    assert user.to_dict() == stored(obj_user.to_dict())
+    assert [u.id for u in tower.users] == [u.id for u in obj_tower.users]
+    assert [u.id for u in tower.first_users(3)] == [u.id for u in obj_tower.first_users(3)]
+    assert columnar.towers[-1] == TowerView(columnar.network, 3)
+    with pytest.raises(IndexError):
+        columnar.towers[4]
+
+    previous = user.connected_tower
+    user.connected_tower = None
+    assert columnar.network.user_tower[user_id] == -1
+    assert previous.current_load == obj_user.connected_tower.current_load - 1
+
+    assert tower.add_users([user]) == [user]
+    assert tower.has_user(user) and user.connected_tower == tower
+    assert tower.remove_user(user) and not tower.remove_user(user)
+    assert tower.add_user(user)
+    assert tower.remove_users([user]) == 1
+    assert tower.current_load == obj_tower.current_load
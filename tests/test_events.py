@@ -0,0 +1,126 @@
+"""
+Discrete-event simulation handles events in exact time order by default
+"""
+
+import numpy as np
+import pytest
+
+from models.clock import MAX_RUN_MINUTES
+from models.events import MIN_REDISTRIBUTION_INTERVAL, DiscreteEventSimulation
+from models.simulation import SimulationEngine
+
+
+class ScriptedExponentials:
+    """Stands in for the simulation's generator, returning scripted standard exponentials"""
+
+    def __init__(self, values):
+        self._values = list(values)
+
+    def standard_exponential(self, size=None):
+        if size is None:
+            return self._values.pop(0)
+        drawn, self._values = self._values[:size], self._values[size:]
+        return np.array(drawn, dtype=np.float64)
+
+
+def one_slot_network() -> SimulationEngine:
+    """One tower with room for one user; user 0 is in a session, user 1 idle at the same spot"""
+    engine = SimulationEngine(1, 2, columnar=True, seed=0)
+    network = engine.network
+    network.user_lat[:], network.user_lng[:] = network.tower_lat[0], network.tower_lng[0]
+    network.tower_capacity[:] = 1
+    network.user_tower[:] = [0, -1]
+    network.recompute()
+    return engine
+
+
+def scripted_run(batch_minutes=None, duration_minutes=10.0):
+    engine = one_slot_network()
+    simulation = DiscreteEventSimulation(engine, mean_session_minutes=3.0, mean_idle_minutes=10.0,
+                                         redistribution_interval=0, batch_minutes=batch_minutes,
+                                         home=np.array([0, 0]))
+    # Initial draws put user 0's session end at 3.0 and user 1's arrival at 2.95, then:
+    #   2.95 user 1 arrives, tower full -> blocked, retries at 2.95 + 10 * 0.1 = 3.95
+    #   3.00 user 0 ends its session      -> idle until 3.00 + 10 * 0.5 = 8.00
+    #   3.95 user 1 arrives               -> session until 3.95 + 3 * 1.0 = 6.95
+    #   6.95 user 1 ends its session      -> idle until 6.95 + 10 * 1.0 = 16.95
+    #   8.00 user 0 arrives               -> session until 8.00 + 3 * 1.0 = 11.00
+    simulation.rng = ScriptedExponentials([1.0, 0.295, 0.1, 0.5, 1.0, 1.0, 1.0])
+    return engine, simulation.run(duration_minutes)
+
+
+def test_events_follow_hand_computed_trace():
+    engine, results = scripted_run()
+
+    assert results['events_processed'] == 5
+    assert results['stats']['arrival'] == 3
+    assert results['stats']['session_end'] == 2
+    assert results['stats']['blocked_arrivals'] == 1
+    assert engine.network.user_tower.tolist() == [0, -1]
+    assert engine.network.tower_load.tolist() == [1]
+
+
+def test_batching_is_opt_in_and_settles_a_window_at_once():
+    engine, results = scripted_run(duration_minutes=3.5)
+    assert results['stats']['blocked_arrivals'] == 1
+    assert engine.network.user_tower.tolist() == [-1, -1]
+
+    # The 0.1 minute window holds both 2.95 and 3.00: user 0's slot is freed
+    # before user 1 arrives, so user 1 is placed at 2.95 instead of blocked
+    engine, results = scripted_run(batch_minutes=0.1, duration_minutes=3.5)
+    assert results['stats']['blocked_arrivals'] == 0
+    assert engine.network.user_tower.tolist() == [-1, 0]
+
+
+def test_rejects_non_positive_batch():
+    with pytest.raises(ValueError):
+        DiscreteEventSimulation(one_slot_network(), batch_minutes=0)
+
+
+@pytest.mark.parametrize('duration', [float('nan'), float('inf'), 0, -5, MAX_RUN_MINUTES + 1, 'soon'])
+def test_run_rejects_unbounded_durations(duration):
+    with pytest.raises(ValueError):
+        DiscreteEventSimulation(one_slot_network()).run(duration)
+
+
+@pytest.mark.parametrize('options', [
+    {'redistribution_interval': float('nan')},
+    {'redistribution_interval': float('inf')},
+    {'redistribution_interval': -1},
+    {'redistribution_interval': MIN_REDISTRIBUTION_INTERVAL / 10},
+    {'batch_minutes': float('nan')},
+])
+def test_rejects_unbounded_timings(options):
+    with pytest.raises(ValueError):
+        DiscreteEventSimulation(one_slot_network(), **options)
+
+
+def test_zero_interval_turns_the_policy_off():
+    simulation = DiscreteEventSimulation(one_slot_network(), redistribution_interval=0)
+    assert simulation.run(30.0)['stats']['redistribute'] == 0
+
+
+@pytest.mark.parametrize('body', [
+    '{"event_driven": true, "duration_minutes": NaN}',
+    '{"event_driven": true, "duration_minutes": Infinity, "stream": true}',
+    '{"event_driven": true, "redistribution_interval": 0.001}',
+])
+def test_run_route_rejects_unbounded_timings(client, body):
+    response = client.post('/api/simulation/run', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_exact_and_batched_runs_agree_statistically():
+    results = {}
+    for batch_minutes in (None, 0.1):
+        engine = SimulationEngine(20, 4000, columnar=True, distribution='nearest', seed=11)
+        simulation = DiscreteEventSimulation(engine, mobility_per_minute=0.2, seed=3,
+                                             batch_minutes=batch_minutes)
+        simulation.warm_up()
+        results[batch_minutes] = simulation.run(60.0)
+
+    exact, batched = results[None]['stats'], results[0.1]['stats']
+    assert exact['arrival'] == pytest.approx(batched['arrival'], rel=0.1)
+    assert exact['session_end'] == pytest.approx(batched['session_end'], rel=0.1)
+    assert exact['mobility'] == pytest.approx(batched['mobility'], rel=0.1)
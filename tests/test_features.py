@@ -0,0 +1,90 @@
+"""
+Training and inference build the same feature matrix from any tower record layout
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from ml.features import FEATURE_COLUMNS, FEATURE_DEFAULTS, build_feature_matrix, scale_features
+
+TIMESTAMP = datetime(2024, 5, 14, 17, 30)  # a Tuesday
+
+
+def tower_records(count=50, seed=0):
+    """Tower dicts as the simulation hands them to the predictor, some features left out"""
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(count):
+        record = {
+            'id': i,
+            'current_load': int(rng.integers(0, 250)),
+            'capacity': int(rng.integers(150, 251)),
+            'historical_avg_load': float(rng.uniform(50, 200)),
+            'user_density': float(rng.uniform(0, 100)),
+            'tower_age': int(rng.integers(1, 20)),
+            'coverage_area': float(rng.uniform(1, 30)),
+            'nearby_towers_count': int(rng.integers(0, 10)),
+            'operator_type': int(rng.integers(0, 3))
+        }
+        if i % 3 == 0:
+            del record['user_density']
+        records.append(record)
+    return records
+
+
+def column_layout(records):
+    """Dict of per-tower arrays with defaults filled in, as a feature store would hold them"""
+    return {name: np.array([row.get(name, FEATURE_DEFAULTS[name]) for row in records], dtype=np.float64)
+            for name in FEATURE_COLUMNS if name in FEATURE_DEFAULTS}
+
+
+def test_record_defaults_and_time_features():
+    matrix = build_feature_matrix(tower_records(), timestamp=TIMESTAMP)
+
+    assert matrix.shape == (50, len(FEATURE_COLUMNS))
+    assert matrix.dtype == np.float32
+    assert (matrix[:, FEATURE_COLUMNS.index('time_of_day')] == 17).all()
+    assert (matrix[:, FEATURE_COLUMNS.index('day_of_week')] == 1).all()
+    assert matrix[0, FEATURE_COLUMNS.index('user_density')] == FEATURE_DEFAULTS['user_density']
+
+
+def test_layouts_agree():
+    records = tower_records()
+    expected = build_feature_matrix(records, timestamp=TIMESTAMP)
+    columns = column_layout(records)
+
+    np.testing.assert_array_equal(build_feature_matrix(columns, timestamp=TIMESTAMP), expected)
+    pandas = pytest.importorskip('pandas')
+    np.testing.assert_array_equal(build_feature_matrix(pandas.DataFrame(columns), timestamp=TIMESTAMP), expected)
+    pyarrow = pytest.importorskip('pyarrow')
+    np.testing.assert_array_equal(build_feature_matrix(pyarrow.table(columns), timestamp=TIMESTAMP), expected)
+
+
+def test_training_rows_carry_their_own_time():
+    records = tower_records()
+    for i, row in enumerate(records):
+        row['time_of_day'], row['day_of_week'] = i % 24, i % 7
+    matrix = build_feature_matrix(records, timestamp=TIMESTAMP)
+
+    assert matrix[:, FEATURE_COLUMNS.index('time_of_day')].tolist() == [i % 24 for i in range(50)]
+    assert matrix[:, FEATURE_COLUMNS.index('day_of_week')].tolist() == [i % 7 for i in range(50)]
+
+
+def test_single_row_matches_batch():
+    records = tower_records()
+    batch = build_feature_matrix(records, timestamp=TIMESTAMP)
+    for i in (0, 1, 49):
+        np.testing.assert_array_equal(build_feature_matrix([records[i]], timestamp=TIMESTAMP)[0], batch[i])
+
+
+def test_scaling_is_identical_for_training_and_inference():
+    matrix = build_feature_matrix(tower_records(), timestamp=TIMESTAMP)
+    mean = matrix.astype(np.float64).mean(axis=0)
+    scale = matrix.astype(np.float64).std(axis=0) + 1.0
+
+    training = scale_features(matrix, mean, scale)
+    inference = scale_features(build_feature_matrix(tower_records()[:5], timestamp=TIMESTAMP), mean, scale)
+    np.testing.assert_array_equal(inference, training[:5])
+    assert training.dtype == np.float32
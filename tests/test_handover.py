@@ -0,0 +1,69 @@
+"""
+Handover counters: attempts, failures and ping-pongs per source tower
+"""
+
+import numpy as np
+
+from models.clock import SimulationClock
+from models.handover import CELL_CENTER_SINR_DB, HandoverCounters, target_sinr_db
+
+
+def test_counts_attempts_and_failures_on_the_source():
+    counters = HandoverCounters(3, 4)
+    found = counters.record(np.array([0, 1, 2]), np.array([0, 0, 1]), np.array([1, 2, 2]),
+                            np.array([True, False, True]), at=1.0)
+
+    assert found == 0
+    assert counters.attempts.tolist() == [2, 1, 0]
+    assert counters.failures.tolist() == [1, 0, 0]
+    assert counters.incoming.tolist() == [0, 1, 1]
+    np.testing.assert_allclose(counters.failure_rate(), [50.0, 0.0, 0.0])
+
+
+def test_ping_pong_only_within_the_window():
+    counters = HandoverCounters(2, 2, ping_pong_window=2.0)
+    counters.record(np.array([0, 1]), np.array([0, 0]), np.array([1, 1]), np.array([True, True]), at=0.0)
+    # User 0 bounces back after 1.5 minutes, user 1 only after 3
+    found = counters.record(np.array([0, 1]), np.array([1, 1]), np.array([0, 0]), np.array([True, True]),
+                            at=np.array([1.5, 3.0]))
+
+    assert found == 1
+    assert counters.ping_pongs.tolist() == [0, 1]
+
+
+def test_failed_attempts_do_not_start_a_ping_pong():
+    counters = HandoverCounters(2, 1)
+    counters.record(np.array([0]), np.array([0]), np.array([1]), np.array([False]), at=0.0)
+    assert counters.record(np.array([0]), np.array([1]), np.array([0]), np.array([True]), at=0.5) == 0
+
+
+def test_grows_for_new_users_and_reports_totals():
+    clock = SimulationClock(12.0)
+    counters = HandoverCounters(2, 1, clock=clock)
+    counters.record(np.array([5]), np.array([1]), np.array([0]), np.array([False]), at=12.0)
+
+    assert len(counters.last_source) == 6
+    assert counters.totals() == {'handover_attempts': 1, 'handover_failures': 1, 'ping_pongs': 0,
+                                 'failure_rate': 100.0, 'simulated_minutes': 12.0}
+    assert counters.tower_records()[1] == {'cell_id': 1, 'handover_attempts': 1, 'handover_failures': 1,
+                                           'ping_pongs': 0, 'incoming_handovers': 0, 'failure_rate': 100.0}
+
+
+def test_target_sinr_falls_with_distance_and_load():
+    sinr = target_sinr_db(np.array([0.0, 3000.0, 3000.0]), 3000.0, np.array([0.0, 0.0, 1.0]), 0.0)
+    assert sinr[0] == CELL_CENTER_SINR_DB
+    assert sinr[0] > sinr[1] > sinr[2]
+
+
+def test_handover_route_reports_counters(client):
+    created = client.post('/api/simulation/sessions', json={
+        'num_towers': 30, 'num_users': 3000, 'seed': 8, 'distribution': 'nearest'}).get_json()
+    base = f"/api/simulation/sessions/{created['session']['simulation_id']}"
+    client.post(f'{base}/step', json={'minutes': 5, 'mobility': {'corridor_bias': 1.0}})
+
+    body = client.get(f'{base}/handovers').get_json()
+    assert body['success'], body.get('error')
+    assert body['totals']['simulated_minutes'] == 5
+    assert len(body['towers']) == 30
+    assert sum(t['handover_attempts'] for t in body['towers']) == body['totals']['handover_attempts']
+    client.delete(base)
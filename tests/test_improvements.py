@@ -0,0 +1,71 @@
+"""
+Improvements are derived from tower arrays and only compare like with like
+"""
+
+import numpy as np
+import pytest
+
+from models.improvements import compare, metrics_from_towers, network_metrics, same_population
+from models.simulation import SimulationEngine
+
+
+def test_network_metrics_by_hand():
+    # Utilizations 0.5, 0.9 and 1.2; the inactive tower is left out of the balance
+    metrics = network_metrics(np.array([5, 9, 12, 0]), np.array([10, 10, 10, 10]),
+                              np.array([True, True, True, False]))
+
+    assert metrics['active_users'] == 26
+    assert metrics['mean_utilization'] == round(2.6 / 3, 6)
+    assert metrics['load_variance'] == round(float(np.var([0.5, 0.9, 1.2])), 6)
+    assert metrics['congested_user_fraction'] == pytest.approx(21 / 26)
+    assert metrics['overloaded_towers'] == 1
+    assert metrics['congested_towers'] == 1
+
+
+def test_empty_network_has_zero_metrics():
+    metrics = network_metrics(np.zeros(3), np.full(3, 10), np.zeros(3, dtype=bool))
+    assert metrics['active_users'] == 0
+    assert metrics['congested_user_fraction'] == metrics['modeled_latency_ms'] == 0.0
+
+
+def test_metrics_from_towers_matches_arrays():
+    engine = SimulationEngine(12, 1500, seed=2)
+    assert metrics_from_towers(engine.get_current_state()['towers']) == engine.network_metrics()
+
+
+def test_balancing_a_fixed_population_improves_every_metric():
+    capacity, active = np.full(4, 10), np.ones(4, dtype=bool)
+    before = network_metrics(np.array([12, 10, 2, 0]), capacity, active)
+    after = network_metrics(np.array([6, 6, 6, 6]), capacity, active)
+    result = compare(before, after)
+
+    assert result['same_population']
+    assert result['overloaded_reduction'] == '100.0%'
+    assert result['congested_reduction'] == '100.0%'
+    assert result['network_efficiency_gain'] == '100.0%'
+    assert float(result['latency_improvement'].rstrip('%')) > 0
+    assert result['user_satisfaction_increase'] == '91.7%'
+
+
+def test_population_change_leaves_size_dependent_metrics_out():
+    capacity, active = np.full(4, 10), np.ones(4, dtype=bool)
+    before = network_metrics(np.array([4, 4, 4, 4]), capacity, active)
+    after = network_metrics(np.array([8, 8, 8, 8]), capacity, active)
+    result = compare(before, after)
+
+    assert not same_population(before, after)
+    assert result['overloaded_reduction'] is result['latency_improvement'] is None
+    # Perfectly balanced either way: twice the users is not a balance change
+    assert result['network_efficiency_gain'] == '0.0%'
+    assert result['active_users'] == {'before': 16, 'after': 32}
+
+
+def test_improvements_are_deterministic():
+    results = []
+    for _ in range(2):
+        engine = SimulationEngine(15, 2000, seed=6)
+        initial = engine.get_current_state()
+        engine.apply_ml_redistribution({}, strategy='greedy')
+        results.append(engine.calculate_improvements(initial, engine.get_current_state()))
+    assert results[0] == results[1]
+    assert results[0]['same_population']
@@ -0,0 +1,77 @@
+"""
+A saved tower model is loaded lazily and served locally; the heuristic is only a fallback
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('google.cloud.aiplatform')
+xgb = pytest.importorskip('xgboost')
+
+from ml.features import build_feature_matrix
+from ml.xgboost_predictor import TREE_EVALUATOR_MAX_BATCH, XGBoostPredictor
+
+
+def towers(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{'id': i, 'current_load': float(rng.uniform(0, 250)), 'capacity': 200.0,
+             'historical_avg_load': float(rng.uniform(50, 150)), 'user_density': float(rng.uniform(0, 300)),
+             'time_of_day': int(rng.integers(0, 24)), 'day_of_week': int(rng.integers(0, 7))}
+            for i in range(count)]
+
+
+def local_predictor(path):
+    return XGBoostPredictor(model_path=str(path), use_vertex_ai=False, preload_model=False)
+
+
+@pytest.fixture
+def bundle_path(tmp_path):
+    """A model bundle trained on synthetic towers, with a standard scaler"""
+    predictor = local_predictor(tmp_path)
+    data = towers(500)
+    features = build_feature_matrix(data, predictor.feature_columns)
+    target = 0.7 * features[:, 0] + 0.3 * features[:, 4]
+    mean, scale = features.mean(axis=0), np.maximum(features.std(axis=0), 1e-6)
+    booster = xgb.train({'max_depth': 4, 'seed': 0}, xgb.DMatrix((features - mean) / scale, label=target),
+                        num_boost_round=20)
+    predictor._set_inference(booster, None)
+    predictor._scaler_mean, predictor._scaler_scale = mean.astype(np.float64), scale.astype(np.float64)
+    predictor.save_model()
+    return tmp_path
+
+
+def test_heuristic_without_a_bundle(tmp_path):
+    predictor = local_predictor(tmp_path)
+    monitoring = predictor.model_performance_monitoring()
+    assert monitoring['model_info']['is_trained'] is False
+    assert monitoring['health_status']['status'] == 'needs_training'
+
+    predicted = predictor.predict_tower_loads(towers(5), rng=np.random.default_rng(1))
+    assert predicted == predictor.predict_tower_loads_local(towers(5), rng=np.random.default_rng(1))
+
+
+def test_monitoring_reports_a_bundle_before_any_prediction(bundle_path):
+    predictor = local_predictor(bundle_path)
+    assert predictor.booster is None
+
+    monitoring = predictor.model_performance_monitoring()
+    assert monitoring['model_info']['is_trained'] is True
+    assert monitoring['model_info']['model_version'] == 'v1'
+    assert monitoring['health_status']['status'] == 'healthy'
+
+
+def test_serves_the_saved_booster(bundle_path):
+    predictor = local_predictor(bundle_path)
+    data = towers(TREE_EVALUATOR_MAX_BATCH * 4, seed=1)
+    predicted = predictor.predict_tower_loads(data)
+
+    assert predictor.model_version == 'v1'
+    features = build_feature_matrix(data, predictor.feature_columns)
+    scaled = ((features - predictor._scaler_mean) / predictor._scaler_scale).astype(np.float32)
+    expected = np.maximum(predictor.booster.inplace_predict(scaled), 10)
+    np.testing.assert_allclose(list(predicted.values()), expected, rtol=1e-5)
+    assert list(predicted) == [t['id'] for t in data]
+
+    # Small batches go through the NumPy tree evaluator and agree with the booster
+    few = predictor.predict_tower_loads(data[:3])
+    np.testing.assert_allclose(list(few.values()), expected[:3], rtol=1e-4, atol=1e-3)
@@ -0,0 +1,93 @@
+"""
+Batched random-waypoint mobility: movement limits, coverage after handovers and counters
+"""
+
+import numpy as np
+import pytest
+
+from models.mobility import JORDAN_BOUNDS, MobilityModel
+from models.simulation import SimulationEngine
+from models.spatial_index import haversine_m
+
+
+def moving_engine(num_users=5000, seed=12, **params):
+    engine = SimulationEngine(60, num_users, columnar=True, distribution='nearest', seed=seed)
+    engine.enable_mobility(pause_minutes=(0.0, 0.0), **params)
+    return engine
+
+
+def test_users_move_no_faster_than_their_speed():
+    engine = moving_engine()
+    network, mobility = engine.network, engine.mobility
+    lat, lng = network.user_lat.copy(), network.user_lng.copy()
+    speed = mobility.speed_mps.copy()
+
+    engine.advance_mobility(2.0, step_minutes=2.0)
+    moved = haversine_m(lat, lng, network.user_lat, network.user_lng)
+    assert (moved <= speed * 120.0 * 1.01 + 1.0).all()
+    assert (moved > 0).mean() > 0.99
+    (lat_low, lat_high), (lng_low, lng_high) = JORDAN_BOUNDS
+    assert ((network.user_lat >= lat_low) & (network.user_lat <= lat_high)).all()
+    assert ((network.user_lng >= lng_low) & (network.user_lng <= lng_high)).all()
+
+
+def test_paused_users_stay_put():
+    engine = SimulationEngine(20, 1000, columnar=True, seed=3)
+    engine.enable_mobility(pause_minutes=(10.0, 10.0))
+    lat = engine.network.user_lat.copy()
+    engine.advance_mobility(5.0)
+    np.testing.assert_array_equal(engine.network.user_lat, lat)
+
+
+def test_connected_users_stay_inside_serving_coverage():
+    engine = moving_engine(driving_speed_kmh=(60.0, 120.0), corridor_bias=1.0)
+    result = engine.advance_mobility(10.0, step_minutes=1.0)
+    network = engine.network
+
+    connected = np.flatnonzero(network.user_tower >= 0)
+    serving = network.user_tower[connected]
+    distance = haversine_m(network.user_lat[connected], network.user_lng[connected],
+                           network.tower_lat[serving], network.tower_lng[serving])
+    assert (distance <= network.tower_coverage[serving]).all()
+    np.testing.assert_array_equal(network.tower_load, np.bincount(serving, minlength=network.num_towers))
+    assert (network.tower_load <= network.tower_capacity).all()
+
+    assert result['cell_crossings'] > 0 and result['handovers'] > 0
+    totals = engine.handovers.totals()
+    assert totals['handover_attempts'] == result['handovers'] + result['handover_failures']
+    assert engine.clock.minutes == 10.0
+
+
+def test_step_splits_time_and_keeps_totals():
+    engine = moving_engine(num_users=2000)
+    result = engine.mobility.step(5.0, step_minutes=2.0)
+    assert result['simulated_minutes'] == 5.0
+    assert engine.mobility.stats['handovers'] == result['handovers']
+    assert engine.clock.minutes == 0.0  # the caller advances the clock
+
+
+@pytest.mark.parametrize('minutes, step_minutes', [(float('inf'), 1.0), (float('nan'), 1.0), (-1.0, 1.0),
+                                                   (5.0, 0.0), (5.0, -1.0), (5.0, float('nan'))])
+def test_step_rejects_unbounded_time(minutes, step_minutes):
+    engine = moving_engine(num_users=100)
+    with pytest.raises(ValueError):
+        engine.mobility.step(minutes, step_minutes=step_minutes)
+
+
+def test_users_added_later_get_waypoints():
+    engine = moving_engine(num_users=1000)
+    engine.add_users(200, location=engine.towers[0].location)
+    engine.advance_mobility(1.0)
+    assert len(engine.mobility.cell) == len(engine.mobility.speed_mps) == 1200
+
+
+def test_mobility_is_reproducible_from_the_seed():
+    first, second = moving_engine(num_users=2000), moving_engine(num_users=2000)
+    assert first.advance_mobility(5.0)['handovers'] == second.advance_mobility(5.0)['handovers']
+    np.testing.assert_array_equal(first.network.user_lat, second.network.user_lat)
+    np.testing.assert_array_equal(first.network.user_tower, second.network.user_tower)
+
+
+def test_mobility_requires_columnar_engine():
+    with pytest.raises(ValueError):
+        MobilityModel(SimulationEngine(5, 50, seed=1))
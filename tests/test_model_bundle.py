@@ -0,0 +1,86 @@
+"""
+Versioned model bundles: LATEST pointer, memory-mapped scaler and feature schema checks
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip('xgboost')
+
+from ml.model_bundle import (LATEST_FILE, bundle_versions, latest_version, load_bundle, save_bundle)
+
+
+@pytest.fixture(scope='module')
+def booster():
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(300, 3)).astype(np.float32)
+    return xgb.train({'max_depth': 3, 'seed': 0}, xgb.DMatrix(features, label=features[:, 0]), num_boost_round=5)
+
+
+def test_versions_and_latest_pointer(booster, tmp_path):
+    root = str(tmp_path / 'model')
+    assert latest_version(root) is None and bundle_versions(root) == []
+    with pytest.raises(FileNotFoundError):
+        load_bundle(root)
+
+    assert save_bundle(root, booster, ['a', 'b', 'c']) == 'v1'
+    assert save_bundle(root, booster, ['a', 'b', 'c'], booster_format='json', extra_metadata={'note': 'x'}) == 'v2'
+    assert bundle_versions(root) == ['v1', 'v2']
+    assert latest_version(root) == 'v2'
+    assert not [name for name in os.listdir(root) if name.startswith('.')]  # no staging leftovers
+
+    latest, first = load_bundle(root), load_bundle(root, 'v1')
+    assert latest.version == 'v2' and latest.metadata['note'] == 'x'
+    assert first.metadata['booster_file'] == 'booster.ubj' and first.scaler is None
+    features = np.random.default_rng(1).normal(size=(20, 3)).astype(np.float32)
+    np.testing.assert_array_equal(latest.booster.inplace_predict(features), booster.inplace_predict(features))
+
+
+def test_scaler_is_memory_mapped(booster, tmp_path):
+    mean, scale = np.array([1.0, 2.0, 3.0]), np.array([0.5, 1.0, 2.0])
+    save_bundle(str(tmp_path), booster, ['a', 'b', 'c'], mean, scale, iteration_range=(0, 3))
+    bundle = load_bundle(str(tmp_path))
+
+    assert isinstance(bundle.scaler, np.memmap)
+    np.testing.assert_array_equal(bundle.scaler, [mean, scale])
+    assert bundle.metadata['scaled'] and bundle.metadata['iteration_range'] == [0, 3]
+
+
+def test_rejects_unknown_formats(booster, tmp_path):
+    with pytest.raises(ValueError):
+        save_bundle(str(tmp_path), booster, ['a'], booster_format='pickle')
+
+    save_bundle(str(tmp_path), booster, ['a', 'b', 'c'])
+    metadata = tmp_path / 'v1' / 'metadata.json'
+    metadata.write_text(metadata.read_text().replace('"format": 1', '"format": 99'))
+    with pytest.raises(ValueError):
+        load_bundle(str(tmp_path))
+
+
+def test_predictor_round_trip_and_feature_mismatch(booster, tmp_path):
+    pytest.importorskip('google.cloud.aiplatform')
+    from ml.xgboost_predictor import XGBoostPredictor
+
+    predictor = XGBoostPredictor(model_path=str(tmp_path), use_vertex_ai=False, preload_model=False)
+    with pytest.raises(ValueError):
+        predictor.save_model()
+    assert predictor.load_model() is False
+
+    save_bundle(str(tmp_path), booster, ['a', 'b', 'c'])  # v1: another feature schema
+    assert predictor.load_model() is False and predictor.booster is None
+
+    columns = len(predictor.feature_columns)
+    features = np.random.default_rng(2).normal(size=(200, columns)).astype(np.float32)
+    trained = xgb.train({'max_depth': 3}, xgb.DMatrix(features, label=features[:, 0]), num_boost_round=5)
+    predictor._set_inference(trained, None)
+    assert predictor.save_model(extra_metadata={'rows': 200}) == 'v2'
+    assert (tmp_path / LATEST_FILE).read_text() == 'v2'
+
+    loaded = XGBoostPredictor(model_path=str(tmp_path), use_vertex_ai=False, preload_model=False)
+    assert loaded.load_model() is True
+    assert loaded.model_version == 'v2' and loaded.tree_evaluator is not None
+    np.testing.assert_allclose(loaded.predict_matrix(features[:5]), trained.inplace_predict(features[:5]),
+                               rtol=1e-5, atol=1e-4)
+    assert loaded.load_model(version='v1') is False
@@ -0,0 +1,99 @@
+"""
+MoveLog ring buffer: growth, wrap-around and exports
+"""
+
+import numpy as np
+import pytest
+
+from models.move_log import MoveLog
+
+
+def log_moves(log, first, count):
+    moves = np.arange(first, first + count)
+    log.extend(moves, moves % 7, moves % 5, moves + 1, timestamp_ns=moves * 1000)
+    return moves
+
+
+def test_wraps_around_keeping_newest_moves():
+    log = MoveLog(retention=10)
+    for first in range(0, 25, 3):
+        log_moves(log, first, 3)
+
+    columns = log.columns()
+    assert len(log) == 10
+    assert log.total_logged == 27
+    assert columns['iteration'].tolist() == list(range(17, 27))
+    assert columns['users_moved'].tolist() == list(range(18, 28))
+    assert np.diff(columns['timestamp_ns']).tolist() == [1000] * 9
+
+
+def test_batch_larger_than_retention_keeps_its_tail():
+    log = MoveLog(retention=4)
+    log_moves(log, 0, 2)
+    log_moves(log, 2, 9)
+
+    assert log.columns()['iteration'].tolist() == [7, 8, 9, 10]
+    assert log.total_logged == 11
+
+
+def test_unbounded_log_grows():
+    log = MoveLog(retention=None)
+    log_moves(log, 0, 3000)
+    assert len(log) == 3000
+    assert log.columns()['iteration'].tolist() == list(range(3000))
+
+
+@pytest.mark.parametrize('retention', [0, -5])
+def test_rejects_non_positive_retention(retention):
+    with pytest.raises(ValueError):
+        MoveLog(retention=retention)
+
+
+def test_latest_and_pair_totals_after_wrap():
+    log = MoveLog(retention=8)
+    for iteration in range(20):
+        log.append(iteration, iteration % 2, 2, 10)
+
+    assert [record['iteration'] for record in log.latest(3)] == [17, 18, 19]
+    assert log.latest(100)[0]['iteration'] == 12
+    assert log.pair_totals() == [
+        {'from_tower': 0, 'to_tower': 2, 'users_moved': 40, 'moves': 4},
+        {'from_tower': 1, 'to_tower': 2, 'users_moved': 40, 'moves': 4}
+    ]
+    assert len(log.pair_totals(limit=1)) == 1
+
+
+def test_from_columns_round_trip():
+    log = MoveLog(retention=6)
+    log_moves(log, 0, 9)
+    restored = MoveLog.from_columns(log.columns(), retention=6)
+
+    for name, values in log.columns().items():
+        np.testing.assert_array_equal(restored.columns()[name], values)
+
+
+@pytest.mark.parametrize('bucket_seconds', [0, -1, float('nan'), float('inf')])
+def test_rejects_invalid_buckets(bucket_seconds):
+    with pytest.raises(ValueError):
+        MoveLog().moves_over_time(bucket_seconds)
+
+
+def test_history_route_views(client):
+    created = client.post('/api/simulation/sessions', json={'num_towers': 10, 'num_users': 1500, 'seed': 4}).get_json()
+    base = f"/api/simulation/sessions/{created['session']['simulation_id']}"
+    client.post(f'{base}/reoptimize', json={'strategy': 'heap'})
+
+    records = client.get(f'{base}/history?limit=2').get_json()
+    assert records['success'] and records['retained'] == records['total_logged'] > 0
+    assert len(records['records']) == min(2, records['retained'])
+    pairs = client.get(f'{base}/history?view=pairs').get_json()['pairs']
+    assert sum(pair['moves'] for pair in pairs) == records['retained']
+    assert client.get(f'{base}/history?view=timeline').get_json()['timeline']
+    csv = client.get(f'{base}/history?format=csv')
+    assert csv.mimetype == 'text/csv'
+    assert len(csv.get_data(as_text=True).strip().splitlines()) == records['retained'] + 1
+
+    assert client.get(f'{base}/history?view=unknown').status_code == 400
+    assert client.get(f'{base}/history?limit=0').status_code == 400
+    assert client.get(f'{base}/history?view=timeline&bucket_seconds=nan').status_code == 400
+    client.delete(base)
@@ -0,0 +1,113 @@
+"""
+Operator-aware rebalancing keeps users on their operator unless roaming allows otherwise
+"""
+
+import numpy as np
+import pytest
+
+from models import redistribution, worker_pool
+from models.columnar import OPERATORS
+from models.redistribution import OperatorRebalancer
+
+# Operator 0 is full everywhere, operators 1 and 2 have plenty of room
+LOAD = np.array([100, 95, 10, 10, 10, 10])
+CAPACITY = np.full(6, 100)
+OPERATOR = np.array([0, 0, 1, 1, 2, 2])
+
+
+def hosted(plan, operator=OPERATOR):
+    """Users moved onto each operator's towers"""
+    moved = np.zeros(len(OPERATORS), dtype=np.int64)
+    for move in plan:
+        moved[operator[move.to_tower]] += move.count
+    return moved.tolist()
+
+
+def test_users_stay_on_their_operator_without_roaming():
+    assert OperatorRebalancer().plan(LOAD, CAPACITY, operator=OPERATOR) == []
+
+
+def test_roaming_is_directional():
+    plan = OperatorRebalancer(roaming=[(0, 1, 0)]).plan(LOAD, CAPACITY, operator=OPERATOR)
+    assert plan
+    assert all(OPERATOR[m.from_tower] == 0 and OPERATOR[m.to_tower] == 1 for m in plan)
+
+    assert OperatorRebalancer(roaming=[(1, 0, 0)]).plan(LOAD, CAPACITY, operator=OPERATOR) == []
+
+
+def test_heap_base_tries_cheapest_agreement_first():
+    both = [{'home': OPERATORS[0], 'partner': OPERATORS[1], 'cost': 2},
+            {'home': OPERATORS[0], 'partner': OPERATORS[2], 'cost': 1}]
+    moved = hosted(OperatorRebalancer(roaming=both).plan(LOAD, CAPACITY, operator=OPERATOR))
+    assert moved[1] == 0 and moved[2] > 0
+
+
+def test_optimal_base_prices_each_roaming_user():
+    # Operator 1's towers sit next to the congested ones, operator 2's about 11 km away
+    lat = np.array([31.95, 31.95, 31.95, 31.95, 32.05, 32.05])
+    lng = np.full(6, 35.91)
+    rebalancer = OperatorRebalancer(base='optimal', roaming=[(0, 1, 20.0), (0, 2, 1.0)])
+    moved = hosted(rebalancer.plan(LOAD, CAPACITY, operator=OPERATOR, lat=lat, lng=lng))
+    assert moved[1] == 0 and moved[2] > 0  # 11 km + 1 beats 0 km + 20
+
+    rebalancer = OperatorRebalancer(base='optimal', roaming=[(0, 1, 5.0), (0, 2, 1.0)])
+    moved = hosted(rebalancer.plan(LOAD, CAPACITY, operator=OPERATOR, lat=lat, lng=lng))
+    assert moved[1] > 0 and moved[2] == 0  # 0 km + 5 beats 11 km + 1
+
+    # Same users move either way; the cost only decides where they go
+    assert sum(moved) == sum(hosted(OperatorRebalancer(roaming=[(0, 1, 0)]).plan(LOAD, CAPACITY, operator=OPERATOR)))
+
+
+def test_optimal_base_keeps_roaming_directional_and_within_quotas():
+    rebalancer = OperatorRebalancer(base='optimal', roaming=[(1, 0, 0.0)])
+    assert rebalancer.plan(LOAD, CAPACITY, operator=OPERATOR) == []
+
+    rebalancer = OperatorRebalancer(base='optimal', roaming=[(0, 1, 0.0), (0, 2, 1.0)],
+                                    quotas={1: 5, OPERATORS[2]: 3})
+    plan = rebalancer.plan(LOAD, CAPACITY, operator=OPERATOR)
+    assert hosted(plan) == [0, 5, 3]
+    assert all(OPERATOR[m.from_tower] == 0 for m in plan)
+
+
+def test_quotas_cap_hosted_users():
+    rebalancer = OperatorRebalancer(roaming=[(0, 1, 0), (0, 2, 1)], quotas={1: 5, OPERATORS[2]: 3})
+    plan = rebalancer.plan(LOAD, CAPACITY, operator=OPERATOR)
+    assert hosted(plan) == [0, 5, 3]
+
+
+def test_rejects_bad_agreements_and_bases():
+    with pytest.raises(ValueError):
+        OperatorRebalancer(roaming=[(1, 1, 0)])
+    with pytest.raises(ValueError):
+        OperatorRebalancer(roaming=[('unknown', 1, 0)])
+    with pytest.raises(ValueError):
+        OperatorRebalancer(roaming=[(0, len(OPERATORS), 0)])
+    with pytest.raises(ValueError):
+        OperatorRebalancer(roaming=[(0, 1, -1.0)])
+    with pytest.raises(ValueError):
+        OperatorRebalancer(base='operator')
+
+
+def test_parallel_partitions_match_in_process(monkeypatch):
+    rng = np.random.default_rng(9)
+    capacity = rng.integers(50, 150, 300)
+    load = (capacity * rng.uniform(0.2, 1.2, 300)).astype(np.int64)
+    operator = rng.integers(0, len(OPERATORS), 300)
+    options = dict(roaming=[(0, 1, 0), (2, 0, 1)], quotas={1: 40})
+
+    in_process = OperatorRebalancer(max_workers=1, **options).plan(load, capacity, operator=operator)
+    pooled = []
+
+    def map_in_pool(*args, **kwargs):
+        pooled.append(kwargs['workers'])
+        return worker_pool.map_in_pool(*args, **kwargs)
+
+    monkeypatch.setattr(worker_pool, 'MAX_WORKERS', 2)
+    monkeypatch.setattr(redistribution, 'PARALLEL_MIN_TOWERS', 0)
+    monkeypatch.setattr(redistribution, 'map_in_pool', map_in_pool)
+    parallel = OperatorRebalancer(max_workers=2, **options).plan(load, capacity, operator=operator)
+
+    assert pooled == [2]
+    assert parallel == in_process
+    assert all(operator[m.from_tower] == operator[m.to_tower] or (operator[m.from_tower], operator[m.to_tower])
+               in {(0, 1), (2, 0)} for m in parallel)
@@ -0,0 +1,76 @@
+"""
+Radio model: path loss, SINR, throughput sharing and latency
+"""
+
+import pytest
+
+from models import radio
+from models.columnar import ColumnarNetwork
+from models.simulation import SimulationEngine
+from models.snapshot import network_columns
+
+
+def test_received_power_follows_path_loss():
+    power = radio.received_power_dbm([0.0, 1000.0, 10000.0])
+    assert power[0] == radio.received_power_dbm(radio.MIN_DISTANCE_M)
+    assert power[1] == radio.EIRP_DBM - radio.PATHLOSS_AT_1KM_DB
+    assert power[1] - power[2] == pytest.approx(radio.PATHLOSS_SLOPE_DB)
+
+
+def test_spectral_efficiency_is_capped_and_floored():
+    efficiency = radio.spectral_efficiency([radio.MIN_SINR_DB - 1, 0.0, 60.0])
+    assert efficiency[0] == 0.0
+    assert efficiency[1] == radio.SHANNON_ATTENUATION
+    assert efficiency[2] == radio.MAX_SPECTRAL_EFFICIENCY
+
+
+def test_latency_grows_with_load_and_poor_sinr():
+    assert radio.latency_ms(0.0) == radio.BASE_LATENCY_MS
+    assert radio.latency_ms(0.5) == radio.BASE_LATENCY_MS + radio.QUEUE_LATENCY_MS
+    assert radio.latency_ms(2.0) == radio.latency_ms(radio.MAX_UTILIZATION)
+    assert radio.latency_ms(0.5, sinr_db=0.0) > radio.latency_ms(0.5, sinr_db=20.0)
+
+
+def test_interference_and_sharing_lower_throughput():
+    # Two towers of one operator about 950 m apart, every user beside tower 0
+    network = ColumnarNetwork(2, 4)
+    network.tower_lat[:], network.tower_lng[:] = 31.95, [35.90, 35.91]
+    network.tower_coverage[:] = 5000
+    network.tower_capacity[:] = 2
+    network.user_lat[:], network.user_lng[:] = 31.95, 35.90
+    engine = SimulationEngine(0, 0, columnar=True, seed=0)
+    engine.adopt_network(network)
+
+    def metrics():
+        network.recompute()
+        return radio.user_metrics(network_columns(engine), engine.spatial_index)
+
+    network.user_tower[:] = [0, -1, -1, -1]
+    alone = metrics()
+    network.user_tower[:] = [0, 0, -1, -1]
+    shared = metrics()
+    network.user_tower[:] = [0, 0, 1, 1]
+    interfered = metrics()
+
+    assert alone['throughput_mbps'][0] == radio.cell_throughput_mbps(alone['sinr_db'][0])
+    assert shared['throughput_mbps'][0] == alone['throughput_mbps'][0] / 2
+    assert interfered['sinr_db'][0] < shared['sinr_db'][0]
+    # Users served by the far tower hear the near one as interference
+    assert (interfered['sinr_db'][2:] < interfered['sinr_db'][0]).all()
+
+
+def test_radio_report_and_route(client):
+    engine = SimulationEngine(20, 2000, columnar=True, distribution='nearest', seed=4)
+    report = engine.radio_report()
+    assert report['kpis']['connected_users'] == int((engine.network.user_tower >= 0).sum())
+    assert [t['cell_id'] for t in report['towers']] == list(range(20))
+    assert sum(t['active_users'] for t in report['towers']) == report['kpis']['connected_users']
+
+    created = client.post('/api/simulation/sessions', json={
+        'num_towers': 20, 'num_users': 2000, 'seed': 4, 'distribution': 'nearest', 'columnar': True}).get_json()
+    base = f"/api/simulation/sessions/{created['session']['simulation_id']}"
+    body = client.get(f'{base}/radio?include_towers=false').get_json()
+    assert body['success'], body.get('error')
+    assert 'towers' not in body
+    assert body['kpis']['connected_users'] > 0
+    client.delete(base)
@@ -0,0 +1,76 @@
+"""
+Redistribution planners keep every tower within its load limits
+"""
+
+import numpy as np
+import pytest
+
+from models.redistribution import Rebalancer, forecast_matrix, get_rebalancer, load_limits, CONGESTED_THRESHOLD, RECEIVER_THRESHOLD
+
+PLANNERS = ['heap', 'optimal', 'lookahead']
+
+
+def network(num_towers=300, seed=0):
+    rng = np.random.default_rng(seed)
+    capacity = rng.integers(150, 251, num_towers)
+    load = (capacity * rng.uniform(0.2, 1.1, num_towers)).astype(np.int64)
+    lat = rng.uniform(29.5, 32.6, num_towers)
+    lng = rng.uniform(35.0, 36.2, num_towers)
+    active = rng.random(num_towers) > 0.1
+    return load, capacity, lat, lng, active
+
+
+def apply(load, plan):
+    after = load.copy()
+    for move in plan:
+        after[move.from_tower] -= move.count
+        after[move.to_tower] += move.count
+    return after
+
+
+@pytest.mark.parametrize('strategy', PLANNERS)
+def test_plan_respects_limits(strategy):
+    load, capacity, lat, lng, active = network()
+    plan = get_rebalancer(strategy).plan(load, capacity, lat=lat, lng=lng, active=active)
+    donor_floor, receiver_ceiling = load_limits(capacity, CONGESTED_THRESHOLD, RECEIVER_THRESHOLD, active)
+    after = apply(load, plan)
+
+    assert plan
+    assert all(move.count > 0 for move in plan)
+    senders = np.array([move.from_tower for move in plan])
+    receivers = np.array([move.to_tower for move in plan])
+    assert not np.isin(senders, receivers).any()
+    assert (load[senders] > donor_floor[senders]).all()
+    assert (after[senders] >= donor_floor[senders]).all()
+    assert (after[receivers] <= receiver_ceiling[receivers]).all()
+    assert active[receivers].all()
+    assert after.sum() == load.sum()
+    assert (after <= np.maximum(load, capacity)).all()
+
+
+def test_lookahead_keeps_room_for_predicted_peaks():
+    load, capacity, lat, lng, active = network()
+    receiver_ceiling = load_limits(capacity, receiver_threshold=RECEIVER_THRESHOLD, active=active)[1]
+    predictions = {i: float(receiver_ceiling[i]) for i in range(len(load)) if i % 2 == 0}
+    plan = get_rebalancer('lookahead').plan(load, capacity, predictions=predictions, active=active)
+
+    assert plan
+    assert all(move.to_tower % 2 == 1 for move in plan)
+
+
+def test_forecast_ramps_scalars_and_pads_sequences():
+    load = np.array([100.0, 50.0, 80.0])
+    forecast = forecast_matrix({0: 160.0, 1: [60, 90], 7: 10.0}, load, horizon=3)
+    np.testing.assert_allclose(forecast, [[120, 140, 160], [60, 90, 90], [80, 80, 80]])
+
+
+@pytest.mark.parametrize('strategy', PLANNERS)
+def test_no_moves_without_receivers(strategy):
+    capacity = np.full(10, 200)
+    load = np.full(10, 190)
+    assert get_rebalancer(strategy).plan(load, capacity) == []
+
+
+def test_rebalancer_requires_plan():
+    with pytest.raises(TypeError):
+        Rebalancer()
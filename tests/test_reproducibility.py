@@ -0,0 +1,39 @@
+"""
+Seeded runs reproduce exactly, in-process and on the shared worker pool
+"""
+
+import multiprocessing
+
+import pytest
+
+from models import worker_pool
+from models.monte_carlo import run_batch
+
+
+def test_batch_is_independent_of_worker_count(monkeypatch):
+    monkeypatch.setattr(worker_pool, 'MAX_WORKERS', 2)
+    params = {'num_towers': 20, 'num_users': 2000, 'strategy': 'heap'}
+    serial = run_batch(params, 4, seed=9, max_workers=1)
+    parallel = run_batch(params, 4, seed=9, max_workers=2)
+
+    assert parallel['workers'] == 2
+    assert parallel['replicas'] == serial['replicas']
+    assert parallel['distributions'] == serial['distributions']
+
+
+def test_pool_workers_are_not_forked():
+    assert worker_pool.START_METHOD != 'fork'
+    assert worker_pool.shared_pool()._mp_context.get_start_method() == worker_pool.START_METHOD
+    assert worker_pool.START_METHOD in multiprocessing.get_all_start_methods()
+
+
+@pytest.mark.parametrize('strategy', ['lookahead', 'optimal'])
+def test_seeded_run_with_predictions_repeats(client, strategy):
+    request = {'num_towers': 12, 'num_users': 1500, 'seed': 21, 'strategy': strategy,
+               'columnar': True, 'summary_only': True}
+    first = client.post('/api/simulation/run', json=request).get_json()
+    second = client.post('/api/simulation/run', json=request).get_json()
+
+    assert first['success'], first.get('error')
+    assert first['predictions'] == second['predictions']
+    assert first['final_state']['towers'] == second['final_state']['towers']
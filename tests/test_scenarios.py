@@ -0,0 +1,113 @@
+"""
+Scenario profiles and their replay on a columnar engine
+"""
+
+import numpy as np
+import pytest
+
+from models.columnar import USAGE_TYPES
+from models.scenarios import SCENARIOS, ScenarioReplay, compile_scenario, scenario_catalogue
+from models.simulation import SimulationEngine
+
+
+@pytest.mark.parametrize('scenario_id', sorted(SCENARIOS))
+def test_profiles_stay_within_their_catalogue_levels(scenario_id):
+    spec = SCENARIOS[scenario_id]
+    profile = compile_scenario(scenario_id, step_minutes=5.0)
+
+    assert profile.minutes[0] == 0 and profile.minutes[-1] == spec['duration']
+    assert profile.num_steps == spec['duration'] // 5 + 1
+    low, high = sorted(spec['activity'])
+    assert (profile.activity >= low - 1e-9).all() and (profile.activity <= high + 1e-9).all()
+    np.testing.assert_allclose(profile.usage_cdf[:, -1], 1.0)
+    assert (np.diff(profile.usage_cdf, axis=1) >= 0).all()
+    assert (profile.hotspot_share >= 0).all()
+    with pytest.raises(ValueError):
+        profile.activity[0] = 1.0  # shared through the cache
+
+
+def test_compiled_profiles_are_cached():
+    assert compile_scenario('rush_hour') is compile_scenario('rush_hour', 30, 1.0)
+    assert compile_scenario('rush_hour', 20) is not compile_scenario('rush_hour')
+    assert compile_scenario('rush_hour', hotspot_location=(32.0, 36.0)).hotspot_location == (32.0, 36.0)
+
+
+def test_unknown_scenario():
+    with pytest.raises(ValueError):
+        compile_scenario('no-such-scenario')
+
+
+def test_catalogue_lists_every_scenario():
+    catalogue = scenario_catalogue()
+    assert [entry['id'] for entry in catalogue] == list(SCENARIOS)
+    assert set(catalogue[0]) == {'id', 'name', 'description', 'duration', 'expected_load'}
+
+
+def test_replay_follows_the_activity_curve():
+    engine = SimulationEngine(40, 8000, columnar=True, distribution='nearest', seed=6)
+    capacity = int(engine.network.tower_capacity.sum())
+    result = engine.run_scenario('night_mode', step_minutes=5.0, redistribution_interval=0)
+    profile = compile_scenario('night_mode', step_minutes=5.0)
+
+    assert result['steps'] == profile.num_steps == len(result['timeline'])
+    active = np.array([point['active_users'] for point in result['timeline']])
+    blocked = np.array([point['blocked_users'] for point in result['timeline']])
+    assert (active <= capacity).all()
+    # Connected plus blocked users track the activity share of every subscriber
+    wanted = (active + blocked) / 8000
+    reachable = wanted.max() / profile.activity.max()
+    np.testing.assert_allclose(wanted, profile.activity * reachable, atol=0.03)
+    assert active[-1] < active[0]  # night traffic decays
+
+    network = engine.network
+    np.testing.assert_array_equal(network.tower_load, np.bincount(network.user_tower[network.user_tower >= 0],
+                                                                  minlength=network.num_towers))
+    assert set(np.unique(network.user_usage).tolist()) <= set(range(len(USAGE_TYPES)))
+
+
+def test_replay_moves_users_to_the_hotspot_and_back():
+    engine = SimulationEngine(40, 5000, columnar=True, distribution='nearest', seed=6)
+    result = engine.run_scenario('rush_hour', step_minutes=3.0, redistribution_interval=0)
+    hotspot_users = [point['hotspot_users'] for point in result['timeline']]
+
+    assert hotspot_users[0] == 0 and hotspot_users[-1] == 0
+    assert max(hotspot_users) == pytest.approx(0.2 * 5000, rel=0.1)
+
+
+def test_replay_is_reproducible_from_the_seed():
+    results = [SimulationEngine(20, 3000, columnar=True, seed=8).run_scenario('event_coverage', step_minutes=5.0)
+               for _ in range(2)]
+    assert results[0]['timeline'] == results[1]['timeline']
+    assert results[0]['users_redistributed'] == results[1]['users_redistributed']
+
+
+def test_replay_requires_columnar_engine():
+    with pytest.raises(ValueError):
+        ScenarioReplay(SimulationEngine(5, 50, seed=1), compile_scenario('rush_hour'))
+
+
+@pytest.mark.parametrize('options', [
+    {'step_minutes': 0}, {'step_minutes': -1}, {'step_minutes': float('nan')},
+    {'duration_minutes': float('inf')}, {'duration_minutes': -30},
+    {'duration_minutes': 600, 'step_minutes': 0.01},
+])
+def test_compile_rejects_unbounded_timing(options):
+    with pytest.raises(ValueError):
+        compile_scenario('rush_hour', **options)
+
+
+def test_scenario_routes(client):
+    catalogue = client.get('/api/simulation/scenarios').get_json()
+    assert [entry['id'] for entry in catalogue['scenarios']] == list(SCENARIOS)
+
+    body = client.post('/api/simulation/scenarios/night_mode/run', json={
+        'num_towers': 10, 'num_users': 1000, 'seed': 3, 'step_minutes': 10
+    }).get_json()
+    assert body['success'], body.get('error')
+    assert body['scenario']['steps'] == len(body['scenario']['timeline']) == 7
+    assert body['final_state']['version'] > body['initial_state']['version']
+
+    assert client.post('/api/simulation/scenarios/unknown/run', json={}).status_code == 404
+    for body in ('{"step_minutes": 0}', '{"duration_minutes": Infinity}', '{"redistribution_interval": NaN}'):
+        response = client.post('/api/simulation/scenarios/rush_hour/run', data=body, content_type='application/json')
+        assert response.status_code == 400, body
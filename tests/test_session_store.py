@@ -0,0 +1,142 @@
+"""
+Session store LRU eviction and the session routes that drive stored simulations
+"""
+
+from models.session_store import SimulationSessionStore
+from models.simulation import SimulationEngine
+
+
+def engines(count, num_users=50):
+    return [SimulationEngine(3, num_users, columnar=True, seed=i) for i in range(count)]
+
+
+def test_evicts_least_recently_used_beyond_max_sessions():
+    store = SimulationSessionStore(max_sessions=2)
+    first, second, third = engines(3)
+    store.add(first)
+    store.add(second)
+    store.get(first.simulation_id)  # first is now the most recent
+    store.add(third)
+
+    assert store.get(second.simulation_id) is None
+    assert [s['simulation_id'] for s in store.list()] == [third.simulation_id, first.simulation_id]
+
+
+def test_readding_an_id_makes_it_most_recent():
+    store = SimulationSessionStore(max_sessions=2)
+    first, second, third = engines(3)
+    store.add(first)
+    store.add(second)
+    restored = SimulationEngine(3, 50, columnar=True, seed=9)
+    restored.simulation_id = first.simulation_id  # e.g. a snapshot restored under a live id
+    store.add(restored)
+    store.add(third)
+
+    assert store.get(second.simulation_id) is None
+    assert store.get(first.simulation_id).engine is restored
+
+
+def test_memory_budget_keeps_the_newest_session():
+    big = engines(2, num_users=20000)
+    store = SimulationSessionStore(max_sessions=10, memory_budget_mb=big[0].memory_bytes() * 1.5 / 2 ** 20)
+    for engine in big:
+        store.add(engine)
+    assert len(store) == 1
+    assert store.get(big[1].simulation_id) is not None
+
+    store.memory_budget_bytes = 0
+    store.touch(store.get(big[1].simulation_id))
+    assert len(store) == 1  # the most recently used session is never evicted
+
+
+def test_touch_and_remove():
+    store = SimulationSessionStore()
+    engine, = engines(1)
+    session = store.add(engine)
+    store.touch(session)
+    assert session.to_dict()['operations'] == 1
+    assert store.remove(engine.simulation_id)
+    assert not store.remove(engine.simulation_id)
+    assert len(store) == 0
+
+
+def create_session(client, **options):
+    body = client.post('/api/simulation/sessions', json={
+        'num_towers': 8, 'num_users': 800, 'seed': 5, 'distribution': 'nearest', **options
+    }).get_json()
+    assert body['success'], body.get('error')
+    return body['session']['simulation_id'], body['state']['version']
+
+
+def test_session_lifecycle(client):
+    simulation_id, version = create_session(client)
+    base = f'/api/simulation/sessions/{simulation_id}'
+
+    assert simulation_id in [s['simulation_id'] for s in client.get('/api/simulation/sessions').get_json()['sessions']]
+    state = client.get(base).get_json()['state']
+    assert state['version'] == version and len(state['towers']) == 8
+
+    step = client.post(f'{base}/step', json={'minutes': 10, 'seed': 1}).get_json()
+    assert step['success'], step.get('error')
+    assert step['result']['simulated_minutes'] == 10
+    assert step['session']['elapsed_minutes'] == 10
+    assert step['changes']['since_version'] == version
+
+    added = client.post(f'{base}/perturb', json={'action': 'add_users', 'count': 40}).get_json()
+    assert added['result']['added'] == 40
+    assert [user['id'] for user in client.get(f'{base}?include_users=true&since_version={version}')
+            .get_json()['state']['users'] if user['id'] >= 800] == list(range(800, 840))
+
+    failed = client.post(f'{base}/perturb', json={'action': 'fail_tower', 'tower_id': 2}).get_json()
+    assert failed['result']['tower_id'] == 2
+    assert [t for t in failed['changes']['towers'] if t['id'] == 2][0]['active'] is False
+    restored = client.post(f'{base}/perturb', json={'action': 'restore_tower', 'tower_id': 2}).get_json()
+    assert restored['success']
+
+    reoptimized = client.post(f'{base}/reoptimize', json={'strategy': 'heap'}).get_json()
+    assert reoptimized['success'], reoptimized.get('error')
+    assert reoptimized['result']['users_redistributed'] >= 0
+    assert reoptimized['session']['operations'] == 5
+
+    assert client.delete(base).get_json()['success']
+    assert client.get(base).status_code == 404
+    assert client.delete(base).status_code == 404
+
+
+def test_bad_operations_are_client_errors(client):
+    simulation_id, _ = create_session(client)
+    base = f'/api/simulation/sessions/{simulation_id}'
+    assert client.post(f'{base}/perturb', json={'action': 'explode'}).status_code == 400
+    assert client.post(f'{base}/perturb', json={'action': 'fail_tower', 'tower_id': 99}).status_code == 400
+    assert client.post('/api/simulation/sessions/not-a-session/step', json={}).status_code == 404
+    client.delete(base)
+
+
+def test_step_rejects_unbounded_minutes_without_locking_the_session(client):
+    import routes.simulation as routes
+
+    simulation_id, _ = create_session(client)
+    base = f'/api/simulation/sessions/{simulation_id}'
+    for body in ('{"minutes": NaN}', '{"minutes": Infinity, "mobility": true}', '{"minutes": "inf"}',
+                 '{"minutes": -5}', '{"minutes": 100000}', '{"minutes": 5, "redistribution_interval": 0.01}'):
+        response = client.post(f'{base}/step', data=body, content_type='application/json')
+        assert response.status_code == 400, body
+
+    session = routes.session_store.get(simulation_id)
+    assert session.elapsed_minutes == 0
+    assert session.lock.acquire(timeout=1)
+    session.lock.release()
+    assert client.post(f'{base}/step', json={'minutes': 2}).get_json()['success']
+    client.delete(base)
+
+
+def test_run_can_keep_its_session(client):
+    body = client.post('/api/simulation/run', json={
+        'num_towers': 5, 'num_users': 300, 'seed': 2, 'columnar': True,
+        'summary_only': True, 'keep_session': True
+    }).get_json()
+    simulation_id = body['session']['simulation_id']
+    assert simulation_id == body['simulation_id']
+    state = client.get(f'/api/simulation/sessions/{simulation_id}').get_json()['state']
+    assert state['towers'] == body['final_state']['towers']
+    client.delete(f'/api/simulation/sessions/{simulation_id}')
@@ -0,0 +1,79 @@
+"""
+Snapshots restore an engine's towers, users, history, handovers and random stream
+"""
+
+import numpy as np
+import pytest
+
+from models.simulation import SimulationEngine
+from models.snapshot import network_columns, HANDOVER_COLUMNS, load_snapshot
+
+
+def busy_engine(columnar: bool, mobility: bool = True) -> SimulationEngine:
+    engine = SimulationEngine(12, 2000, columnar=columnar, distribution='nearest', seed=7)
+    predictions = {tower['id']: float(tower['current_load'])
+                   for tower in engine.get_current_state(include_users=False)['towers']}
+    engine.apply_ml_redistribution(predictions, strategy='heap', include_users=False)
+    if columnar and mobility:
+        engine.advance_mobility(5)
+    return engine
+
+
+@pytest.mark.parametrize('columnar', [True, False])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load_round_trip(tmp_path, columnar, mmap):
+    engine = busy_engine(columnar)
+    path = engine.save_snapshot(str(tmp_path / 'engine.npz'))
+    restored = load_snapshot(path, mmap=mmap)
+
+    for name, values in network_columns(engine).items():
+        np.testing.assert_array_equal(network_columns(restored)[name], values, err_msg=name)
+    for name, values in engine.redistribution_history.columns().items():
+        np.testing.assert_array_equal(restored.redistribution_history.columns()[name], values, err_msg=name)
+    for name in HANDOVER_COLUMNS:
+        np.testing.assert_array_equal(getattr(restored.handovers, name), getattr(engine.handovers, name))
+
+    assert restored.simulation_id == engine.simulation_id
+    assert restored.created_at == engine.created_at
+    assert restored.redistributed_users == engine.redistributed_users
+    assert restored.clock.minutes == engine.clock.minutes
+    assert restored.rng.random() == engine.rng.random()
+    assert restored.get_current_state(include_users=False)['towers'] == \
+        engine.get_current_state(include_users=False)['towers']
+
+
+def test_restored_engine_continues_identically(tmp_path):
+    # Mobility waypoints are not part of a snapshot, so snapshot before mobility starts
+    engine = busy_engine(True, mobility=False)
+    restored = load_snapshot(engine.save_snapshot(str(tmp_path / 'engine.npz')))
+    engine.advance_mobility(5)
+    restored.advance_mobility(5)
+
+    np.testing.assert_array_equal(restored.network.user_tower, engine.network.user_tower)
+    np.testing.assert_array_equal(restored.network.user_lat, engine.network.user_lat)
+
+
+def test_snapshot_and_restore_routes(client, tmp_path, monkeypatch):
+    import models.snapshot
+    monkeypatch.setattr(models.snapshot, 'SNAPSHOT_DIR', str(tmp_path))
+    created = client.post('/api/simulation/sessions', json={'num_towers': 6, 'num_users': 500, 'seed': 3}).get_json()
+    simulation_id = created['session']['simulation_id']
+    base = f'/api/simulation/sessions/{simulation_id}'
+    client.post(f'{base}/reoptimize', json={'strategy': 'heap'})
+    towers = client.get(base).get_json()['state']['towers']
+
+    saved = client.post(f'{base}/snapshot').get_json()
+    assert saved['success'], saved.get('error')
+    assert (tmp_path / f'{simulation_id}.npz').exists()
+
+    client.delete(base)
+    restored = client.post('/api/simulation/sessions/restore', json={'simulation_id': simulation_id}).get_json()
+    assert restored['success'], restored.get('error')
+    assert restored['session']['simulation_id'] == simulation_id
+    assert client.get(base).get_json()['state']['towers'] == towers
+
+    for invalid in ('x', 123, ['x'], None):
+        assert client.post('/api/simulation/sessions/restore', json={'simulation_id': invalid}).status_code == 400
+    missing = '00000000-0000-0000-0000-000000000000'
+    assert client.post('/api/simulation/sessions/restore', json={'simulation_id': missing}).status_code == 404
+    client.delete(base)
@@ -0,0 +1,80 @@
+"""
+TowerGridIndex queries and capacity-aware assignment against brute-force search
+"""
+
+import numpy as np
+import pytest
+
+from models.spatial_index import TowerGridIndex, haversine_m
+
+
+def layout(num_towers=60, num_users=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    tower_lat = rng.uniform(31.8, 32.1, num_towers)
+    tower_lng = rng.uniform(35.8, 36.1, num_towers)
+    coverage = rng.uniform(1500, 5000, num_towers)
+    user_lat = rng.uniform(31.75, 32.15, num_users)
+    user_lng = rng.uniform(35.75, 36.15, num_users)
+    capacity = rng.integers(5, 40, num_towers)
+    return tower_lat, tower_lng, coverage, user_lat, user_lng, capacity
+
+
+def brute_force_candidates(tower_lat, tower_lng, coverage, user_lat, user_lng):
+    """Covering towers of every user, nearest first"""
+    distance = haversine_m(user_lat[:, None], user_lng[:, None], tower_lat[None, :], tower_lng[None, :])
+    return [[int(t) for t in np.argsort(row) if row[t] <= coverage[t]] for row in distance]
+
+
+def brute_force_assign(candidates, free_capacity, chunk_size):
+    """Round r: every unassigned user of the chunk asks its r-th nearest tower, in user order"""
+    free = free_capacity.copy()
+    assignment = [-1] * len(candidates)
+    for start in range(0, len(candidates), chunk_size):
+        users = range(start, min(start + chunk_size, len(candidates)))
+        for r in range(max((len(candidates[u]) for u in users), default=0)):
+            for user in users:
+                if assignment[user] == -1 and r < len(candidates[user]) and free[candidates[user][r]] > 0:
+                    assignment[user] = candidates[user][r]
+                    free[candidates[user][r]] -= 1
+    return np.array(assignment), free
+
+
+def test_candidates_match_brute_force():
+    tower_lat, tower_lng, coverage, user_lat, user_lng, _ = layout()
+    index = TowerGridIndex(tower_lat, tower_lng, coverage)
+    towers, distances = index.candidate_matrix(user_lat, user_lng)
+    expected = brute_force_candidates(tower_lat, tower_lng, coverage, user_lat, user_lng)
+
+    for user, candidates in enumerate(expected):
+        found = towers[user][towers[user] >= 0].tolist()
+        assert found == candidates
+        assert np.all(np.diff(distances[user][:len(found)]) >= 0)
+
+    nearest, _ = index.nearest_serving(user_lat, user_lng)
+    assert nearest.tolist() == [candidates[0] if candidates else -1 for candidates in expected]
+    assert index.covered(user_lat, user_lng).tolist() == [bool(candidates) for candidates in expected]
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7])
+def test_assign_nearest_matches_brute_force(chunk_size):
+    tower_lat, tower_lng, coverage, user_lat, user_lng, capacity = layout()
+    index = TowerGridIndex(tower_lat, tower_lng, coverage)
+    candidates = brute_force_candidates(tower_lat, tower_lng, coverage, user_lat, user_lng)
+    expected, expected_free = brute_force_assign(candidates, capacity, chunk_size or len(user_lat))
+
+    free = capacity.copy()
+    assignment = index.assign_nearest(user_lat, user_lng, free, chunk_size=chunk_size or len(user_lat))
+
+    np.testing.assert_array_equal(assignment, expected)
+    np.testing.assert_array_equal(free, expected_free)
+    assert (np.bincount(assignment[assignment >= 0], minlength=len(capacity)) <= capacity).all()
+    assert (free >= 0).all()
+
+
+def test_points_outside_all_towers():
+    tower_lat, tower_lng, coverage, *_ = layout()
+    index = TowerGridIndex(tower_lat, tower_lng, coverage)
+    far_lat, far_lng = np.array([29.6, 33.0]), np.array([35.1, 37.0])
+
+    assert index.assign_nearest(far_lat, far_lng, np.full(len(tower_lat), 10)).tolist() == [-1, -1]
+    assert not index.covered(far_lat, far_lng).any()
@@ -0,0 +1,79 @@
+"""
+Incremental state: versions, cached snapshots and deltas of changed towers/users
+"""
+
+import numpy as np
+import pytest
+
+from models.simulation import SimulationEngine
+from models.state_tracker import StateTracker
+
+
+def fresh_state(engine):
+    """What a full re-serialization of the engine gives"""
+    return engine._tower_dicts(), engine._user_dicts()
+
+
+def test_commit_only_bumps_version_for_pending_changes():
+    tracker = StateTracker(4, 10)
+    assert tracker.commit() == 0
+    tracker.mark_towers(np.array([1, 3]))
+    tracker.mark_users(7)
+    assert tracker.commit() == 1
+    assert tracker.commit() == 1
+    assert tracker.changed_towers(0).tolist() == [1, 3]
+    assert tracker.changed_users(0).tolist() == [7]
+    assert tracker.changed_towers(1).tolist() == []
+
+    tracker.grow(5, 12)
+    tracker.mark_users(slice(10, None))
+    assert tracker.commit() == 2
+    assert tracker.changed_users(1).tolist() == [10, 11]
+
+
+@pytest.mark.parametrize('columnar', [True, False])
+def test_delta_holds_exactly_the_changed_rows(columnar):
+    engine = SimulationEngine(8, 600, columnar=columnar, distribution='nearest', seed=2)
+    version = engine.get_current_state()['version']
+    delta = engine.get_current_state(since_version=version)
+    assert delta['towers'] == [] and delta['users'] == []
+    assert delta['version'] == version
+
+    engine.add_users(20, location=engine.towers[3].location, radius_m=500)
+    delta = engine.get_current_state(since_version=version)
+    towers, users = fresh_state(engine)
+
+    assert delta['version'] == version + 1
+    assert [user['id'] for user in delta['users']] == list(range(600, 620))
+    assert delta['users'] == users[600:]
+    assert delta['towers'] == [towers[t['id']] for t in delta['towers']]
+    assert 3 in [t['id'] for t in delta['towers']]
+    assert delta['total_users'] == 620
+
+
+@pytest.mark.parametrize('columnar', [True, False])
+def test_cached_snapshots_follow_changes(columnar):
+    engine = SimulationEngine(8, 600, columnar=columnar, seed=2)
+    first = engine.get_current_state()
+    first_towers = [dict(tower) for tower in first['towers']]
+
+    engine.apply_ml_redistribution({}, strategy='heap', include_users=False)
+    engine.fail_tower(0)
+    second = engine.get_current_state()
+    towers, users = fresh_state(engine)
+
+    assert second['towers'] == towers
+    assert second['users'] == users
+    assert first['towers'] == first_towers  # earlier snapshots keep their contents
+    assert second['version'] > first['version']
+    counts = engine.status_counts()
+    assert second['overloaded_towers'] == counts['overloaded'] == \
+        sum(tower['status'] == 'overloaded' for tower in towers)
+
+
+def test_unchanged_state_reuses_cached_records():
+    engine = SimulationEngine(8, 600, columnar=True, seed=2)
+    first = engine.get_current_state()
+    second = engine.get_current_state()
+    assert second['towers'] is first['towers']
+    assert second['version'] == first['version']
@@ -0,0 +1,65 @@
+"""
+NDJSON streaming of /run: record order, paging, summary_only and time to first record
+"""
+
+import json
+
+
+def records(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_stream_yields_records_in_order(client):
+    response = client.post('/api/simulation/run', json={
+        'stream': True, 'num_towers': 5, 'num_users': 230, 'seed': 4, 'page_size': 100
+    })
+    assert response.mimetype == 'application/x-ndjson'
+    lines = records(response)
+    types = [line['type'] for line in lines]
+
+    assert types == ['start', 'initial_state'] + ['initial_users'] * 3 + ['predictions', 'final_state'] + \
+        ['final_users'] * 3 + ['improvements', 'end']
+    assert lines[0]['simulation_id'] == lines[1]['state']['simulation_id']
+    assert [len(line['users']) for line in lines if line['type'] == 'initial_users'] == [100, 100, 30]
+    assert sorted(user['id'] for line in lines if line['type'] == 'final_users'
+                  for user in line['users']) == list(range(230))
+    assert 'users' not in lines[1]['state']
+
+
+def test_summary_only_stream_has_no_user_pages(client):
+    lines = records(client.post('/api/simulation/run', json={
+        'stream': True, 'summary_only': True, 'num_towers': 5, 'num_users': 150, 'seed': 4
+    }))
+    types = [line['type'] for line in lines]
+    assert types == ['start', 'initial_state', 'predictions', 'final_state', 'improvements', 'end']
+    assert lines[0]['summary_only'] is True
+
+
+def test_start_record_precedes_engine_setup(client, monkeypatch):
+    import routes.simulation as routes
+    built = []
+    engine_class = routes.SimulationEngine
+
+    def build(**options):
+        built.append(options)
+        return engine_class(**options)
+
+    monkeypatch.setattr(routes, 'SimulationEngine', build)
+    response = client.post('/api/simulation/run', json={
+        'stream': True, 'summary_only': True, 'num_towers': 5, 'num_users': 150, 'seed': 4
+    }, buffered=False)
+    chunks = iter(response.response)
+
+    assert json.loads(next(chunks))['type'] == 'start'
+    assert built == []
+    assert json.loads(next(chunks))['type'] == 'initial_state'
+    assert len(built) == 1
+    response.close()
+
+
+def test_stream_reports_errors_as_records(client):
+    lines = records(client.post('/api/simulation/run', json={
+        'stream': True, 'num_towers': 5, 'num_users': 50, 'strategy': 'no-such-strategy'
+    }))
+    assert lines[0]['type'] == 'start'
+    assert lines[-1]['type'] == 'error'
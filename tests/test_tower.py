@@ -0,0 +1,90 @@
+"""
+Object towers: bulk membership updates with one load/status refresh per call
+"""
+
+import numpy as np
+import pytest
+
+from models.simulation import Tower, User
+from models.state_tracker import StateTracker
+
+
+def users(count, start=0):
+    rng = np.random.default_rng(0)
+    return [User(i, (31.95, 35.91), rng=rng) for i in range(start, start + count)]
+
+
+@pytest.fixture
+def status_updates(monkeypatch):
+    """Counts Tower._update_status calls"""
+    calls = []
+    update = Tower._update_status
+
+    def counted(tower):
+        calls.append(tower.id)
+        update(tower)
+
+    monkeypatch.setattr(Tower, '_update_status', counted)
+    return calls
+
+
+def test_add_users_truncates_at_capacity_and_skips_duplicates(status_updates):
+    tower = Tower(0, (31.95, 35.91), capacity=10)
+    first = users(6)
+    assert tower.add_users(first) == first
+    # Two already connected, then room for only four of the six new ones
+    accepted = tower.add_users(first[:2] + users(6, start=6))
+    assert [user.id for user in accepted] == [6, 7, 8, 9]
+    assert tower.current_load == 10 and tower.status == 'congested'
+    assert [user.id for user in tower.users] == list(range(10))
+    assert status_updates == [0, 0]  # once per bulk call
+
+    assert tower.add_users(users(3, start=20)) == []
+    assert status_updates == [0, 0]
+
+
+def test_inactive_tower_accepts_nobody():
+    tower = Tower(0, (31.95, 35.91), capacity=10)
+    tower.active = False
+    assert tower.add_users(users(3)) == []
+    assert tower.current_load == 0
+
+
+def test_remove_users_refreshes_once_and_keeps_membership_lookups(status_updates):
+    tower = Tower(0, (31.95, 35.91), capacity=10)
+    members = users(9)
+    tower.add_users(members)
+    assert tower.status == 'congested'
+
+    assert tower.remove_users(members[2:7] + users(2, start=50)) == 5
+    assert status_updates == [0, 0]
+    assert tower.current_load == 4 and tower.status == 'normal'
+    assert tower.remove_users(members[2:7]) == 0
+    assert status_updates == [0, 0]
+
+    # Membership stays a dict keyed by user id after removals
+    assert isinstance(tower._members, dict) and len(tower._members) == tower.current_load
+    assert [tower.has_user(user) for user in members] == [True] * 2 + [False] * 5 + [True] * 2
+    assert [user.id for user in tower.first_users(3)] == [0, 1, 7]
+
+
+def test_bulk_updates_mark_the_tracker():
+    tower = Tower(1, (31.95, 35.91), capacity=4)
+    tower.tracker = tracker = StateTracker(2, 10, status_counts={'normal': 2})
+    members = users(6)
+
+    tower.add_users(members)
+    assert tracker.commit() == 1
+    assert tracker.changed_users(0).tolist() == [0, 1, 2, 3]
+    assert tracker.changed_towers(0).tolist() == [1]
+    assert tracker.status_counts == {'normal': 1, 'congested': 1, 'overloaded': 0}
+
+    tower.remove_users(members[1:3] + members[4:])
+    assert tracker.commit() == 2
+    assert tracker.changed_users(1).tolist() == [1, 2]
+    assert tracker.changed_towers(1).tolist() == [1]
+    assert tracker.status_counts == {'normal': 2, 'congested': 0, 'overloaded': 0}
+
+    tower.remove_users(members[4:])
+    tower.add_users([])
+    assert tracker.commit() == 2  # nothing changed
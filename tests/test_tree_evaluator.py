@@ -0,0 +1,60 @@
+"""
+The flattened NumPy tree evaluator matches XGBoost's own predictions
+"""
+
+import numpy as np
+import pytest
+
+from ml.tree_evaluator import TreeEnsemble
+
+xgb = pytest.importorskip('xgboost')
+
+
+@pytest.fixture(scope='module')
+def booster():
+    rng = np.random.default_rng(42)
+    features = rng.normal(size=(2000, 10)).astype(np.float32)
+    features[rng.random(features.shape) < 0.1] = np.nan  # trains default directions
+    target = 120 + 40 * np.nan_to_num(features[:, 0]) + 15 * np.nan_to_num(features[:, 4]) + rng.normal(0, 5, 2000)
+    params = {'objective': 'reg:squarederror', 'max_depth': 6, 'learning_rate': 0.1,
+              'tree_method': 'hist', 'seed': 42}
+    return xgb.train(params, xgb.DMatrix(features, label=target), num_boost_round=60)
+
+
+def sample(rows, missing=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(rows, 10)).astype(np.float32)
+    features[rng.random(features.shape) < missing] = np.nan
+    return features
+
+
+@pytest.mark.parametrize('rows, missing', [(1, 0.0), (500, 0.0), (500, 0.3), (50, 1.0)])
+def test_matches_inplace_predict(booster, rows, missing):
+    features = sample(rows, missing)
+    expected = booster.inplace_predict(features)
+    np.testing.assert_allclose(TreeEnsemble.from_booster(booster).predict(features), expected,
+                               rtol=1e-5, atol=1e-3)
+
+
+def test_iteration_range(booster):
+    features = sample(200, 0.1)
+    evaluator = TreeEnsemble.from_booster(booster, iteration_range=(0, 20))
+    np.testing.assert_allclose(evaluator.predict(features),
+                               booster.inplace_predict(features, iteration_range=(0, 20)),
+                               rtol=1e-5, atol=1e-3)
+
+
+def test_save_load_round_trip(booster, tmp_path):
+    features = sample(300, 0.2)
+    evaluator = TreeEnsemble.from_booster(booster)
+    evaluator.save(str(tmp_path))
+    np.testing.assert_array_equal(TreeEnsemble.load(str(tmp_path)).predict(features), evaluator.predict(features))
+
+
+def test_rejects_non_identity_objectives():
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(100, 3))
+    booster = xgb.train({'objective': 'binary:logistic'},
+                        xgb.DMatrix(features, label=features[:, 0] > 0), num_boost_round=2)
+    with pytest.raises(ValueError):
+        TreeEnsemble.from_booster(booster)